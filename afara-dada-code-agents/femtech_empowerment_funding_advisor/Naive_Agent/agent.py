@@ -12,11 +12,15 @@ needed for secure funding.
 """
 
 from google.adk.agents import Agent
+from google.adk.models import Gemini
 from google.adk.tools import google_search
 
+from femtech_empowerment_funding_advisor.runtime.recording import recordable
+
 root_agent = Agent(
     name="Naive_Agent",
-    model="gemini-3-pro-preview",
+    # Recordable, so the baseline can be replayed offline next to the verified flow
+    model=recordable(Gemini(model="gemini-3-pro-preview")),
 
     instruction="""
     You are a helpful research assistant. 
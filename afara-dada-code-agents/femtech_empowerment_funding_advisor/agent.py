@@ -7,6 +7,8 @@ from google.adk.agents import Agent, SequentialAgent
 from femtech_empowerment_funding_advisor.finding_agent.agent import finding_agent
 from femtech_empowerment_funding_advisor.merchant_agent.agent import merchant_agent
 from femtech_empowerment_funding_advisor.credentials_provider.agent import credentials_provider
+from femtech_empowerment_funding_advisor.credentials_provider.agent_mock import credentials_provider_headless
+from femtech_empowerment_funding_advisor.runtime.resilience import resilient_model
 
 
 # Create the funding processing pipeline
@@ -21,11 +23,26 @@ funding_processing_pipeline = SequentialAgent(
 )
 
 
+# Headless variant for pre-consented runs (batch jobs, recurring gifts, load
+# tests): the session carries a signed consent token, so there is no consent
+# turn. Run it directly on a session whose state already holds the
+# IntentMandate and the token. An agent can only have one parent, hence the
+# Merchant Agent clone.
+headless_funding_pipeline = SequentialAgent(
+    name="HeadlessFundingPipeline",
+    description="Creates signed funding contract and processes a pre-consented payment without a confirmation turn",
+    sub_agents=[
+        merchant_agent.clone(update={"name": "merchant_agent_headless"}),
+        credentials_provider_headless
+    ]
+)
+
+
 # Create the root orchestrator agent
 # This is what users interact with directly
 root_agent = Agent(
     name="AfaraTechAdvisor",
-    model="gemini-3-pro-preview",
+    model=resilient_model(),
     description="A specialized advisor that helps donors fund verified African female tech empowerment initiatives.",
     
     instruction="""You are "Afara Tech," a specialized ecosystem advisor.
@@ -0,0 +1,3 @@
+"""
+Audit - Offline verification of stored AP2 mandate chains.
+"""
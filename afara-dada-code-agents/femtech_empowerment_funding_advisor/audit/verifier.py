@@ -0,0 +1,337 @@
+"""
+Offline verifier for the Intent -> Cart -> Payment chain of trust.
+
+Streams stored mandate chains (from the ledger, or from session state) and
+checks each one for:
+- linkage: the PaymentMandate points at the cart it pays for,
+- merchant and amount consistency across intent, cart, payment and result,
+- expiries: the cart was built before the intent expired and paid before the
+  cart expired,
+- the merchant signature over the cart contents.
+
+Chains are plain dicts, so verification needs no Pydantic models. A ledger
+is verified across a process pool by byte range: the parent only splits the
+file (`MandateLedger.byte_ranges`) and each worker reads and parses its own
+slice, so no record data is parsed or pickled in the parent.
+
+Usage:
+    python -m femtech_empowerment_funding_advisor.audit.verifier --ledger var/ledger.jsonl \
+        --report discrepancies.jsonl --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from femtech_empowerment_funding_advisor.data.ledger import DEFAULT_LEDGER_PATH, MandateLedger, chain_record
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _expected_signature(cart_contents: Dict[str, Any]) -> str:
+    # Must match merchant_tools._generate_merchant_signature
+    cart_json = json.dumps(cart_contents, sort_keys=True, separators=(",", ":"))
+    return f"SIG_{hashlib.sha256(cart_json.encode('utf-8')).hexdigest()[:16]}"
+
+
+def verify_chain(record: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Checks one stored chain.
+
+    Returns:
+        A list of {"check": ..., "detail": ...} discrepancies (empty if valid).
+    """
+    issues: List[Dict[str, str]] = []
+
+    def fail(check: str, detail: str) -> None:
+        issues.append({"check": check, "detail": detail})
+
+    intent = record.get("intent_mandate")
+    cart = record.get("cart_mandate")
+    payment = record.get("payment_mandate")
+    result = record.get("payment_result") or {}
+
+    if not cart or not payment:
+        fail("structure", "Chain is missing its CartMandate or PaymentMandate")
+        return issues
+    if not intent:
+        fail("structure", "Chain is missing its IntentMandate")
+
+    try:
+        contents = cart["contents"]
+        cart_id = contents["id"]
+        merchant = contents["merchant_name"]
+        details = contents["payment_request"]["details"]
+        payment_contents = payment["payment_mandate_contents"]
+    except (KeyError, TypeError) as e:
+        fail("structure", f"Malformed mandate: missing {e}")
+        return issues
+
+    # Linkage
+    if payment_contents.get("payment_details_id") != cart_id:
+        fail("linkage", f"payment_details_id {payment_contents.get('payment_details_id')} != cart {cart_id}")
+    if (payment_contents.get("payment_response") or {}).get("request_id") != cart_id:
+        fail("linkage", f"payment_response.request_id does not reference cart {cart_id}")
+    if details.get("id") != f"order_{cart_id}":
+        fail("linkage", f"payment request id {details.get('id')} does not match cart {cart_id}")
+    if result.get("cart_id") not in (None, cart_id):
+        fail("linkage", f"payment_result.cart_id {result.get('cart_id')} != cart {cart_id}")
+
+    # Merchant
+    if intent and merchant not in (intent.get("merchants") or []):
+        fail("merchant", f"Cart merchant '{merchant}' not in intent merchants {intent.get('merchants')}")
+    if payment_contents.get("merchant_agent") != merchant:
+        fail("merchant", f"Payment merchant '{payment_contents.get('merchant_agent')}' != cart merchant '{merchant}'")
+    if result and result.get("recipient") != merchant:
+        fail("merchant", f"Transfer recipient '{result.get('recipient')}' != cart merchant '{merchant}'")
+
+    # Amounts
+    try:
+        cart_total = Money.from_major(details["total"]["amount"]["value"], details["total"]["amount"]["currency"])
+        paid_total = Money.from_major(
+            payment_contents["payment_details_total"]["amount"]["value"],
+            payment_contents["payment_details_total"]["amount"]["currency"]
+        )
+        if paid_total != cart_total:
+            fail("amount", f"Payment total {paid_total} != cart total {cart_total}")
+        if intent:
+            intended = Money.from_state(intent)
+            if intended != cart_total:
+                fail("amount", f"Cart total {cart_total} != intent amount {intended}")
+        if result:
+            settled = Money.from_state(result)
+            if settled != cart_total:
+                fail("amount", f"Settled amount {settled} != cart total {cart_total}")
+    except (KeyError, TypeError, ValueError) as e:
+        fail("amount", f"Unreadable amount: {e}")
+
+    # Expiries
+    try:
+        cart_created = _parse_time(cart.get("timestamp"))
+        paid_at = _parse_time(payment_contents.get("timestamp"))
+        cart_expiry = _parse_time(contents.get("cart_expiry"))
+        intent_expiry = _parse_time(intent.get("intent_expiry")) if intent else None
+        if intent_expiry and cart_created and cart_created > intent_expiry:
+            fail("expiry", f"Cart built at {cart_created.isoformat()} after intent expired at {intent_expiry.isoformat()}")
+        if cart_expiry and paid_at and paid_at > cart_expiry:
+            fail("expiry", f"Paid at {paid_at.isoformat()} after cart expired at {cart_expiry.isoformat()}")
+        # The integer epochs are what the tools check, so they must agree with the ISO fields
+        if intent_expiry and intent.get("intent_expiry_epoch") not in (None, int(intent_expiry.timestamp())):
+            fail("expiry", f"intent_expiry_epoch {intent['intent_expiry_epoch']} disagrees with intent_expiry")
+        if cart_expiry and cart.get("cart_expiry_epoch") not in (None, int(cart_expiry.timestamp())):
+            fail("expiry", f"cart_expiry_epoch {cart['cart_expiry_epoch']} disagrees with cart_expiry")
+    except (ValueError, TypeError) as e:
+        fail("expiry", f"Unreadable timestamp: {e}")
+
+    # Signature
+    if cart.get("merchant_authorization") != _expected_signature(contents):
+        fail("signature", f"Merchant signature does not match cart {cart_id} contents")
+
+    return issues
+
+
+def _discrepancies(record: Dict[str, Any], **location: Any) -> List[Dict[str, Any]]:
+    """Verifies one chain and tags each issue with where the chain was found."""
+    issues = verify_chain(record)
+    if not issues:
+        return []
+    payment_result = record.get("payment_result") or {}
+    cart_contents = (record.get("cart_mandate") or {}).get("contents") or {}
+    return [
+        {
+            **location,
+            "transaction_id": payment_result.get("transaction_id"),
+            "cart_id": cart_contents.get("id"),
+            **issue,
+        }
+        for issue in issues
+    ]
+
+
+def verify_chunk(records: List[Dict[str, Any]], offset: int) -> tuple[int, List[Dict[str, Any]]]:
+    """
+    Verifies a chunk of chains; module-level so it can run in a process pool.
+
+    Returns:
+        (records checked, discrepancies with their position in the stream)
+    """
+    discrepancies = []
+    for i, record in enumerate(records):
+        discrepancies.extend(_discrepancies(record, position=offset + i))
+    return len(records), discrepancies
+
+
+def verify_range(ledger_path: str, start: int, end: int) -> tuple[int, List[Dict[str, Any]]]:
+    """
+    Reads, parses and verifies the chains in one byte range of the ledger.
+
+    Module-level with plain-data arguments so it can run in a process pool.
+
+    Returns:
+        (records checked, discrepancies with the byte offset of their ledger line)
+    """
+    checked = 0
+    discrepancies = []
+    line_offset = start
+    for raw in MandateLedger(Path(ledger_path)).iter_range(start, end):
+        offset, line_offset = line_offset, line_offset + len(raw)
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            logger.error(f"Skipping corrupt ledger line at byte {offset}: {e}")
+            continue
+        checked += 1
+        discrepancies.extend(_discrepancies(record, offset=offset))
+    return checked, discrepancies
+
+
+def chains_from_sessions(states: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Turns session states holding a completed payment into chain records."""
+    for state in states:
+        if state.get("payment_mandate") and state.get("cart_mandate"):
+            yield chain_record(
+                state.get("intent_mandate"),
+                state["cart_mandate"],
+                state["payment_mandate"],
+                state.get("payment_result") or {}
+            )
+
+
+@dataclass
+class AuditReport:
+    """Summary of a verification run."""
+    checked: int = 0
+    discrepancies: int = 0
+    by_check: Counter = field(default_factory=Counter)
+    duration_s: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "discrepancies": self.discrepancies,
+            "by_check": dict(self.by_check),
+            "duration_s": round(self.duration_s, 3),
+            "chains_per_s": round(self.checked / self.duration_s, 1) if self.duration_s else 0.0,
+        }
+
+
+def _run_jobs(
+    fn: Callable[..., tuple[int, List[Dict[str, Any]]]],
+    jobs: Iterable[tuple],
+    report_out: Optional[TextIO],
+    workers: int
+) -> AuditReport:
+    """
+    Runs `fn(*job)` for every job, inline or across a process pool with at
+    most two jobs in flight per worker, and writes discrepancies as JSONL.
+    """
+    report = AuditReport()
+    started = time.perf_counter()
+
+    def collect(checked: int, found: List[Dict[str, Any]]) -> None:
+        report.checked += checked
+        report.discrepancies += len(found)
+        for item in found:
+            report.by_check[item["check"]] += 1
+            if report_out is not None:
+                report_out.write(json.dumps(item) + "\n")
+
+    if workers <= 0:
+        for job in jobs:
+            collect(*fn(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight: List[Future] = []
+            for job in jobs:
+                in_flight.append(pool.submit(fn, *job))
+                if len(in_flight) >= workers * 2:
+                    collect(*in_flight.pop(0).result())
+            for future in in_flight:
+                collect(*future.result())
+
+    report.duration_s = time.perf_counter() - started
+    return report
+
+
+def verify_stream(
+    chunks: Iterable[List[Dict[str, Any]]],
+    report_out: Optional[TextIO] = None,
+    workers: int = 0
+) -> AuditReport:
+    """
+    Verifies a stream of chain chunks (e.g. from `chains_from_sessions`),
+    writing discrepancies as JSONL.
+
+    With `workers` > 0 chunks are verified across a process pool. The chunks
+    are pickled to the workers; for a ledger file use `verify_ledger`.
+    """
+    def jobs() -> Iterator[tuple]:
+        offset = 0
+        for chunk in chunks:
+            yield chunk, offset
+            offset += len(chunk)
+
+    return _run_jobs(verify_chunk, jobs(), report_out, workers)
+
+
+def verify_ledger(
+    ledger: MandateLedger,
+    report_out: Optional[TextIO] = None,
+    workers: int = 0,
+    chunk_bytes: int = 8 << 20
+) -> AuditReport:
+    """
+    Verifies every chain in a ledger file, writing discrepancies as JSONL.
+
+    Only (path, start, end) is sent to each worker, which parses its own
+    slice of the file.
+    """
+    jobs = ((str(ledger.path), start, end) for start, end in ledger.byte_ranges(chunk_bytes))
+    return _run_jobs(verify_range, jobs, report_out, workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify stored AP2 mandate chains.")
+    parser.add_argument("--ledger", type=Path, default=DEFAULT_LEDGER_PATH)
+    parser.add_argument("--report", type=Path, help="Write discrepancies as JSONL here (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-mb", type=float, default=8.0, help="Ledger bytes per worker job")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    report_out = open(args.report, "w", encoding="utf-8") if args.report else sys.stdout
+    try:
+        report = verify_ledger(
+            MandateLedger(args.ledger), report_out=report_out, workers=args.workers,
+            chunk_bytes=int(args.chunk_mb * (1 << 20))
+        )
+    finally:
+        if args.report:
+            report_out.close()
+
+    # Summary goes to stderr so stdout stays a clean JSONL discrepancy stream
+    print(json.dumps(report.to_dict()), file=sys.stderr)
+    sys.exit(1 if report.discrepancies else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,13 @@ This agent acts as our "Payment Processor."
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool
 from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+from femtech_empowerment_funding_advisor.tools.recurring_tools import create_recurring_donation
+from femtech_empowerment_funding_advisor.runtime.resilience import resilient_model
 
 
 credentials_provider = Agent(
     name="CredentialsProvider",
-    model="gemini-3-pro-preview",
+    model=resilient_model(),
     description="Securely processes funding transfers by creating PaymentMandates and executing transactions with user consent.",
 
     instruction="""You are a Financial Operations Specialist responsible for securely processing funding transfers to African Tech Initiatives.
@@ -52,8 +54,15 @@ Your workflow:
    - The amount and the recipient organization.
    - That this completes the three-agent AP2 credential chain.
 
+6. **Recurring Donations (optional):**
+   If the user asks to give regularly (e.g., "monthly"), offer to set up a recurring donation after the transfer.
+   - Confirm the amount per run, the interval in days (30 for monthly) and a total cap.
+   - Ask explicitly: **"I will transfer $X to [Organization Name] every N days, up to $CAP in total. Do you authorize this recurring donation?"**
+   - ONLY after explicit confirmation, call `create_recurring_donation` with `org_name`, `amount`, `interval_days` and `max_total`.
+   - Share the **Subscription ID**. Future runs are settled automatically without another conversation.
+
 **IMPORTANT BOUNDARIES:**
-- Your ONLY job is creating PaymentMandates and processing the transfer.
+- Your ONLY job is creating PaymentMandates, processing the transfer and setting up consented recurring donations.
 - You do NOT discover initiatives (that's the **Finding Agent's** job).
 - You do NOT create offers (that's the **Merchant Agent's** job).
 - You MUST validate that the CartMandate hasn't expired before processing.
@@ -74,6 +83,7 @@ A PaymentMandate is the final credential that authorizes the execution of funds.
 Each credential creates an auditable chain of trust, ensuring that the money goes exactly where it was intended.""",
 
     tools=[
-        FunctionTool(func=create_payment_mandate)
+        FunctionTool(func=create_payment_mandate),
+        FunctionTool(func=create_recurring_donation)
     ],
 )
\ No newline at end of file
@@ -1,32 +1,42 @@
 """
-Mock Credentials Provider Agent for automated testing (no confirmation required).
+Headless Credentials Provider Agent for pre-consented flows (no confirmation turn).
+
+Used for batch jobs, recurring gifts and load tests. Consent is carried as a
+signed, scoped token in session state (see `tools.consent`), issued before the
+run. `create_preconsented_payment_mandate` rejects the payment if the token is
+missing, forged, expired or does not cover the donor, organization or amount.
 """
 
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool
-from charity_advisor.tools.payment_tools import create_payment_mandate
+from femtech_empowerment_funding_advisor.tools.payment_tools import create_preconsented_payment_mandate
+from femtech_empowerment_funding_advisor.runtime.resilience import resilient_model
 
 
-credentials_provider_mock = Agent(
-    name="CredentialsProviderMock",
-    model="gemini-3-pro-preview",
-    description="Mock payment processor for testing (auto-approves without confirmation)",
+credentials_provider_headless = Agent(
+    name="CredentialsProviderHeadless",
+    model=resilient_model(),
+    description="Processes pre-consented funding transfers without a confirmation turn (consent token in session state)",
     tools=[
-        FunctionTool(func=create_payment_mandate, require_confirmation=False)  # ← Only difference
+        FunctionTool(func=create_preconsented_payment_mandate, require_confirmation=False)
     ],
-    instruction="""You are a payment specialist responsible for securely processing payments.
+    instruction="""You are a payment specialist processing pre-consented funding transfers.
+
+The donor already consented before this run; the signed consent token is in session state.
+Do NOT ask the user for confirmation.
 
 Your workflow:
 
-1. Read the CartMandate from shared state.
-2. Extract payment details from the nested structure.
-3. Use the create_payment_mandate tool to:
+1. Call the `create_preconsented_payment_mandate` tool immediately. It will:
    - Validate the CartMandate hasn't expired
+   - Check the consent token covers this donor, organization and amount
    - Create a PaymentMandate
    - Simulate payment processing
    - Record the transaction result
 
-4. After processing, inform the user about the successful payment.
-
-NOTE: This is a mock agent for automated testing. Confirmation is bypassed."""
+2. Report the result in one line: the Transaction ID, amount and recipient organization.
+   If the tool returns an error (e.g. the consent was rejected), report the error message and stop."""
 )
+
+# Previous name, kept for existing test harnesses
+credentials_provider_mock = credentials_provider_headless
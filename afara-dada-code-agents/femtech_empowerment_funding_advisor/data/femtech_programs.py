@@ -3,74 +3,128 @@ Mock database of vetted African Female Tech Empowerment Organizations.
 This represents the 'Trusted Data Layer' your agent accesses.
 """
 
+import hashlib
+import json
+
+
+# Normalized database of 5 highly credible organizations
+INITIATIVES_DB = {
+    "pan-africa": [
+        {
+            "id": "she-code-africa",
+            "name": "She Code Africa",
+            "hq": "Lagos, Nigeria (West Africa)",
+            "mission": "To build a community that embodies technical growth, networking, mentorship, and visibility for women in tech across Africa.",
+            "impact_metrics": "62,000+ women trained, 40+ chapters across 20 countries.",
+            "beneficiaries": 62000,  # Headline reach from impact_metrics (None if not reported)
+            "rating": 4.9,
+            "efficiency": 0.95, # 95% of funds go directly to training programs
+            "verification_source": "Registered Non-Profit; Partnered with Grow with Google & FedEx.",
+            "website": "shecodeafrica.org"
+        },
+        {
+            "id": "women-in-tech-africa",
+            "name": "Women in Tech Africa",
+            "hq": "Accra, Ghana (West Africa)",
+            "mission": "Supporting African women to positively impact their communities through technology and leadership.",
+            "impact_metrics": "Largest female tech group on the continent with chapters in 30 countries.",
+            "beneficiaries": None,  # Headline reach from impact_metrics (None if not reported)
+            "rating": 4.8,
+            "efficiency": 0.90,
+            "verification_source": "Endorsed by the Graca Machel Trust; Founded by Ethel D. Cofie.",
+            "website": "womenintechafrica.com"
+        }
+    ],
+    "east-africa": [
+        {
+            "id": "pwani-teknowgalz",
+            "name": "Pwani Teknowgalz",
+            "hq": "Mombasa, Kenya (East Africa)",
+            "mission": "To equip young women in marginalized communities (especially coastal Kenya) with employable tech skills.",
+            "impact_metrics": "Empowered 6,800+ girls; 400+ secured jobs via CodeHack program.",
+            "beneficiaries": 6800,  # Headline reach from impact_metrics (None if not reported)
+            "rating": 4.9,
+            "efficiency": 0.92,
+            "verification_source": "Awarded by Technovation; Partners with American Space Mombasa.",
+            "website": "pwaniteknowgalz.org"
+        },
+        {
+            "id": "tambua-women-in-tech",
+            "name": "Tambua Women in Tech",
+            "hq": "Nairobi, Kenya (East Africa)",
+            "mission": "To spotlight, recognize ('Tambua'), and amplify the voices of African women in STEM to create role models.",
+            "impact_metrics": "Celebrated 350+ women globally; Hosting major 2025 Summit.",
+            "beneficiaries": 350,  # Headline reach from impact_metrics (None if not reported)
+            "rating": 4.7,
+            "efficiency": 0.88,
+            "verification_source": "Community-driven platform; Recognized by Google Developer Experts program.",
+            "website": "womenintechblog.dev"
+        }
+    ],
+    "global-diaspora": [
+         {
+            "id": "empower-her-community",
+            "name": "Empower Her Community",
+            "hq": "Global (Strong African Presence)",
+            "mission": "A tech-based community focused on training and promoting women of color in the field of information technology for free.",
+            "impact_metrics": "5,000+ women empowered; 3,000+ trained in technical bootcamps.",
+            "beneficiaries": 5000,  # Headline reach from impact_metrics (None if not reported)
+            "rating": 4.8,
+            "efficiency": 0.94,
+            "verification_source": " Verified Non-Profit Community; High engagement in open-source contributions.",
+            "website": "empowerhercommunity.net"
+        }
+    ]
+}
+
+# Content hash of the registry. Anything cached from registry data (tool results)
+# is keyed on this so edits to the records invalidate it.
+REGISTRY_VERSION = hashlib.sha256(
+    json.dumps(INITIATIVES_DB, sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
+
+def iter_initiatives():
+    """Yields (region, initiative) for every record in the registry."""
+    for region, initiatives in INITIATIVES_DB.items():
+        for initiative in initiatives:
+            yield region, initiative
+
+
+# Lookup by ID and by lower-cased name
+_INITIATIVE_INDEX = {
+    key: initiative
+    for _, initiative in iter_initiatives()
+    for key in (initiative["id"], initiative["name"].lower())
+}
+
+
+# (region, position within the region) by ID
+_INITIATIVE_POSITIONS = {
+    initiative["id"]: (region, i)
+    for region, initiatives in INITIATIVES_DB.items()
+    for i, initiative in enumerate(initiatives)
+}
+
+
+def get_initiative(org_id_or_name: str):
+    """Returns the initiative with the given ID or (case-insensitive) name, or None."""
+    return _INITIATIVE_INDEX.get(org_id_or_name.strip().lower())
+
+
+def locate_initiative(org_id: str):
+    """Returns (region, position within the region) for an initiative ID, or None."""
+    return _INITIATIVE_POSITIONS.get(org_id)
+
+
 def get_initiatives_by_region(region: str):
     """Returns a list of vetted female tech empowerment initiatives for a given African region."""
     
-    # Normalized database of 5 highly credible organizations
-    initiatives_db = {
-        "pan-africa": [
-            {
-                "name": "She Code Africa",
-                "hq": "Lagos, Nigeria (West Africa)",
-                "mission": "To build a community that embodies technical growth, networking, mentorship, and visibility for women in tech across Africa.",
-                "impact_metrics": "62,000+ women trained, 40+ chapters across 20 countries.",
-                "rating": 4.9,
-                "efficiency": 0.95, # 95% of funds go directly to training programs
-                "verification_source": "Registered Non-Profit; Partnered with Grow with Google & FedEx.",
-                "website": "shecodeafrica.org"
-            },
-            {
-                "name": "Women in Tech Africa",
-                "hq": "Accra, Ghana (West Africa)",
-                "mission": "Supporting African women to positively impact their communities through technology and leadership.",
-                "impact_metrics": "Largest female tech group on the continent with chapters in 30 countries.",
-                "rating": 4.8,
-                "efficiency": 0.90,
-                "verification_source": "Endorsed by the Graca Machel Trust; Founded by Ethel D. Cofie.",
-                "website": "womenintechafrica.com"
-            }
-        ],
-        "east-africa": [
-            {
-                "name": "Pwani Teknowgalz",
-                "hq": "Mombasa, Kenya (East Africa)",
-                "mission": "To equip young women in marginalized communities (especially coastal Kenya) with employable tech skills.",
-                "impact_metrics": "Empowered 6,800+ girls; 400+ secured jobs via CodeHack program.",
-                "rating": 4.9,
-                "efficiency": 0.92,
-                "verification_source": "Awarded by Technovation; Partners with American Space Mombasa.",
-                "website": "pwaniteknowgalz.org"
-            },
-            {
-                "name": "Tambua Women in Tech",
-                "hq": "Nairobi, Kenya (East Africa)",
-                "mission": "To spotlight, recognize ('Tambua'), and amplify the voices of African women in STEM to create role models.",
-                "impact_metrics": "Celebrated 350+ women globally; Hosting major 2025 Summit.",
-                "rating": 4.7,
-                "efficiency": 0.88,
-                "verification_source": "Community-driven platform; Recognized by Google Developer Experts program.",
-                "website": "womenintechblog.dev"
-            }
-        ],
-        "global-diaspora": [
-             {
-                "name": "Empower Her Community",
-                "hq": "Global (Strong African Presence)",
-                "mission": "A tech-based community focused on training and promoting women of color in the field of information technology for free.",
-                "impact_metrics": "5,000+ women empowered; 3,000+ trained in technical bootcamps.",
-                "rating": 4.8,
-                "efficiency": 0.94,
-                "verification_source": " Verified Non-Profit Community; High engagement in open-source contributions.",
-                "website": "empowerhercommunity.net"
-            }
-        ]
-    }
-
     # Helper logic to return all if 'africa' is requested, otherwise specific region
     if region.lower() == "africa":
         all_initiatives = []
-        for key in initiatives_db:
-            all_initiatives.extend(initiatives_db[key])
+        for key in INITIATIVES_DB:
+            all_initiatives.extend(INITIATIVES_DB[key])
         return all_initiatives
     
-    return initiatives_db.get(region.lower(), [])
\ No newline at end of file
+    return INITIATIVES_DB.get(region.lower(), [])
\ No newline at end of file
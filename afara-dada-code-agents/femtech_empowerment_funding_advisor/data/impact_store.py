@@ -0,0 +1,376 @@
+"""
+Per-organization time series of org-reported fund usage.
+
+Initiatives push fund-usage events (e.g. "$1,200 spent on laptops for the
+Mombasa cohort, 40 beneficiaries"). Accepted events are appended to one JSONL
+file per organization under `IMPACT_DIR`, and the store keeps running rollups
+(totals, per-category and per-month sums, latest updates) that are updated as
+events arrive, so queries never rescan history.
+
+The store tails the files it reads: an agent process picks up events written
+by a separate ingestion process on its next query, reading only the new bytes.
+There must be a single ingesting writer per directory.
+
+Duplicates are recognized by (org, event_id) among the `dedup_window` most
+recently seen events of each organization (AFARA_IMPACT_DEDUP_WINDOW, default
+100k), so memory stays bounded however long the store runs. A resend of an
+event older than that is accepted again.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import get_initiative
+from femtech_empowerment_funding_advisor.data.ledger import DATA_DIR
+from femtech_empowerment_funding_advisor.tools.clock import clock
+from femtech_empowerment_funding_advisor.tools.mandates import mandate_digest
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+logger = logging.getLogger(__name__)
+
+IMPACT_DIR = Path(os.environ.get("AFARA_IMPACT_DIR", DATA_DIR / "impact"))
+
+CATEGORIES = ("training", "equipment", "stipends", "mentorship", "events", "operations", "other")
+# Largest single report we accept, and how far ahead of our clock a report may be dated
+MAX_EVENT_AMOUNT = Money.from_major(1_000_000, "USD")
+MAX_CLOCK_SKEW_S = 300
+# Earliest report date we accept (2000-01-01T00:00:00Z); stored events are also
+# checked against the last date datetime can represent before replay
+MIN_EVENT_TS = 946_684_800.0
+MAX_STORED_TS = 253_402_300_799.0
+MAX_NOTE_CHARS = 280
+RECENT_EVENTS = 10
+MAX_REPORTED_ERRORS = 20
+
+
+# Compact separators, without building a new encoder per line
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+@lru_cache(maxsize=4096)
+def _month_of_day(day: int) -> str:
+    return datetime.fromtimestamp(day * 86_400, timezone.utc).strftime("%Y-%m")
+
+
+def _storable_ts(ts: Any) -> bool:
+    """Whether a stored event's timestamp can be rolled up (guards replay of old or hand-edited files)."""
+    return isinstance(ts, (int, float)) and math.isfinite(ts) and MIN_EVENT_TS <= ts <= MAX_STORED_TS
+
+
+def _parse_timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def validate_event(raw: Any) -> tuple[Optional[Dict[str, Any]], str]:
+    """
+    Validates one org-reported fund-usage event and normalizes it for storage.
+
+    Expected fields: `org_id` (or `org_name`), `timestamp` (ISO 8601 or epoch
+    seconds), `amount` or `amount_minor`, optional `currency` (default USD),
+    `category`, `beneficiaries`, `note` and `event_id`. Events without an
+    `event_id` are identified by a hash of their content, so resending the same
+    report is deduplicated either way.
+
+    Returns:
+        (normalized event, error_message)
+    """
+    if not isinstance(raw, dict):
+        return None, f"Event must be a JSON object, got: {type(raw).__name__}"
+
+    initiative = get_initiative(str(raw.get("org_id") or raw.get("org_name") or ""))
+    if initiative is None:
+        return None, f"Unknown organization: {raw.get('org_id') or raw.get('org_name')!r}"
+
+    try:
+        ts = _parse_timestamp(raw["timestamp"])
+    except KeyError:
+        return None, "Event is missing its timestamp"
+    except (TypeError, ValueError, OverflowError) as e:
+        return None, f"Invalid timestamp: {e}"
+    # json accepts NaN and Infinity, which compare False with everything
+    if not math.isfinite(ts):
+        return None, f"Invalid timestamp: {raw['timestamp']}"
+    if ts < MIN_EVENT_TS:
+        return None, f"Event is dated before 2000: {raw['timestamp']}"
+    if ts > clock.now() + MAX_CLOCK_SKEW_S:
+        return None, f"Event is dated in the future: {raw['timestamp']}"
+
+    try:
+        amount = Money.from_state(raw)
+    except (TypeError, ValueError) as e:
+        return None, f"Invalid amount: {e}"
+    if amount.minor <= 0:
+        return None, f"Amount must be positive, got: {amount}"
+    if amount.currency == MAX_EVENT_AMOUNT.currency and amount > MAX_EVENT_AMOUNT:
+        return None, f"Amount exceeds maximum of {MAX_EVENT_AMOUNT}: {amount}"
+
+    category = str(raw.get("category") or "other").strip().lower()
+    if category not in CATEGORIES:
+        return None, f"Unknown category '{category}'; use one of {list(CATEGORIES)}"
+
+    beneficiaries = raw.get("beneficiaries")
+    if beneficiaries is not None:
+        if isinstance(beneficiaries, bool) or not isinstance(beneficiaries, int) or beneficiaries < 0:
+            return None, f"Beneficiaries must be a non-negative integer, got: {beneficiaries!r}"
+
+    event = {
+        "org_id": initiative["id"],
+        "ts": ts,
+        "category": category,
+        "amount_minor": amount.minor,
+        "currency": amount.currency,
+        "beneficiaries": beneficiaries,
+        "note": str(raw.get("note") or "")[:MAX_NOTE_CHARS],
+    }
+    event["event_id"] = str(raw.get("event_id") or mandate_digest(event))
+    return event, ""
+
+
+@dataclass
+class IngestResult:
+    """Outcome of one ingestion batch (or a merged run of batches)."""
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, position: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"position": position, "error": message})
+
+    def merge(self, other: "IngestResult") -> None:
+        self.accepted += other.accepted
+        self.duplicates += other.duplicates
+        self.rejected += other.rejected
+        self.errors.extend(other.errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+@dataclass(slots=True)
+class OrgRollup:
+    """Running aggregates for one organization's fund-usage events."""
+    org_id: str
+    events: int = 0
+    beneficiaries: int = 0
+    first_ts: Optional[float] = None
+    last_ts: Optional[float] = None
+    spent: Counter = field(default_factory=Counter)  # currency -> minor units
+    by_category: Counter = field(default_factory=Counter)  # (category, currency) -> minor
+    by_month: Counter = field(default_factory=Counter)  # ("YYYY-MM", currency) -> minor
+    recent: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=RECENT_EVENTS))
+
+    def add(self, event: Dict[str, Any]) -> None:
+        ts = event["ts"]
+        currency = event["currency"]
+        minor = event["amount_minor"]
+        # Everything that can raise comes before the first update
+        month = _month_of_day(int(ts // 86_400))
+        self.events += 1
+        self.beneficiaries += event.get("beneficiaries") or 0
+        self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        self.spent[currency] += minor
+        self.by_category[(event["category"], currency)] += minor
+        self.by_month[(month, currency)] += minor
+        self.recent.append(event)
+
+    def summary(self, months: int = 6, latest: int = 3) -> Dict[str, Any]:
+        """Compact, display-ready view of the rollup."""
+        def fmt(minor: int, currency: str) -> str:
+            return str(Money(minor, currency))
+
+        month_keys = sorted({month for month, _ in self.by_month})[-months:] if months > 0 else []
+        newest = sorted(self.recent, key=lambda e: e["ts"], reverse=True)[:latest]
+        return {
+            "org_id": self.org_id,
+            "events": self.events,
+            "beneficiaries_reported": self.beneficiaries,
+            "first_update": datetime.fromtimestamp(self.first_ts, timezone.utc).isoformat() if self.first_ts else None,
+            "last_update": datetime.fromtimestamp(self.last_ts, timezone.utc).isoformat() if self.last_ts else None,
+            "total_spent": [fmt(minor, currency) for currency, minor in sorted(self.spent.items())],
+            "by_category": {
+                category: fmt(minor, currency)
+                for (category, currency), minor in sorted(self.by_category.items(), key=lambda kv: -kv[1])
+            },
+            "monthly": [
+                [month, fmt(minor, currency)]
+                for (month, currency), minor in sorted(self.by_month.items())
+                if month in month_keys
+            ],
+            "latest": [
+                {
+                    "date": datetime.fromtimestamp(e["ts"], timezone.utc).date().isoformat(),
+                    "category": e["category"],
+                    "amount": fmt(e["amount_minor"], e["currency"]),
+                    "note": e["note"],
+                }
+                for e in newest
+            ],
+        }
+
+
+class ImpactStore:
+    """Append-only per-org JSONL time series with incrementally maintained rollups."""
+
+    def __init__(self, root: Path = IMPACT_DIR, dedup_window: Optional[int] = None):
+        self.root = Path(root)
+        self.dedup_window = dedup_window or int(os.environ.get("AFARA_IMPACT_DEDUP_WINDOW", "100000"))
+        self._rollups: Dict[str, OrgRollup] = {}
+        # org_id -> most recently seen event IDs, oldest first
+        self._seen: Dict[str, "OrderedDict[str, None]"] = {}
+        # Bytes of each org file already applied to the rollups
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, org_id: str) -> Path:
+        return self.root / f"{org_id}.jsonl"
+
+    def _is_seen(self, org_id: str, event_id: Any) -> bool:
+        seen = self._seen.get(org_id)
+        if seen is None or event_id not in seen:
+            return False
+        seen.move_to_end(event_id)
+        return True
+
+    def _mark_seen(self, org_id: str, event_id: str) -> None:
+        seen = self._seen.get(org_id)
+        if seen is None:
+            seen = self._seen[org_id] = OrderedDict()
+        seen[event_id] = None
+        seen.move_to_end(event_id)
+        if len(seen) > self.dedup_window:
+            seen.popitem(last=False)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        org_id = event["org_id"]
+        rollup = self._rollups.get(org_id) or OrgRollup(org_id)
+        rollup.add(event)
+        self._rollups[org_id] = rollup
+        self._mark_seen(org_id, event["event_id"])
+
+    def _tail(self, org_id: str) -> int:
+        """Applies complete lines appended to an org file since the last read. Caller holds the lock."""
+        path = self._path(org_id)
+        offset = self._offsets.get(org_id, 0)
+        try:
+            if path.stat().st_size <= offset:
+                return 0
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # A line without its newline is still being written; pick it up next time
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                    if not _storable_ts(event.get("ts")):
+                        raise ValueError(f"timestamp out of range: {event.get('ts')!r}")
+                    if self._is_seen(org_id, event.get("event_id")):
+                        continue
+                    self._apply(event)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # One bad line must not make the org's history unreadable
+                    logger.error(f"Skipping invalid impact line in {path.name} at byte {offset}: {e}")
+                    continue
+                applied += 1
+        self._offsets[org_id] = offset
+        return applied
+
+    def refresh(self, org_id: Optional[str] = None) -> int:
+        """Picks up events appended on disk (for one org, or all). Returns the number applied."""
+        with self._lock:
+            if org_id is not None:
+                return self._tail(org_id)
+            if not self.root.exists():
+                return 0
+            return sum(self._tail(path.stem) for path in self.root.glob("*.jsonl"))
+
+    def ingest(self, raw_events: Iterable[Any], start: int = 0) -> IngestResult:
+        """
+        Validates, deduplicates and appends a batch of raw events.
+
+        Accepted events are written with one append per organization and folded
+        into the rollups in the same pass.
+
+        Args:
+            raw_events: Parsed event objects; None marks input already rejected
+                upstream (e.g. unparseable lines), keeping positions aligned.
+            start: Position of the first event in the overall stream (for error reports).
+        """
+        result = IngestResult()
+        by_org: Dict[str, List[Dict[str, Any]]] = {}
+        batch_seen: Set[Tuple[str, str]] = set()
+
+        with self._lock:
+            for position, raw in enumerate(raw_events, start=start):
+                if raw is None:
+                    continue
+                event, error_message = validate_event(raw)
+                if event is None:
+                    result.reject(position, error_message)
+                    continue
+                key = (event["org_id"], event["event_id"])
+                if key in batch_seen or self._is_seen(*key):
+                    result.duplicates += 1
+                    continue
+                batch_seen.add(key)
+                by_org.setdefault(event["org_id"], []).append(event)
+
+            if by_org:
+                self.root.mkdir(parents=True, exist_ok=True)
+            for org_id, events in by_org.items():
+                # Catch up first so the offset we advance below is exact
+                self._tail(org_id)
+                data = "".join(_encode(e) + "\n" for e in events).encode("utf-8")
+                with open(self._path(org_id), "ab") as f:
+                    f.write(data)
+                    self._offsets[org_id] = f.tell()
+                for event in events:
+                    self._apply(event)
+                result.accepted += len(events)
+
+        return result
+
+    def rollup(self, org_id: str) -> Optional[OrgRollup]:
+        """Current rollup for an organization, including events on disk not yet read."""
+        self.refresh(org_id)
+        return self._rollups.get(org_id)
+
+    def summary(self, org_id: str, months: int = 6) -> Optional[Dict[str, Any]]:
+        rollup = self.rollup(org_id)
+        if rollup is None:
+            return None
+        with self._lock:
+            return rollup.summary(months)
+
+
+impact_store = ImpactStore()
@@ -0,0 +1,118 @@
+"""
+Append-only ledger of settled mandate chains.
+
+Each line is one JSON record holding the full AP2 chain for a settled donation:
+`intent_mandate`, `cart_mandate`, `payment_mandate` and `payment_result`. The
+ledger is the local store that recurring settlement writes to and that audit
+and reporting jobs stream from.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(os.environ.get("AFARA_DATA_DIR", "var"))
+DEFAULT_LEDGER_PATH = Path(os.environ.get("AFARA_LEDGER_PATH", DATA_DIR / "ledger.jsonl"))
+
+
+def chain_record(
+    intent_mandate: Optional[Dict[str, Any]],
+    cart_mandate: Dict[str, Any],
+    payment_mandate: Dict[str, Any],
+    payment_result: Dict[str, Any],
+    **extra: Any
+) -> Dict[str, Any]:
+    """Builds the ledger record for one settled Intent -> Cart -> Payment chain."""
+    record = {
+        "intent_mandate": intent_mandate,
+        "cart_mandate": cart_mandate,
+        "payment_mandate": payment_mandate,
+        "payment_result": payment_result,
+    }
+    record.update(extra)
+    return record
+
+
+class MandateLedger:
+    """JSONL ledger file with batched appends and chunked streaming reads."""
+
+    def __init__(self, path: Path = DEFAULT_LEDGER_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Appends records in a single write. Returns the number written."""
+        lines = [json.dumps(record, separators=(",", ":")) for record in records]
+        if not lines:
+            return 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def iter_chunks(self, chunk_size: int = 10_000) -> Iterator[List[Dict[str, Any]]]:
+        """Streams the ledger in lists of up to `chunk_size` parsed records."""
+        if not self.path.exists():
+            return
+        chunk: List[Dict[str, Any]] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    logger.error(f"Skipping corrupt ledger line {line_no}: {e}")
+                    continue
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def byte_ranges(self, chunk_bytes: int = 8 << 20) -> Iterator[Tuple[int, int]]:
+        """
+        Splits the ledger into (start, end) byte ranges of about `chunk_bytes`,
+        each ending on a line boundary.
+
+        Bulk jobs hand these to worker processes, which read their own range
+        with `iter_range`, so no record data passes through the parent.
+        """
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        with open(self.path, "rb") as f:
+            start = 0
+            while start < size:
+                f.seek(min(start + chunk_bytes, size))
+                f.readline()  # finish the line the cut landed in
+                end = min(f.tell(), size)
+                yield start, end
+                start = end
+
+    def iter_range(self, start: int, end: int) -> Iterator[bytes]:
+        """Yields the raw lines in [start, end) (a range from `byte_ranges`)."""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            position = start
+            while position < end:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                yield line
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+
+default_ledger = MandateLedger()
@@ -0,0 +1,441 @@
+"""
+Append-only event log of mandate state transitions, with snapshots.
+
+The tools used to overwrite `intent_mandate`, `cart_mandate`,
+`payment_mandate` and `payment_result` in session state, so a revised choice
+or a retry lost the earlier mandates. Every write now also appends an event
+to `events.jsonl`, so the full history of a session is kept:
+
+    {"seq":42,"ts":1767225600.0,"session":"s1","user":"donor_1","key":"cart_mandate","value":{...}}
+
+`value` is always the last field. Replay splits it off without parsing it and
+keeps the raw JSON text; a value is only decoded when a session's state is
+read. Once at least `snapshot_every` events (and at least as many events as
+there are live keys, so snapshot cost stays constant per event) have been
+appended, the latest value of each key for every live session is written to
+`snapshot.tsv` and atomically swapped in. Its header records the log offset
+it covers; each line is `session, user, key, seq, ts, raw value` separated by
+tabs, which JSON never leaves unescaped. Recovery loads the snapshot and
+replays only the events after it, so its cost depends on the live state, not
+on how long the history is.
+
+`record()` only updates the in-memory index and queues the event; it never
+touches the disk, so tools can call it on the event loop. A writer thread
+appends whatever is queued in one write, flushes it to the OS and, when one is
+due, writes the snapshot, all off the loop. Events queued in the last moments
+before a process crash can be lost; `flush()` (called by `close()` and at
+exit) waits until everything queued is written. Set
+AFARA_MANDATE_EVENTS_FSYNC=1 to also fsync each batch so it survives power
+loss.
+
+Recovery is deliberately not incremental: it loads the whole snapshot, about
+2 s for 100k live sessions, once per process. The serving runtime does it on
+a worker thread before accepting turns, so it never stalls the event loop;
+loading sessions lazily would put a file read on the path of every first
+tool call of a session instead.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Mapping, Optional, Tuple
+
+from femtech_empowerment_funding_advisor.data.ledger import DATA_DIR
+from femtech_empowerment_funding_advisor.tools.clock import clock
+from femtech_empowerment_funding_advisor.tools.mandates import session_scope, user_scope
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = Path(os.environ.get("AFARA_MANDATE_EVENTS_DIR", DATA_DIR / "mandate_events"))
+
+_VALUE_MARKER = ',"value":'
+_SEPARATORS = (",", ":")
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n"})
+
+
+def _escape(text: str) -> str:
+    return text.translate(_ESCAPES) if ("\t" in text or "\n" in text or "\\" in text) else text
+
+
+def _unescape(text: str) -> str:
+    return text.encode("latin-1", "backslashreplace").decode("unicode_escape") if "\\" in text else text
+
+
+def _parse_line(line: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Splits an event line into its parsed header and the raw JSON of its value.
+
+    Strings are JSON-escaped, so the first `,"value":` is always the real field.
+
+    Raises:
+        ValueError: if the line is not a complete event.
+    """
+    head, marker, rest = line.rstrip("\n").partition(_VALUE_MARKER)
+    if not marker or not rest.endswith("}"):
+        raise ValueError("incomplete event line")
+    return json.loads(head + "}"), rest[:-1]
+
+
+class MandateEventLog:
+    """
+    Event log plus an in-memory index of the latest raw value per (user, session, key).
+
+    State is indexed by user as well as session, so a session id reused by
+    another donor never sees the earlier donor's mandates.
+
+    Opens lazily (recovering from `root`) on first use; tests and tools can
+    point it elsewhere with `open(root)`.
+    """
+
+    def __init__(self, root: Path = EVENTS_DIR, snapshot_every: Optional[int] = None, retention_s: Optional[float] = None):
+        self.root = Path(root)
+        self.snapshot_every = snapshot_every or int(os.environ.get("AFARA_MANDATE_SNAPSHOT_EVERY", "5000"))
+        # Sessions idle this long are left out of snapshots (their events stay in the log)
+        self.retention_s = retention_s or float(os.environ.get("AFARA_MANDATE_RETENTION_S", 30 * 86_400))
+        self.fsync = os.environ.get("AFARA_MANDATE_EVENTS_FSYNC") == "1"
+        # (user, session) -> key -> (seq, ts, user, raw value JSON)
+        self._sessions: Dict[Tuple[str, str], Dict[str, Tuple[int, float, str, str]]] = {}
+        self._entries = 0
+        self._seq = 0
+        self._since_snapshot = 0
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.RLock()
+        # Event lines queued by record() for the writer thread
+        self._pending: List[str] = []
+        self._pending_events = 0
+        self._wakeup = threading.Condition(self._lock)
+        # Held while writing; always taken before `_lock`, never while holding it
+        self._io_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def events_path(self) -> Path:
+        return self.root / "events.jsonl"
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.root / "snapshot.tsv"
+
+    def open(self, root: Optional[Path] = None) -> Dict[str, Any]:
+        """(Re)opens the log, at `root` if given, recovering its state. Returns recovery stats."""
+        self.close()
+        with self._lock:
+            if root is not None:
+                self.root = Path(root)
+            stats = self._recover()
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.events_path, "a", encoding="utf-8")
+            self._stopping = False
+            self._writer = threading.Thread(target=self._write_loop, name="afara-mandate-events", daemon=True)
+            self._writer.start()
+            return stats
+
+    def close(self) -> None:
+        """Writes everything queued, then stops the writer thread and closes the log."""
+        writer = self._writer
+        if writer is not None:
+            with self._lock:
+                self._stopping = True
+                self._wakeup.notify_all()
+            writer.join()
+            self._writer = None
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def ensure_open(self) -> None:
+        """Opens (and recovers) the log if that has not happened yet."""
+        if self._file is None:
+            self.open()
+
+    def flush(self) -> None:
+        """Blocks until every recorded event is written (and fsynced if configured)."""
+        self._drain()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._stopping:
+                    self._wakeup.wait()
+                if self._stopping:
+                    # close() writes whatever is left
+                    return
+            try:
+                self._drain()
+            except OSError as e:
+                logger.error(f"Writing mandate events failed, retrying: {e}")
+                time.sleep(1.0)
+
+    def _drain(self, force_snapshot: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Writes the queued events in one append and, if one is due (or forced),
+        a snapshot covering exactly those events.
+
+        Returns:
+            Snapshot stats if a snapshot was written, else None.
+        """
+        with self._io_lock:
+            with self._lock:
+                if self._file is None:
+                    return None
+                batch, self._pending = self._pending, []
+                count, self._pending_events = self._pending_events, 0
+                self._since_snapshot += count
+                # Taken together with the batch, so the copy matches the log
+                # once the batch is written
+                capture = None
+                if force_snapshot or (count and self._since_snapshot >= max(self.snapshot_every, self._entries)):
+                    capture = self._capture_snapshot()
+
+            if batch:
+                try:
+                    self._file.write("".join(batch))
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                except OSError:
+                    with self._lock:
+                        self._pending[:0] = batch
+                        self._pending_events += count
+                    raise
+            if capture is None:
+                return None
+            return self._write_snapshot(capture, os.fstat(self._file.fileno()).st_size)
+
+    def _recover(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self._sessions = {}
+        self._entries = 0
+        self._seq = 0
+        offset = 0
+        snapshot_entries = 0
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                sessions = self._sessions
+                for line in f:
+                    session, user, key, seq, ts, raw = line.rstrip("\n").split("\t", 5)
+                    user = _unescape(user)
+                    sessions.setdefault((user, _unescape(session)), {})[_unescape(key)] = (int(seq), float(ts), user, raw)
+                    snapshot_entries += 1
+                self._entries = snapshot_entries
+            offset = header["offset"]
+            self._seq = header["seq"]
+
+        replayed = self._replay_from(offset)
+        self._since_snapshot = replayed
+        stats = {
+            "snapshot_entries": snapshot_entries,
+            "replayed_events": replayed,
+            "sessions": len(self._sessions),
+            "seq": self._seq,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        logger.info(f"Recovered mandate state: {stats}")
+        return stats
+
+    def _replay_from(self, offset: int) -> int:
+        """Applies the events after `offset`, dropping a torn final line. Returns the count."""
+        if not self.events_path.exists():
+            return 0
+        replayed = 0
+        with open(self.events_path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for line_bytes in f:
+                if not line_bytes.endswith(b"\n"):
+                    # Crash mid-write: cut the partial event so later appends start on a clean line
+                    logger.warning(f"Truncating partial mandate event at byte {position}")
+                    f.close()
+                    os.truncate(self.events_path, position)
+                    break
+                position += len(line_bytes)
+                try:
+                    event, raw = _parse_line(line_bytes.decode("utf-8"))
+                except (ValueError, UnicodeDecodeError) as e:
+                    logger.error(f"Skipping corrupt mandate event at byte {position - len(line_bytes)}: {e}")
+                    continue
+                self._apply(event, raw)
+                replayed += 1
+        return replayed
+
+    def _apply(self, event: Mapping[str, Any], raw: str) -> None:
+        seq = event["seq"]
+        keys = self._sessions.setdefault((event["user"], event["session"]), {})
+        if raw == "null":
+            if keys.pop(event["key"], None) is not None:
+                self._entries -= 1
+        else:
+            if event["key"] not in keys:
+                self._entries += 1
+            keys[event["key"]] = (seq, event["ts"], event["user"], raw)
+        if seq > self._seq:
+            self._seq = seq
+
+    def record(self, session: str, user: str, values: Mapping[str, Any]) -> int:
+        """
+        Records one event per key in `values` (None clears a key) and queues
+        them for the writer thread as a single write.
+
+        Returns:
+            The sequence number of the last event.
+        """
+        with self._lock:
+            self.ensure_open()
+            ts = clock.now()
+            lines = []
+            for key, value in values.items():
+                self._seq += 1
+                header = json.dumps(
+                    {"seq": self._seq, "ts": ts, "session": session, "user": user, "key": key},
+                    separators=_SEPARATORS
+                )
+                raw = json.dumps(value, separators=_SEPARATORS, default=str)
+                lines.append(f"{header[:-1]}{_VALUE_MARKER}{raw}}}\n")
+                self._apply({"seq": self._seq, "ts": ts, "session": session, "user": user, "key": key}, raw)
+
+            self._pending.append("".join(lines))
+            self._pending_events += len(lines)
+            self._wakeup.notify()
+            return self._seq
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Writes everything queued, then the latest value of every live key, swapped in atomically."""
+        self.ensure_open()
+        return self._drain(force_snapshot=True)
+
+    def _capture_snapshot(self) -> Tuple[int, List[Tuple[Tuple[str, str], list]], int]:
+        """
+        Drops idle sessions and copies the index for `_write_snapshot`.
+
+        Called with `_lock` held. Only the per-session key lists are copied;
+        the entries are immutable tuples and the raw values are shared.
+        """
+        cutoff = clock.now() - self.retention_s
+        idle = [s for s, keys in self._sessions.items() if max((v[1] for v in keys.values()), default=0) < cutoff]
+        for session in idle:
+            self._entries -= len(self._sessions.pop(session))
+        self._since_snapshot = 0
+        sessions = [(session, list(keys.items())) for session, keys in self._sessions.items()]
+        return self._seq, sessions, len(idle)
+
+    def _write_snapshot(self, capture: Tuple[int, List[Tuple[Tuple[str, str], list]], int], offset: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        seq, sessions, dropped = capture
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        entries = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": seq, "offset": offset, "sessions": len(sessions)}) + "\n")
+            for (_, session), keys in sessions:
+                session = _escape(session)
+                f.writelines(
+                    f"{session}\t{_escape(user)}\t{_escape(key)}\t{key_seq}\t{ts!r}\t{raw}\n"
+                    for key, (key_seq, ts, user, raw) in keys
+                )
+                entries += len(keys)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        stats = {"entries": entries, "dropped_sessions": dropped, "offset": offset,
+                 "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+        logger.info(f"Mandate snapshot written: {stats}")
+        return stats
+
+    def state(self, session: str, user: str) -> Dict[str, Any]:
+        """Current mandate state of a user's session (decoded copies)."""
+        with self._lock:
+            self.ensure_open()
+            keys = dict(self._sessions.get((user, session), {}))
+        return {key: json.loads(raw) for key, (_, _, _, raw) in keys.items()}
+
+    def value(self, session: str, user: str, key: str) -> Optional[Any]:
+        """Current value of one key of a user's session, or None."""
+        with self._lock:
+            self.ensure_open()
+            entry = self._sessions.get((user, session), {}).get(key)
+        return json.loads(entry[3]) if entry is not None else None
+
+    def history(self, session: str, user: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Every recorded transition of a session (of one user's, if given), oldest first.
+
+        Scans the whole log; meant for audits and debugging, not the hot path.
+        """
+        self.ensure_open()
+        self.flush()
+        events = []
+        for event, raw in self._iter_events():
+            if event["session"] == session and (user is None or event["user"] == user):
+                events.append({**event, "value": json.loads(raw)})
+        return events
+
+    def _iter_events(self) -> Iterator[Tuple[Dict[str, Any], str]]:
+        if not self.events_path.exists():
+            return
+        with open(self.events_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield _parse_line(line)
+                except ValueError:
+                    continue
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "seq": self._seq,
+                "sessions": len(self._sessions),
+                "live_keys": self._entries,
+                "events_since_snapshot": self._since_snapshot + self._pending_events,
+                "pending_events": self._pending_events,
+                "log_bytes": self.events_path.stat().st_size if self.events_path.exists() else 0,
+            }
+
+
+mandate_events = MandateEventLog()
+atexit.register(mandate_events.close)
+
+
+def put_state(tool_context: Any, values: Mapping[str, Any]) -> None:
+    """
+    Writes mandate values to session state and records the transitions.
+
+    Without a real session id nothing is recorded: the values could not be
+    attributed to a session on restore.
+    """
+    for key, value in values.items():
+        tool_context.state[key] = value
+    session = session_scope(tool_context)
+    if session is None:
+        logger.warning("Tool context has no session id; mandate transitions are not recorded")
+        return
+    mandate_events.record(session, user_scope(tool_context), values)
+
+
+def get_state(tool_context: Any, key: str) -> Optional[Any]:
+    """
+    Reads a mandate from session state, falling back to the event log.
+
+    After a crash or restart the session service may have lost the state; the
+    recovered value is written back into session state. Only values recorded
+    by the same user for the same session are restored.
+    """
+    value = tool_context.state.get(key)
+    if value is not None:
+        return value
+    session = session_scope(tool_context)
+    if session is None:
+        return None
+    value = mandate_events.value(session, user_scope(tool_context), key)
+    if value is not None:
+        logger.info(f"Restored {key} for session {session} from the event log")
+        tool_context.state[key] = value
+    return value
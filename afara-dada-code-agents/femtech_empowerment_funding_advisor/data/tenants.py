@@ -0,0 +1,240 @@
+"""
+Partner-curated views of the initiative registry.
+
+Partner portals (a corporate CSR program, a DAO, a foundation) each offer
+their own vetted subset of the registry. A tenant is described only by its
+delta from the shared registry: which initiatives it includes or excludes and
+which it features first. A `RegistryView` answers lookups from the shared
+registry's own indexes and keeps only the regions its delta changes, as
+tuples of the shared records (never copies), so a tenant costs memory
+proportional to its delta rather than to the dataset.
+
+The tenant for a session comes from session state (`TENANT_STATE_KEY`),
+set by the portal when it creates the session; sessions without one see the
+full public registry. Each view has its own `version`, which caches key on in
+place of `REGISTRY_VERSION` so tenants never share cached answers.
+
+Extra tenants can be loaded from a JSON file named by AFARA_TENANTS_PATH:
+
+    {"acme-csr": {"name": "Acme CSR", "include": ["she-code-africa"], "featured": []}}
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import (
+    INITIATIVES_DB,
+    REGISTRY_VERSION,
+    get_initiative,
+    locate_initiative,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session-state key the portal sets to select a tenant
+TENANT_STATE_KEY = "tenant_id"
+DEFAULT_TENANT = "public"
+
+
+@dataclass(frozen=True)
+class TenantSpec:
+    """A tenant's delta from the shared registry (initiative IDs only)."""
+    tenant_id: str
+    name: str
+    # None means every initiative in the registry
+    include: Optional[Tuple[str, ...]] = None
+    exclude: Tuple[str, ...] = ()
+    # Listed first within their region, in this order
+    featured: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, tenant_id: str, raw: Mapping[str, Any]) -> "TenantSpec":
+        include = raw.get("include")
+        return cls(
+            tenant_id=tenant_id,
+            name=str(raw.get("name") or tenant_id),
+            include=tuple(include) if include is not None else None,
+            exclude=tuple(raw.get("exclude") or ()),
+            featured=tuple(raw.get("featured") or ()),
+        )
+
+    def unknown_ids(self) -> List[str]:
+        """IDs in the spec that are not in the registry."""
+        ids = (*(self.include or ()), *self.exclude, *self.featured)
+        return sorted({org_id for org_id in ids if get_initiative(org_id) is None})
+
+
+# Example partner portals for the demo
+BUILTIN_TENANTS = {
+    spec.tenant_id: spec
+    for spec in (
+        TenantSpec(DEFAULT_TENANT, "Afara Dada public registry"),
+        TenantSpec(
+            "corporate-csr",
+            "Corporate CSR program (Kenya focus)",
+            include=("pwani-teknowgalz", "tambua-women-in-tech", "she-code-africa"),
+            featured=("pwani-teknowgalz",),
+        ),
+        TenantSpec(
+            "dao",
+            "Community DAO treasury",
+            exclude=("women-in-tech-africa",),
+            featured=("empower-her-community",),
+        ),
+        TenantSpec(
+            "foundation",
+            "Foundation grants portal (continental programs)",
+            include=("she-code-africa", "women-in-tech-africa", "empower-her-community"),
+        ),
+    )
+}
+
+
+class RegistryView:
+    """
+    One tenant's read-only view of the registry.
+
+    Records are the shared registry dicts; callers must not mutate them.
+    """
+
+    def __init__(self, spec: TenantSpec):
+        self.spec = spec
+
+    @property
+    def tenant_id(self) -> str:
+        return self.spec.tenant_id
+
+    @cached_property
+    def version(self) -> str:
+        """Registry version for this view; the public view keeps `REGISTRY_VERSION`."""
+        if self.spec == BUILTIN_TENANTS[DEFAULT_TENANT]:
+            return REGISTRY_VERSION
+        delta = json.dumps([self.spec.include, self.spec.exclude, self.spec.featured])
+        return hashlib.sha256(f"{REGISTRY_VERSION}:{delta}".encode("utf-8")).hexdigest()[:12]
+
+    @cached_property
+    def _include(self) -> Optional[FrozenSet[str]]:
+        return frozenset(self.spec.include) if self.spec.include is not None else None
+
+    @cached_property
+    def _exclude(self) -> FrozenSet[str]:
+        return frozenset(self.spec.exclude)
+
+    def _visible(self, org_id: str) -> bool:
+        return (self._include is None or org_id in self._include) and org_id not in self._exclude
+
+    @cached_property
+    def _region_overrides(self) -> Dict[str, Tuple[Dict[str, Any], ...]]:
+        """
+        Member lists of the regions the delta changes, built from the delta's
+        IDs alone. Every other region is read straight from the registry (or
+        is empty, for a view with an include list).
+        """
+        spec = self.spec
+        if spec.include is None:
+            touched = {position[0] for position in map(locate_initiative, (*spec.exclude, *spec.featured)) if position}
+            candidates = {region: INITIATIVES_DB[region] for region in touched}
+        else:
+            candidates: Dict[str, List[Dict[str, Any]]] = {}
+            known = [org_id for org_id in set(spec.include) if locate_initiative(org_id) is not None]
+            for org_id in sorted(known, key=locate_initiative):
+                candidates.setdefault(locate_initiative(org_id)[0], []).append(get_initiative(org_id))
+
+        rank = {org_id: i for i, org_id in enumerate(spec.featured)}
+        overrides = {}
+        for region, records in candidates.items():
+            members = [record for record in records if self._visible(record["id"])]
+            # Stable sort: featured first, everything else keeps registry order
+            members.sort(key=lambda record: rank.get(record["id"], len(rank)))
+            overrides[region] = tuple(members)
+        return overrides
+
+    def _region_records(self, region: str) -> Sequence[Dict[str, Any]]:
+        override = self._region_overrides.get(region)
+        if override is not None:
+            return override
+        return () if self.spec.include is not None else INITIATIVES_DB.get(region, ())
+
+    def iter_initiatives(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yields (region, initiative) for every record in the view."""
+        for region in INITIATIVES_DB:
+            for record in self._region_records(region):
+                yield region, record
+
+    def get_initiative(self, org_id_or_name: str) -> Optional[Dict[str, Any]]:
+        """Returns the initiative with the given ID or (case-insensitive) name, or None."""
+        record = get_initiative(org_id_or_name)
+        return record if record is not None and self._visible(record["id"]) else None
+
+    def get_initiatives_by_region(self, region: str) -> List[Dict[str, Any]]:
+        """Returns the view's initiatives for a region ('africa' for all of them)."""
+        if region.lower() == "africa":
+            return [record for _, record in self.iter_initiatives()]
+        return list(self._region_records(region.lower()))
+
+
+_tenants: Dict[str, TenantSpec] = dict(BUILTIN_TENANTS)
+_views: Dict[str, RegistryView] = {}
+_lock = threading.Lock()
+
+
+def register_tenant(spec: TenantSpec) -> None:
+    """Adds or replaces a tenant. Its view is rebuilt on next use."""
+    unknown = spec.unknown_ids()
+    if unknown:
+        raise ValueError(f"Tenant '{spec.tenant_id}' references unknown initiatives: {unknown}")
+    with _lock:
+        _tenants[spec.tenant_id] = spec
+        _views.pop(spec.tenant_id, None)
+
+
+def load_tenants(path: str) -> int:
+    """Registers every tenant in a JSON file. Returns how many were loaded."""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    for tenant_id, fields in raw.items():
+        register_tenant(TenantSpec.from_dict(tenant_id, fields))
+    logger.info(f"Loaded {len(raw)} tenant(s) from {path}")
+    return len(raw)
+
+
+def get_registry_view(tenant_id: Optional[str] = None) -> RegistryView:
+    """
+    Returns the view for a tenant (the public registry if `tenant_id` is empty).
+
+    Raises:
+        KeyError: if the tenant is not registered.
+    """
+    tenant_id = tenant_id or DEFAULT_TENANT
+    view = _views.get(tenant_id)
+    if view is not None:
+        return view
+    with _lock:
+        if tenant_id not in _views:
+            _views[tenant_id] = RegistryView(_tenants[tenant_id])
+        return _views[tenant_id]
+
+
+def view_for_context(context: Any) -> RegistryView:
+    """
+    Returns the view selected by a tool or callback context's session state.
+
+    Raises:
+        KeyError: if the session names a tenant that is not registered.
+    """
+    state = getattr(context, "state", None) if context is not None else None
+    return get_registry_view(state.get(TENANT_STATE_KEY) if state is not None else None)
+
+
+def tenant_ids() -> List[str]:
+    return sorted(_tenants)
+
+
+if os.environ.get("AFARA_TENANTS_PATH"):
+    load_tenants(os.environ["AFARA_TENANTS_PATH"])
@@ -5,12 +5,23 @@ This agent acts as the "Trust Verification Layer" before any transaction occurs.
 
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool
-from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import find_tech_initiatives, save_user_choice
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import (
+    compare_initiatives,
+    find_tech_initiatives,
+    save_user_choice,
+)
+from femtech_empowerment_funding_advisor.tools.impact_tools import get_impact_updates
+from femtech_empowerment_funding_advisor.runtime.resilience import resilient_model
+from femtech_empowerment_funding_advisor.tools.context_compaction import compact_context_before_model_callback
+from femtech_empowerment_funding_advisor.tools.discovery_cache import (
+    discovery_before_model_callback,
+    discovery_after_model_callback,
+)
 
 
 finding_agent = Agent(
     name="finding_agent",
-    model="gemini-3-pro-preview",
+    model=resilient_model(),
     description="Researches verified African female tech empowerment programs and creates a funding intent mandate.",
 
     instruction="""You are a specialized Research & Trust Analyst for the African Tech Ecosystem.
@@ -21,12 +32,22 @@ Your workflow is strictly defined to ensure donor safety:
    When the user asks to support women in tech or mentions a specific African region (e.g., "East Africa", "Global Diaspora", "Pan-Africa"), use the `find_tech_initiatives` tool.
    - Do NOT search the open web. Only use the trusted tool.
    - Input the specific region requested by the user.
+   - Donors may come through a partner portal that offers its own subset of the registry. Only recommend initiatives the tools return in this session.
 
 2. **Presentation:**
    The tool will return a list of verified organizations with specific trust metrics (Efficiency, Impact, Verification Source).
    - Present these details clearly to the user so they can make an informed decision.
    - Highlight the "Verification Source" to prove these are legitimate entities.
 
+   **Comparing:** When the user wants to compare or rank initiatives, call `compare_initiatives` instead of weighing the metrics yourself.
+   - `org_ids`: The IDs (from `raw_data`) or exact names of the initiatives to compare; an empty list ranks every verified initiative.
+   - `weights` (optional): How much the user cares about "rating", "efficiency" and "reach", e.g. {"efficiency": 2, "rating": 1}.
+   - Present the returned ranked table as-is; do not recompute scores.
+
+   **Fund usage:** When the user asks how an organization is using its funds or for recent updates, call `get_impact_updates` with the organization's ID or name.
+   - Report the totals, the main spending categories and the latest updates it returns.
+   - If it returns "not_found", say the organization has not reported updates yet; do not guess.
+
 3. **Intent Creation (Action):**
    When the user selects an organization and specifies an amount, use the `save_user_choice` tool to record their decision.
    
@@ -60,6 +81,13 @@ specialist agent.
 
     tools=[
         FunctionTool(func=find_tech_initiatives),
+        FunctionTool(func=compare_initiatives),
+        FunctionTool(func=get_impact_updates),
         FunctionTool(func=save_user_choice)
-    ]
+    ],
+
+    # Repeated discovery questions are answered from cached tool results without
+    # a model call; otherwise the history is compacted to the token budget before it is sent
+    before_model_callback=[discovery_before_model_callback, compact_context_before_model_callback],
+    after_model_callback=discovery_after_model_callback
 )
\ No newline at end of file
@@ -6,10 +6,11 @@ This agent acts as our "Contract Creator" for the funding process.
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool
 from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+from femtech_empowerment_funding_advisor.runtime.resilience import resilient_model
 
 merchant_agent = Agent(
     name="merchant_agent",
-    model="gemini-3-pro-preview",
+    model=resilient_model(),
     description="Creates formal, signed CartMandates for African Female Tech Empowerment Programs and NGO's funding following W3C PaymentRequest standards.",
 
     instruction="""You are a Transaction Specialist responsible for creating formal, signed funding offers (CartMandates).
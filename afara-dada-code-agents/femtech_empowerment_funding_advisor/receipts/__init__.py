@@ -0,0 +1,3 @@
+"""
+Receipts - Bulk donation receipts rendered from the settlement ledger.
+"""
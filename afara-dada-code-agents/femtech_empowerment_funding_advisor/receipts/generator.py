@@ -0,0 +1,250 @@
+"""
+Bulk donation receipts from the settlement ledger.
+
+The ledger is split into line-aligned byte ranges. Each range is rendered by a
+worker process: the worker reads its range from disk, keeps completed
+transactions (optionally for one year), renders them with a precompiled
+template and writes one output file per range. Only small per-range summaries
+travel back to the parent, and at most two ranges per worker are in flight,
+so memory stays bounded however large the ledger is.
+
+Only `payment_result` is needed for a receipt (transaction ID, recipient,
+amount, currency, timestamp), so it is decoded on its own rather than parsing
+the whole mandate chain.
+
+Output: `receipts-000001.txt` (or .html / .pdf), ... plus `manifest.jsonl`
+listing each file with its receipt count, transaction ID range and totals.
+
+Usage:
+    python -m femtech_empowerment_funding_advisor.receipts.generator --ledger var/ledger.jsonl \
+        --out var/receipts/2026 --year 2026 --format html --workers 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from femtech_empowerment_funding_advisor.data.ledger import DEFAULT_LEDGER_PATH, MandateLedger
+from femtech_empowerment_funding_advisor.receipts.templates import ISSUER, TEMPLATES, TEXT_TEMPLATE, render_pdf
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("text", "html", "pdf")
+_RESULT_KEY = '"payment_result":'
+_decoder = json.JSONDecoder()
+
+
+def _payment_result(line: str) -> Optional[Dict[str, Any]]:
+    """Decodes just the `payment_result` of a ledger line (None if unreadable)."""
+    index = line.rfind(_RESULT_KEY)
+    try:
+        if index >= 0:
+            result, _ = _decoder.raw_decode(line, index + len(_RESULT_KEY))
+            return result if isinstance(result, dict) else None
+        return json.loads(line).get("payment_result")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _amount(payment_result: Dict[str, Any]) -> Money:
+    currency = payment_result.get("currency", "USD")
+    if "amount_minor" in payment_result:
+        return Money(payment_result["amount_minor"], currency)
+    # Records settled before amounts were stored in minor units
+    return Money.from_major(payment_result["amount"], currency)
+
+
+def receipt_fields(payment_result: Dict[str, Any], amount: Optional[Money] = None) -> Dict[str, str]:
+    """Template values for one completed payment."""
+    transaction_id = payment_result["transaction_id"]
+    timestamp = str(payment_result.get("timestamp") or "")
+    amount = amount or _amount(payment_result)
+    return {
+        "receipt_id": f"R-{transaction_id.rsplit('_', 1)[-1]}",
+        "transaction_id": transaction_id,
+        "org": str(payment_result.get("recipient") or ""),
+        "amount": amount.amount_str,
+        "currency": amount.currency,
+        "date": timestamp[:10],
+        "timestamp": timestamp,
+        "issuer": ISSUER,
+    }
+
+
+def render_range(
+    ledger_path: str,
+    start: int,
+    end: int,
+    out_path: str,
+    fmt: str,
+    year: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Renders the receipts for one byte range of the ledger into `out_path`.
+
+    Module-level with plain-data arguments so it can run in a process pool.
+
+    Returns:
+        Summary: receipts written, records skipped, bytes, first/last
+        transaction ID and total minor units per currency.
+    """
+    year_prefix = str(year) if year else None
+    template = TEXT_TEMPLATE if fmt == "pdf" else TEMPLATES[fmt]
+    issued = skipped = 0
+    first_id = last_id = None
+    totals: Counter = Counter()
+    rendered: List[str] = []
+
+    for raw in MandateLedger(Path(ledger_path)).iter_range(start, end):
+        line = raw.decode("utf-8")
+        if not line.strip():
+            continue
+        result = _payment_result(line)
+        if not result or result.get("status") != "completed" or not result.get("transaction_id"):
+            skipped += 1
+            continue
+        if year_prefix and not str(result.get("timestamp", "")).startswith(year_prefix):
+            continue
+        try:
+            amount = _amount(result)
+            values = receipt_fields(result, amount)
+        except (KeyError, ValueError) as e:
+            logger.error(f"Skipping unreadable payment result {result.get('transaction_id')}: {e}")
+            skipped += 1
+            continue
+        rendered.append(template.render(values))
+        totals[amount.currency] += amount.minor
+        first_id = first_id or values["transaction_id"]
+        last_id = values["transaction_id"]
+        issued += 1
+
+    size = 0
+    if issued:
+        if fmt == "pdf":
+            data = render_pdf(rendered)
+            with open(out_path, "wb") as f:
+                f.write(data)
+            size = len(data)
+        else:
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(template.header)
+                f.writelines(rendered)
+                f.write(template.footer)
+                size = f.tell()
+
+    return {
+        "file": Path(out_path).name if issued else None,
+        "receipts": issued,
+        "skipped": skipped,
+        "bytes": size,
+        "first_transaction_id": first_id,
+        "last_transaction_id": last_id,
+        "totals_minor": dict(totals),
+    }
+
+
+@dataclass
+class ReceiptReport:
+    """Summary of a receipt run."""
+    issued: int = 0
+    skipped: int = 0
+    files: int = 0
+    bytes_written: int = 0
+    totals_minor: Counter = field(default_factory=Counter)
+    duration_s: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "issued": self.issued,
+            "skipped": self.skipped,
+            "files": self.files,
+            "bytes_written": self.bytes_written,
+            "totals": {currency: Money(minor, currency).amount_str for currency, minor in self.totals_minor.items()},
+            "duration_s": round(self.duration_s, 3),
+            "receipts_per_s": round(self.issued / self.duration_s, 1) if self.duration_s else 0.0,
+        }
+
+
+def generate_receipts(
+    ledger: MandateLedger,
+    out_dir: Path,
+    fmt: str = "text",
+    year: Optional[int] = None,
+    workers: int = 0,
+    chunk_bytes: int = 8 << 20
+) -> ReceiptReport:
+    """
+    Renders receipts for every completed transaction in the ledger into `out_dir`.
+
+    With `workers` > 0 ranges are rendered across a process pool, with at most
+    two ranges in flight per worker. The manifest is written in ledger order.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown receipt format '{fmt}'; use one of {FORMATS}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    extension = "pdf" if fmt == "pdf" else TEMPLATES[fmt].extension
+    report = ReceiptReport()
+    started = time.perf_counter()
+
+    def jobs() -> Iterable[Tuple[Any, ...]]:
+        for seq, (start, end) in enumerate(ledger.byte_ranges(chunk_bytes), start=1):
+            yield str(ledger.path), start, end, str(out_dir / f"receipts-{seq:06d}.{extension}"), fmt, year
+
+    with open(out_dir / "manifest.jsonl", "w", encoding="utf-8") as manifest:
+        def collect(summary: Dict[str, Any]) -> None:
+            report.issued += summary["receipts"]
+            report.skipped += summary["skipped"]
+            report.bytes_written += summary["bytes"]
+            report.totals_minor.update(summary["totals_minor"])
+            if summary["file"]:
+                report.files += 1
+                manifest.write(json.dumps(summary) + "\n")
+
+        if workers <= 0:
+            for job in jobs():
+                collect(render_range(*job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight: List[Future] = []
+                for job in jobs():
+                    in_flight.append(pool.submit(render_range, *job))
+                    if len(in_flight) >= workers * 2:
+                        collect(in_flight.pop(0).result())
+                for future in in_flight:
+                    collect(future.result())
+
+    report.duration_s = time.perf_counter() - started
+    logger.info(f"Issued {report.issued:,} receipts into {report.files} file(s) in {report.duration_s:.1f} s")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render donation receipts from the settlement ledger.")
+    parser.add_argument("--ledger", type=Path, default=DEFAULT_LEDGER_PATH)
+    parser.add_argument("--out", type=Path, required=True, help="Output directory")
+    parser.add_argument("--format", choices=FORMATS, default="text")
+    parser.add_argument("--year", type=int, help="Only transactions settled in this year")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-mb", type=float, default=8.0, help="Ledger bytes per output file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    report = generate_receipts(
+        MandateLedger(args.ledger), args.out, fmt=args.format, year=args.year,
+        workers=args.workers, chunk_bytes=int(args.chunk_mb * (1 << 20))
+    )
+    print(json.dumps(report.to_dict()))
+
+
+if __name__ == "__main__":
+    main()
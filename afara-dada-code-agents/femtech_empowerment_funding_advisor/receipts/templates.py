@@ -0,0 +1,134 @@
+"""
+Precompiled receipt templates (plain text, HTML, PDF).
+
+Templates use `str.format` fields. They are parsed and checked against
+`RECEIPT_FIELDS` once, when the template is built; rendering is then a single
+C-level `format_map` per receipt. HTML templates get their field values escaped
+before rendering. PDF output is laid out from the plain-text receipt by a small
+built-in writer (one page per receipt, Helvetica), so it needs no extra
+dependency.
+"""
+
+import html
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional
+
+RECEIPT_FIELDS = frozenset({
+    "receipt_id", "transaction_id", "org", "amount", "currency", "date", "timestamp", "issuer"
+})
+ISSUER = "Afara Dada Tech Fund"
+
+
+@lru_cache(maxsize=1024)
+def _escape(value: str) -> str:
+    # Orgs, currencies and dates repeat across receipts, so escaping is cached
+    return html.escape(value, quote=True)
+
+
+def _escape_all(values: Dict[str, str]) -> Dict[str, str]:
+    return {key: _escape(value) for key, value in values.items()}
+
+
+@dataclass
+class ReceiptTemplate:
+    """A receipt body plus the header/footer that wrap each output file."""
+    name: str
+    extension: str
+    body: str
+    header: str = ""
+    footer: str = ""
+    escape: Optional[Callable[[Dict[str, str]], Dict[str, str]]] = None
+    _render: Callable[[Dict[str, str]], str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        fields = {name for _, name, _, _ in Formatter().parse(self.body) if name is not None}
+        unknown = sorted(fields - RECEIPT_FIELDS)
+        if unknown:
+            raise ValueError(f"Template '{self.name}' uses unknown field(s) {unknown}; available: {sorted(RECEIPT_FIELDS)}")
+        self._render = self.body.format_map
+
+    def render(self, values: Dict[str, str]) -> str:
+        return self._render(self.escape(values) if self.escape else values)
+
+
+TEXT_TEMPLATE = ReceiptTemplate(
+    name="text",
+    extension="txt",
+    body=(
+        "{issuer}\n"
+        "DONATION RECEIPT {receipt_id}\n"
+        "\n"
+        "Recipient:       {org}\n"
+        "Amount:          {currency} {amount}\n"
+        "Date:            {date}\n"
+        "Transaction ID:  {transaction_id}\n"
+        "Settled at:      {timestamp}\n"
+        "\n"
+        "Thank you for supporting women in African tech.\n"
+        "\f\n"
+    ),
+)
+
+HTML_TEMPLATE = ReceiptTemplate(
+    name="html",
+    extension="html",
+    header=(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Donation receipts</title>"
+        "<style>body{font-family:sans-serif}section{page-break-after:always;margin:2em}"
+        "th{text-align:left;padding-right:1em}</style></head><body>\n"
+    ),
+    body=(
+        "<section id=\"{receipt_id}\"><h2>{issuer}</h2><h3>Donation receipt {receipt_id}</h3><table>"
+        "<tr><th>Recipient</th><td>{org}</td></tr>"
+        "<tr><th>Amount</th><td>{currency} {amount}</td></tr>"
+        "<tr><th>Date</th><td>{date}</td></tr>"
+        "<tr><th>Transaction ID</th><td>{transaction_id}</td></tr>"
+        "<tr><th>Settled at</th><td>{timestamp}</td></tr>"
+        "</table><p>Thank you for supporting women in African tech.</p></section>\n"
+    ),
+    footer="</body></html>\n",
+    escape=_escape_all,
+)
+
+TEMPLATES = {"text": TEXT_TEMPLATE, "html": HTML_TEMPLATE}
+
+
+def _pdf_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(pages: Iterable[str]) -> bytes:
+    """
+    Builds a PDF with one page per plain-text receipt.
+
+    Text is encoded as Latin-1 (characters outside it become '?').
+    """
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the pages are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for text in pages:
+        lines = text.rstrip("\f\n").split("\n")
+        ops = ["BT /F1 11 Tf 14 TL 56 780 Td"] + [f"({_pdf_text(line)}) '" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,3 @@
+"""
+Runtime - Serving infrastructure for running the agents outside `adk web`.
+"""
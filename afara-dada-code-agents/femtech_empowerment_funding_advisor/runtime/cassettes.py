@@ -0,0 +1,243 @@
+"""
+Cassettes: recorded model calls for deterministic, offline agent runs.
+
+A cassette is a JSONL file with one model call per line: the request (the
+system instruction, tool declarations and conversation contents sent to the
+model), every response the model yielded, and when each response arrived:
+
+    {"key":"3f0c...","model":"gemini-3-pro-preview","request":{...},"responses":[{...}],"offsets_s":[1.84]}
+
+Calls are looked up by a content hash of the request. Values that change on
+every run without changing the conversation are masked before hashing:
+function-call IDs, generated mandate IDs, ISO timestamps, `*_epoch` fields
+and hex digests/signatures. The same request made twice in a conversation
+is replayed in recorded order.
+
+Replay sleeps for the recorded latency by default. `latency_scale` shrinks or
+stretches it (0 replays instantly), and `fixed_latency_s` replaces it with a
+constant per call. `CassetteStats.model_s` is the model time a run spent, so
+wall time minus model time is the overhead of our own code.
+
+The active cassette is process-wide. Set AFARA_CASSETTE (a file path) and
+AFARA_CASSETTE_MODE ("record" or "replay", the default) to activate one at
+startup, or call `use_cassette` from scripts and tests. The model wrapper
+that consults it lives in `runtime.recording`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay")
+
+# ULID-style bodies of `new_id()` IDs, which follow a "prefix_"
+_ID_RE = re.compile(r"(?<![0-9A-Za-z])[0-9A-HJKMNP-TV-Z]{26}(?![0-9A-Za-z])")
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?")
+_DIGEST_RE = re.compile(r"\b[0-9a-f]{32,}\b")
+_SEPARATORS = (",", ":")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when the cassette has no (more) responses for a request."""
+
+
+def _mask_text(text: str) -> str:
+    # Shorter than any timestamp, ID or digest
+    if len(text) < 19:
+        return text
+    return _DIGEST_RE.sub("<digest>", _TIMESTAMP_RE.sub("<ts>", _ID_RE.sub("<id>", text)))
+
+
+def _mask(value: Any) -> Any:
+    if isinstance(value, str):
+        return _mask_text(value)
+    if isinstance(value, dict):
+        masked = {}
+        for k, v in value.items():
+            if k in ("function_call", "function_response") and isinstance(v, dict):
+                # ADK assigns these IDs client-side at random
+                v = {ik: iv for ik, iv in v.items() if ik != "id"}
+            masked[k] = "<epoch>" if k.endswith("_epoch") else _mask(v)
+        return masked
+    if isinstance(value, list):
+        return [_mask(v) for v in value]
+    return value
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Content hash of a model request, with run-specific values masked."""
+    canonical = json.dumps(_mask(request), sort_keys=True, separators=_SEPARATORS, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class Interaction:
+    """One recorded model call."""
+    key: str
+    model: str
+    request: Dict[str, Any]
+    responses: List[Dict[str, Any]]
+    # Seconds from the start of the call to each response
+    offsets_s: List[float]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"key": self.key, "model": self.model, "request": self.request,
+             "responses": self.responses, "offsets_s": [round(o, 4) for o in self.offsets_s]},
+            separators=_SEPARATORS, default=str
+        )
+
+
+@dataclass
+class CassetteStats:
+    """Per-cassette call counters and model time."""
+    calls: int = 0
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+    # Model time spent by this run: live call time when recording, the
+    # (scaled) replayed latency when replaying
+    model_s: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "hits": self.hits, "misses": self.misses,
+                "recorded": self.recorded, "model_s": round(self.model_s, 4)}
+
+
+@dataclass
+class Cassette:
+    """
+    A cassette file opened for recording or replay.
+
+    Recording appends to the file (delete it first to re-record from
+    scratch); replay loads it once.
+    """
+    path: Path
+    mode: str = "replay"
+    latency_scale: float = 1.0
+    fixed_latency_s: Optional[float] = None
+    stats: CassetteStats = field(default_factory=CassetteStats)
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {self.mode!r}; expected one of {MODES}")
+        self.path = Path(self.path)
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Interaction]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        if self.mode == "replay":
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        interaction = Interaction(**json.loads(line))
+                        self._interactions[interaction.key].append(interaction)
+            logger.info(f"Loaded cassette {self.path}: {sum(map(len, self._interactions.values()))} calls")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def next(self, key: str) -> Interaction:
+        """
+        Returns the next recorded call for `key`.
+
+        Raises:
+            CassetteMiss: If the request was never recorded, or was made more
+                often than recorded.
+        """
+        with self._lock:
+            self.stats.calls += 1
+            recorded = self._interactions.get(key, [])
+            cursor = self._cursors[key]
+            if cursor >= len(recorded):
+                self.stats.misses += 1
+                raise CassetteMiss(
+                    f"No recorded model response for request {key} (call {cursor + 1}) in {self.path}; "
+                    f"re-record with AFARA_CASSETTE_MODE=record"
+                )
+            self._cursors[key] = cursor + 1
+            self.stats.hits += 1
+            return recorded[cursor]
+
+    def delays(self, interaction: Interaction) -> List[float]:
+        """Seconds to wait before each replayed response."""
+        if self.fixed_latency_s is not None:
+            delays = [self.fixed_latency_s] + [0.0] * (len(interaction.offsets_s) - 1)
+        else:
+            previous = 0.0
+            delays = []
+            for offset in interaction.offsets_s:
+                delays.append(max(0.0, offset - previous) * self.latency_scale)
+                previous = offset
+        with self._lock:
+            self.stats.model_s += sum(delays)
+        return delays
+
+    def record(self, key: str, model: str, request: Dict[str, Any],
+               responses: Sequence[Dict[str, Any]], offsets_s: Sequence[float]) -> Interaction:
+        """Appends one model call to the cassette file."""
+        interaction = Interaction(key, model, request, list(responses), list(offsets_s))
+        line = interaction.to_json() + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._interactions[key].append(interaction)
+            self.stats.calls += 1
+            self.stats.recorded += 1
+            self.stats.model_s += offsets_s[-1] if offsets_s else 0.0
+        return interaction
+
+    def rewind(self) -> None:
+        """Restarts replay from the first recorded call of every request."""
+        with self._lock:
+            self._cursors.clear()
+            self.stats = CassetteStats()
+
+
+def _from_env() -> Optional[Cassette]:
+    path = os.environ.get("AFARA_CASSETTE")
+    if not path:
+        return None
+    fixed = os.environ.get("AFARA_REPLAY_LATENCY_S")
+    return Cassette(
+        Path(path),
+        mode=os.environ.get("AFARA_CASSETTE_MODE", "replay"),
+        latency_scale=float(os.environ.get("AFARA_REPLAY_LATENCY_SCALE", "1.0")),
+        fixed_latency_s=float(fixed) if fixed else None,
+    )
+
+
+_active: Optional[Cassette] = _from_env()
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _active
+
+
+def set_cassette(cassette: Optional[Cassette]) -> Optional[Cassette]:
+    """Makes `cassette` the active one (None for live calls). Returns the previous one."""
+    global _active
+    previous, _active = _active, cassette
+    return previous
+
+
+@contextmanager
+def use_cassette(path: Path, mode: str = "replay", **kwargs: Any) -> Iterator[Cassette]:
+    """Activates a cassette for the duration of the block."""
+    cassette = Cassette(Path(path), mode=mode, **kwargs)
+    previous = set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous)
+        logger.info(f"Cassette {cassette.path} ({cassette.mode}): {cassette.stats.snapshot()}")
@@ -0,0 +1,164 @@
+"""
+Ingestion of org-reported fund-usage events into the impact store.
+
+Initiatives push events either as JSONL files or to a local HTTP endpoint:
+
+    POST /events                 body: JSONL, or a JSON array of events
+    GET  /orgs/<org_id>/impact   current rollup for one organization
+
+Input is streamed in batches, so a large file never sits in memory. Each batch
+is validated, deduplicated and appended to the per-org time series in one
+write per organization.
+
+Usage:
+    python -m femtech_empowerment_funding_advisor.runtime.impact_ingest --file events.jsonl
+    python -m femtech_empowerment_funding_advisor.runtime.impact_ingest --serve --port 8765
+"""
+
+import argparse
+import json
+import logging
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List
+
+from femtech_empowerment_funding_advisor.data.impact_store import ImpactStore, IngestResult, impact_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5_000
+# Larger pushes should be sent as several requests (or as a file)
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+_UNPARSEABLE = object()
+
+
+def _parse_lines(lines: Iterable[str | bytes]) -> Iterator[Any]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield _UNPARSEABLE
+
+
+def ingest_events(
+    events: Iterable[Any],
+    store: ImpactStore = impact_store,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> IngestResult:
+    """Ingests parsed events in batches of `batch_size`."""
+    result = IngestResult()
+    iterator = iter(events)
+    position = 0
+    while True:
+        batch: List[Any] = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        for i, event in enumerate(batch):
+            if event is _UNPARSEABLE:
+                result.reject(position + i, "Line is not valid JSON")
+                batch[i] = None
+        batch_result = store.ingest(batch, start=position)
+        result.merge(batch_result)
+        position += len(batch)
+    return result
+
+
+def ingest_jsonl(
+    path: Path,
+    store: ImpactStore = impact_store,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> IngestResult:
+    """Streams a JSONL file of events into the store."""
+    with open(path, "rb") as f:
+        return ingest_events(_parse_lines(f), store, batch_size)
+
+
+class ImpactRequestHandler(BaseHTTPRequestHandler):
+    """Local endpoint for org pushes and rollup lookups."""
+
+    store: ImpactStore = impact_store
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/events":
+            self._send_json(404, {"status": "error", "message": f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"status": "error", "message": f"Body exceeds {MAX_BODY_BYTES} bytes"})
+            return
+
+        body = self.rfile.read(length)
+        if body.lstrip()[:1] == b"[":
+            try:
+                events: Iterable[Any] = json.loads(body)
+            except json.JSONDecodeError as e:
+                self._send_json(400, {"status": "error", "message": f"Invalid JSON array: {e}"})
+                return
+        else:
+            events = _parse_lines(body.splitlines())
+
+        result = ingest_events(events, self.store)
+        self._send_json(200, {"status": "success", **result.to_dict()})
+
+    def do_GET(self) -> None:
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "orgs" or parts[2] != "impact":
+            self._send_json(404, {"status": "error", "message": f"Unknown path: {self.path}"})
+            return
+        summary = self.store.summary(parts[1])
+        if summary is None:
+            self._send_json(404, {"status": "not_found", "message": f"No updates for '{parts[1]}'"})
+            return
+        self._send_json(200, {"status": "success", **summary})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, store: ImpactStore = impact_store) -> None:
+    handler = type("BoundImpactRequestHandler", (ImpactRequestHandler,), {"store": store})
+    with ThreadingHTTPServer((host, port), handler) as server:
+        logger.info(f"Accepting impact events on http://{host}:{port}/events")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest org-reported fund-usage events.")
+    parser.add_argument("--file", type=Path, action="append", default=[], help="JSONL file of events (repeatable)")
+    parser.add_argument("--serve", action="store_true", help="Run the local HTTP endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if not args.file and not args.serve:
+        parser.error("nothing to do: pass --file and/or --serve")
+
+    # Load what is already stored so re-sent events are recognised as duplicates
+    logger.info(f"Loaded {impact_store.refresh()} stored events")
+    for path in args.file:
+        result = ingest_jsonl(path, batch_size=args.batch_size)
+        print(json.dumps({"file": str(path), **result.to_dict()}))
+    if args.serve:
+        serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Offloading of blocking and CPU-bound work from the event loop.
+
+Tools call `run_blocking` for hashing/signing and Pydantic validation. When the
+serving runtime has installed executors the work runs off the event loop;
+otherwise (e.g. under `adk web`) it simply runs inline, so tools behave the
+same everywhere.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_thread_executor: Optional[Executor] = None
+_process_executor: Optional[Executor] = None
+
+
+def install_executors(thread_executor: Optional[Executor], process_executor: Optional[Executor] = None) -> None:
+    """Installs the executors used by `run_blocking` and `run_cpu_bound` (None to run inline)."""
+    global _thread_executor, _process_executor
+    _thread_executor = thread_executor
+    _process_executor = process_executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a short blocking call on the installed thread pool.
+
+    Suitable for work that touches non-picklable objects (Pydantic models,
+    tool state). Runs inline if no thread pool is installed.
+    """
+    if _thread_executor is None:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_thread_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Runs a CPU-heavy call on the installed process pool.
+
+    `fn` and its arguments must be picklable (module-level functions and plain
+    data). Falls back to the thread pool, then inline, when no process pool is
+    configured.
+    """
+    if _process_executor is None:
+        return await run_blocking(fn, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_executor, fn, *args)
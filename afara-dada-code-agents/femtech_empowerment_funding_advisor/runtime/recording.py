@@ -0,0 +1,98 @@
+"""
+Record/replay wrapper for the agents' models.
+
+`CassetteLlm` is an ADK `BaseLlm` that forwards to the wrapped model unless a
+cassette (see `runtime.cassettes`) is active. When recording, it captures
+every response the wrapped model yields, function calls included. When
+replaying, it serves the recorded responses and never touches the network.
+
+`resilient_model()` and `Naive_Agent` are wrapped, so `root_agent`
+conversations and the naive baseline can both be recorded once against live
+Gemini and then re-run offline:
+
+    AFARA_CASSETTE=cassettes/demo.jsonl AFARA_CASSETTE_MODE=record python scripts/replay_conversation.py
+    AFARA_CASSETTE=cassettes/demo.jsonl AFARA_REPLAY_LATENCY_SCALE=0 python scripts/replay_conversation.py
+
+With no active cassette the wrapper is a plain pass-through.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from femtech_empowerment_funding_advisor.runtime.cassettes import active_cassette, request_key
+
+logger = logging.getLogger(__name__)
+
+
+def _dump(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def request_payload(llm_request: LlmRequest) -> Dict[str, Any]:
+    """
+    The parts of a request that decide the model's answer.
+
+    The model name is left out, so a cassette still matches when a call is
+    served by a fallback tier or AFARA_MODEL changes.
+    """
+    config = llm_request.config
+    return {
+        "system_instruction": _dump(config.system_instruction) if config else None,
+        "tools": [_dump(tool) for tool in (config.tools or [])] if config else [],
+        "contents": [_dump(content) for content in llm_request.contents],
+    }
+
+
+class CassetteLlm(BaseLlm):
+    """A `BaseLlm` that records or replays the calls made to `inner`."""
+
+    inner: BaseLlm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cassette = active_cassette()
+        if cassette is None:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        request = request_payload(llm_request)
+        key = request_key(request)
+
+        if cassette.mode == "replay":
+            interaction = cassette.next(key)
+            for delay, data in zip(cassette.delays(interaction), interaction.responses):
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Validating from JSON decodes base64 bytes (e.g. thought signatures)
+                yield LlmResponse.model_validate_json(json.dumps(data))
+            return
+
+        responses: List[Dict[str, Any]] = []
+        offsets: List[float] = []
+        started = time.perf_counter()
+        # Time the caller spends handling a streamed response is not model time
+        paused = 0.0
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            received = time.perf_counter()
+            offsets.append(received - started - paused)
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+            paused += time.perf_counter() - received
+        cassette.record(key, llm_request.model or self.model, request, responses, offsets)
+        logger.info(f"Recorded model call {key} ({len(responses)} responses, {offsets[-1] if offsets else 0:.2f}s)")
+
+
+def recordable(inner: BaseLlm) -> CassetteLlm:
+    """Wraps a model so that runs can be recorded to and replayed from cassettes."""
+    return CassetteLlm(model=inner.model, inner=inner)
@@ -0,0 +1,274 @@
+"""
+Local scheduler that settles recurring donations in bulk settlement windows.
+
+Subscriptions sit on a timer heap ordered by their next run. At the end of
+each settlement window every due subscription is settled in one batch: a
+CartMandate and PaymentMandate are built per run from the subscription's
+reusable IntentMandate (no LLM, no consent turn), the chains are appended to
+the ledger in one write, and the subscriptions are rescheduled.
+
+Each run has an idempotency key, "<subscription_id>:<run>", stored on its
+ledger record as `run_key`. The subscriptions' progress (runs, amount charged,
+next run) is journaled with the key marked pending *before* the ledger append,
+and the mark is cleared after it. After a crash, `reconcile()` looks for the
+pending keys in the ledger written since: a run that made it to the ledger is
+kept, one that did not is rolled back and settled again under the same key.
+So a window is charged exactly once, even across restarts.
+
+Usage:
+    python -m femtech_empowerment_funding_advisor.runtime.recurring_scheduler --window 3600
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger, chain_record, default_ledger
+from femtech_empowerment_funding_advisor.runtime.offload import run_blocking, run_cpu_bound
+from femtech_empowerment_funding_advisor.tools.recurring_tools import (
+    Subscription,
+    SubscriptionStore,
+    subscription_store,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _settle_chunk(jobs: List[tuple], settled_at: str) -> List[Dict[str, Any]]:
+    """
+    Builds and settles the mandate chains for one chunk of subscription runs.
+
+    Module-level with plain-data arguments so it can run in a process pool.
+    Each job is (run_key, subscription_id, run_no, org_name, amount_minor, currency, intent_mandate).
+    """
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import _build_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.money import Money
+    from femtech_empowerment_funding_advisor.tools.payment_tools import _cart_total, _settle_payment
+
+    timestamp = datetime.fromisoformat(settled_at)
+    records = []
+    for run_key, subscription_id, run_no, org_name, amount_minor, currency, intent_mandate in jobs:
+        cart_model, cart_dict = _build_cart_mandate(org_name, Money(amount_minor, currency), timestamp)
+        # Consent was given when the subscription was pre-authorized
+        payment_dict, payment_result = _settle_payment(
+            cart_model, _cart_total(cart_model, cart_dict), consent_granted=True, agent_present=False
+        )
+        payment_result["subscription_id"] = subscription_id
+        payment_result["run"] = run_no
+        records.append(chain_record(
+            intent_mandate, cart_dict, payment_dict, payment_result,
+            subscription_id=subscription_id, run_key=run_key
+        ))
+    return records
+
+
+class RecurringScheduler:
+    """Timer heap of subscriptions, settled in bulk per window."""
+
+    def __init__(
+        self,
+        store: SubscriptionStore = subscription_store,
+        ledger: Optional[MandateLedger] = None,
+        window_s: float = 3600.0,
+        chunk_size: int = 2_000
+    ):
+        self.store = store
+        self.ledger = ledger or default_ledger
+        self.window_s = window_s
+        self.chunk_size = chunk_size
+        self._heap: List[tuple[float, str]] = []
+        for subscription in store:
+            self.schedule(subscription)
+
+    def sync(self) -> int:
+        """Schedules subscriptions created or changed (e.g. by the tools) since the last sync."""
+        changed = self.store.sync()
+        for subscription in changed:
+            self.schedule(subscription)
+        return len(changed)
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Resolves runs left pending by a crash between journaling progress and
+        appending to the ledger.
+
+        Returns:
+            Counts of pending runs found in the ledger (kept) and missing from it
+            (rolled back, to be settled again).
+        """
+        pending = {s.pending_run: s for s in self.store if s.pending_run}
+        if not pending:
+            return {"kept": 0, "rolled_back": 0}
+
+        settled = set()
+        start = min(s.pending_offset for s in pending.values())
+        if self.ledger.path.exists():
+            for line in self.ledger.iter_range(start, self.ledger.path.stat().st_size):
+                if b'"run_key"' not in line or not line.endswith(b"\n"):
+                    continue
+                try:
+                    run_key = json.loads(line).get("run_key")
+                except ValueError:
+                    continue
+                if run_key in pending:
+                    settled.add(run_key)
+
+        for run_key, subscription in pending.items():
+            if run_key not in settled:
+                subscription.runs -= 1
+                subscription.charged_minor -= subscription.amount_minor
+                subscription.next_run -= subscription.interval_s
+                if subscription.status == "completed":
+                    subscription.status = "active"
+            subscription.pending_run = None
+            subscription.pending_offset = 0
+            self.schedule(subscription)
+        self.store.persist(pending.values())
+
+        stats = {"kept": len(settled), "rolled_back": len(pending) - len(settled)}
+        logger.warning(f"Reconciled pending recurring runs: {stats}")
+        return stats
+
+    def schedule(self, subscription: Subscription) -> None:
+        if subscription.status == "active":
+            heapq.heappush(self._heap, (subscription.next_run, subscription.subscription_id))
+
+    def next_window_end(self) -> Optional[float]:
+        """End of the settlement window containing the earliest due run."""
+        if not self._heap:
+            return None
+        return math.floor(self._heap[0][0] / self.window_s + 1) * self.window_s
+
+    def _pop_due(self, until: float) -> tuple[List[Subscription], List[Subscription]]:
+        """Returns (subscriptions due by `until`, subscriptions that just ended)."""
+        due, ended = [], []
+        seen = set()
+        while self._heap and self._heap[0][0] <= until:
+            next_run, subscription_id = heapq.heappop(self._heap)
+            subscription = self.store.get(subscription_id)
+            # Heap entries are removed lazily: skip cancelled, rescheduled or
+            # duplicate (re-synced) ones
+            if (subscription is None or subscription.next_run != next_run
+                    or subscription.status != "active" or subscription_id in seen):
+                continue
+            seen.add(subscription_id)
+            if not subscription.can_charge(until):
+                subscription.status = "expired" if until > subscription.expires_at else "completed"
+                ended.append(subscription)
+                continue
+            due.append(subscription)
+        return due, ended
+
+    async def settle_window(self, window_end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Settles every subscription due by `window_end` (default: now).
+
+        Returns:
+            Window statistics (runs settled, total charged, duration).
+        """
+        window_end = time.time() if window_end is None else window_end
+        started = time.perf_counter()
+        self.sync()
+        due, ended = self._pop_due(window_end)
+        if ended:
+            self.store.persist(ended)
+        if not due:
+            return {"settled": 0, "total_minor": 0, "duration_s": 0.0}
+
+        settled_at = datetime.fromtimestamp(window_end, timezone.utc).isoformat()
+        jobs = [
+            (f"{s.subscription_id}:{s.runs + 1}", s.subscription_id, s.runs + 1,
+             s.org_name, s.amount_minor, s.currency, s.intent_mandate)
+            for s in due
+        ]
+        chunks = [jobs[i:i + self.chunk_size] for i in range(0, len(jobs), self.chunk_size)]
+        results = await asyncio.gather(*(run_cpu_bound(_settle_chunk, chunk, settled_at) for chunk in chunks))
+
+        # Journal the progress first: a crash from here on can no longer charge
+        # this window twice, and `reconcile` settles what did not reach the ledger
+        ledger_offset = self.ledger.path.stat().st_size if self.ledger.path.exists() else 0
+        total_minor = 0
+        for subscription in due:
+            subscription.runs += 1
+            subscription.pending_run = f"{subscription.subscription_id}:{subscription.runs}"
+            subscription.pending_offset = ledger_offset
+            subscription.charged_minor += subscription.amount_minor
+            subscription.next_run += subscription.interval_s
+            total_minor += subscription.amount_minor
+            if subscription.charged_minor + subscription.amount_minor > subscription.cap_minor:
+                subscription.status = "completed"
+        await run_blocking(self.store.persist, due)
+
+        written = 0
+        for records in results:
+            written += await run_blocking(self.ledger.append_many, records)
+
+        for subscription in due:
+            subscription.pending_run = None
+            subscription.pending_offset = 0
+            self.schedule(subscription)
+        await run_blocking(self.store.persist, due)
+
+        duration = time.perf_counter() - started
+        stats = {
+            "settled": written,
+            "total_minor": total_minor,
+            "duration_s": duration,
+            "runs_per_s": written / duration if duration else 0.0,
+        }
+        logger.info(f"Settlement window {settled_at}: {stats}")
+        return stats
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Settles each window once it closes, until `stop` is set.
+
+        The journal is synced on every pass and no sleep is longer than one
+        window, so a subscription created meanwhile (by the tools, in another
+        process) is scheduled within a window even when nothing else is due.
+        """
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            self.sync()
+            window_end = self.next_window_end()
+            now = time.time()
+            if window_end is not None and window_end <= now:
+                await self.settle_window(window_end)
+                continue
+            delay = self.window_s if window_end is None else min(self.window_s, window_end - now)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Settle recurring donations in bulk windows.")
+    parser.add_argument("--window", type=float, default=3600.0, help="Settlement window length in seconds")
+    parser.add_argument("--once", action="store_true", help="Settle everything due now and exit")
+    parser.add_argument("--compact", action="store_true",
+                        help="Rewrite the subscription journal on startup (only while no agent is serving)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    loaded = subscription_store.load()
+    logger.info(f"Loaded {loaded} subscriptions from {subscription_store.path}")
+    scheduler = RecurringScheduler(window_s=args.window)
+    scheduler.reconcile()
+    if args.compact:
+        subscription_store.compact()
+
+    if args.once:
+        asyncio.run(scheduler.settle_window())
+    else:
+        asyncio.run(scheduler.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Resilience layer for the agents' model calls.
+
+`ResilientLlm` is an ADK `BaseLlm` that sits in front of one or more model
+tiers (e.g. gemini-3-pro-preview, then a smaller fallback). Each model hop gets
+a deadline, retryable failures are retried with jittered exponential backoff,
+and a per-model circuit breaker skips a tier that is down so the request goes
+straight to the fallback. The total time spent on one hop is bounded by
+`RetryPolicy.total_budget_s`. Concurrent calls to each model are capped
+process-wide (`set_model_concurrency`); the slot is held for the call only,
+not for backoff or the rest of the agent turn.
+
+Retrying is only done before any response has been yielded, so a retry can
+never duplicate a function call the framework has already acted on. Tool side
+effects are protected separately: `create_payment_mandate` uses the cart ID as
+its idempotency key.
+
+Tiers are plain `BaseLlm` instances, so a local fake model can be passed in
+place of Gemini for tests. For offline runs of the real agents,
+`resilient_model()` wraps the result in `runtime.recording.CassetteLlm`, which
+replays recorded calls before any of this comes into play.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import Field
+
+from femtech_empowerment_funding_advisor.runtime.recording import CassetteLlm, recordable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = os.environ.get("AFARA_MODEL", "gemini-3-pro-preview")
+FALLBACK_MODEL = os.environ.get("AFARA_FALLBACK_MODEL", "gemini-2.5-flash")
+
+# HTTP-style status codes that indicate a transient upstream problem
+_RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+# Concurrent calls per model endpoint across all agents in the process
+MODEL_CONCURRENCY = int(os.environ.get("AFARA_MODEL_CONCURRENCY", "8"))
+
+
+class ModelUnavailable(Exception):
+    """Raised when every model tier failed or the hop's time budget ran out."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Deadlines and backoff for one model hop."""
+    hop_timeout_s: float = 30.0
+    max_attempts: int = 3
+    backoff_base_s: float = 0.5
+    backoff_cap_s: float = 8.0
+    # Upper bound on one hop across all attempts and tiers
+    total_budget_s: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            hop_timeout_s=float(os.environ.get("AFARA_HOP_TIMEOUT_S", cls.hop_timeout_s)),
+            max_attempts=int(os.environ.get("AFARA_MAX_ATTEMPTS", cls.max_attempts)),
+            total_budget_s=float(os.environ.get("AFARA_HOP_BUDGET_S", cls.total_budget_s)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt."""
+        return random.uniform(0, min(self.backoff_cap_s, self.backoff_base_s * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model endpoint.
+
+    closed -> open after `failure_threshold` failures in a row; open -> half-open
+    after `reset_timeout_s`, letting a single probe through; the probe's outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout_s:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Ends a call that says nothing about the endpoint's health, freeing the probe slot."""
+        self._probe_in_flight = False
+
+
+# Breakers are shared per model name so every agent sees the same outage
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = _breakers[model] = CircuitBreaker()
+    return breaker
+
+
+# Per event loop, since a semaphore is bound to the loop it is first used on
+# (e.g. the serving loop vs. an `asyncio.run` in a script or test). Entries go
+# away with their loop.
+_model_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def set_model_concurrency(limit: int) -> None:
+    """Sets the per-model call limit; takes effect for calls started afterwards."""
+    global MODEL_CONCURRENCY
+    MODEL_CONCURRENCY = limit
+    _model_limits.clear()
+
+
+def get_model_limit(model: str) -> asyncio.Semaphore:
+    """The running loop's concurrency limit for `model`. Call from a coroutine."""
+    limits = _model_limits.setdefault(asyncio.get_running_loop(), {})
+    limit = limits.get(model)
+    if limit is None:
+        limit = limits[model] = asyncio.Semaphore(MODEL_CONCURRENCY)
+    return limit
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code in _RETRYABLE_CODES
+
+
+class ResilientLlm(BaseLlm):
+    """
+    A `BaseLlm` that applies deadlines, retries, circuit breaking and tier
+    fallback in front of the wrapped models.
+    """
+
+    tiers: List[BaseLlm]
+    policy: RetryPolicy = Field(default_factory=RetryPolicy)
+
+    async def _collect(self, tier: BaseLlm, llm_request: LlmRequest, stream: bool) -> List[LlmResponse]:
+        request = llm_request.model_copy(update={"model": tier.model})
+        return [response async for response in tier.generate_content_async(request, stream=stream)]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        policy = self.policy
+        deadline = time.monotonic() + policy.total_budget_s
+        last_error: Optional[BaseException] = None
+
+        for tier in self.tiers:
+            breaker = get_breaker(tier.model)
+            for attempt in range(policy.max_attempts):
+                if not breaker.allow():
+                    logger.warning(f"Circuit open for {tier.model}; skipping to next tier")
+                    break
+
+                try:
+                    # Waiting for a slot is local contention, not a tier
+                    # failure, so it is outside the call's timeout
+                    async with get_model_limit(tier.model):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise ModelUnavailable(f"Model hop exceeded {policy.total_budget_s}s budget") from last_error
+                        # Responses are buffered so nothing is yielded until the
+                        # call has fully succeeded; this is what makes retry safe.
+                        responses = await asyncio.wait_for(
+                            self._collect(tier, llm_request, stream),
+                            timeout=min(policy.hop_timeout_s, remaining)
+                        )
+                except Exception as e:
+                    if not _is_retryable(e):
+                        # The endpoint answered; the request itself is bad.
+                        # That is no evidence either way, so leave the state.
+                        breaker.release()
+                        raise
+                    breaker.record_failure()
+                    last_error = e
+                    logger.warning(f"Model call to {tier.model} failed (attempt {attempt + 1}): {e!r}")
+                    if attempt + 1 < policy.max_attempts:
+                        delay = min(policy.backoff(attempt), max(0.0, deadline - time.monotonic()))
+                        await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # Cancelled mid-call (e.g. the client went away): without
+                    # this a half-open probe would stay in flight for good
+                    breaker.release()
+                    raise
+
+                breaker.record_success()
+                if tier is not self.tiers[0]:
+                    logger.info(f"Served model hop from fallback tier {tier.model}")
+                for response in responses:
+                    yield response
+                return
+
+        raise ModelUnavailable(f"All model tiers failed: {[t.model for t in self.tiers]}") from last_error
+
+
+def resilient_model(
+    primary: str = DEFAULT_MODEL,
+    fallback: Optional[str] = FALLBACK_MODEL,
+    policy: Optional[RetryPolicy] = None,
+    **tier_kwargs: Any
+) -> CassetteLlm:
+    """
+    Builds a `ResilientLlm` over Gemini tiers for use as an agent's `model`,
+    wrapped so its calls can be recorded and replayed.
+    """
+    from google.adk.models import Gemini
+
+    tiers: List[BaseLlm] = [Gemini(model=primary, **tier_kwargs)]
+    if fallback and fallback != primary:
+        tiers.append(Gemini(model=fallback, **tier_kwargs))
+    return recordable(ResilientLlm(model=primary, tiers=tiers, policy=policy or RetryPolicy.from_env()))
@@ -0,0 +1,363 @@
+"""
+Serving entry point: multiplexes many concurrent donor sessions over asyncio.
+
+Turns are serialized per session before they are queued, so a worker is never
+held waiting on a busy session. They then go on a bounded queue (backpressure)
+and are executed by a fixed set of worker coroutines. Model calls are capped
+per model tier inside `ResilientLlm`, for the duration of each call only.
+Blocking tool work (signing, Pydantic validation) is offloaded through
+`runtime.offload` to a thread pool and, optionally, a process pool.
+
+Usage:
+    python -m femtech_empowerment_funding_advisor.runtime.serving --workers 4 < turns.jsonl
+
+Each input line is {"user_id": ..., "session_id": ..., "message": ...}, with an
+optional "state" used when the session is created (e.g. a consent token for
+the headless pipeline); each output line carries the final agent response for
+that turn. Pass --headless to run `headless_funding_pipeline` instead of
+`root_agent`.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from femtech_empowerment_funding_advisor.data.mandate_events import mandate_events
+from femtech_empowerment_funding_advisor.runtime.offload import install_executors, run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class ServerBusy(Exception):
+    """Raised when a turn is submitted without waiting and the queue is full."""
+
+
+class ServerClosed(Exception):
+    """Raised when a turn is submitted after shutdown has started."""
+
+
+@dataclass
+class ServingConfig:
+    """Tunables for `DonorSessionServer`."""
+    app_name: str = "afara_tech"
+    # Turns executing concurrently across all sessions
+    max_concurrent_turns: int = 32
+    # Turns waiting for a worker before submitters are pushed back
+    max_queue: int = 256
+    # Concurrent calls per model endpoint (e.g. gemini-3-pro-preview)
+    model_concurrency: int = field(default_factory=lambda: int(os.environ.get("AFARA_MODEL_CONCURRENCY", "8")))
+    worker_threads: int = 4
+    # Processes for CPU-bound offload; 0 disables the process pool
+    worker_processes: int = field(default_factory=lambda: int(os.environ.get("AFARA_WORKER_PROCESSES", "0")))
+    shutdown_timeout: float = 30.0
+
+
+@dataclass
+class ServingMetrics:
+    """Queueing and throughput counters for the serving loop."""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    max_queue_depth: int = 0
+    total_queue_wait_s: float = 0.0
+    total_run_s: float = 0.0
+
+    def snapshot(self, queue_depth: int) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_wait_ms": (self.total_queue_wait_s / finished * 1000) if finished else 0.0,
+            "avg_run_ms": (self.total_run_s / finished * 1000) if finished else 0.0,
+        }
+
+
+@dataclass
+class _Turn:
+    user_id: str
+    session_id: str
+    message: str
+    future: asyncio.Future
+    enqueued_at: float
+    state: Optional[Dict[str, Any]] = None
+
+
+class DonorSessionServer:
+    """
+    Runs donor turns against `root_agent` with bounded concurrency.
+
+    Use as an async context manager:
+
+        async with DonorSessionServer() as server:
+            reply = await server.submit("donor_1", "session_1", "Show me East Africa orgs")
+    """
+
+    def __init__(self, agent: Any = None, session_service: Any = None, config: Optional[ServingConfig] = None):
+        if agent is None:
+            from femtech_empowerment_funding_advisor.agent import root_agent as agent
+        if session_service is None:
+            from google.adk.sessions import InMemorySessionService
+            session_service = InMemorySessionService()
+
+        self.agent = agent
+        self.session_service = session_service
+        self.config = config or ServingConfig()
+        self.metrics = ServingMetrics()
+
+        self._runner = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._session_locks: Dict[tuple[str, str], asyncio.Lock] = {}
+        self._session_refs: Dict[tuple[str, str], int] = {}
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._closing = False
+
+    async def __aenter__(self) -> "DonorSessionServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.shutdown()
+
+    async def start(self) -> None:
+        from google.adk.runners import Runner
+
+        from femtech_empowerment_funding_advisor.runtime.resilience import set_model_concurrency
+
+        cfg = self.config
+        set_model_concurrency(cfg.model_concurrency)
+        self._runner = Runner(agent=self.agent, app_name=cfg.app_name, session_service=self.session_service)
+        self._queue = asyncio.Queue(maxsize=cfg.max_queue)
+
+        self._thread_pool = ThreadPoolExecutor(max_workers=cfg.worker_threads, thread_name_prefix="afara-offload")
+        if cfg.worker_processes > 0:
+            self._process_pool = ProcessPoolExecutor(max_workers=cfg.worker_processes)
+        install_executors(self._thread_pool, self._process_pool)
+        # Recover mandate state now, off the loop, rather than on the first tool call
+        await run_blocking(mandate_events.ensure_open)
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"afara-turn-worker-{i}")
+            for i in range(cfg.max_concurrent_turns)
+        ]
+        logger.info(
+            f"Serving started: {cfg.max_concurrent_turns} turn workers, queue {cfg.max_queue}, "
+            f"{cfg.model_concurrency}/model, {cfg.worker_processes} worker processes"
+        )
+
+    async def submit(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        wait: bool = True,
+        state: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Queues one donor turn and returns the agent's final response text.
+
+        Args:
+            wait: If False, raise ServerBusy instead of waiting for queue space.
+            state: Initial session state, applied only if the session is new.
+        """
+        if self._closing or self._queue is None:
+            raise ServerClosed("Server is not accepting new turns")
+
+        # Turns within one session must run in order. The lock is taken here,
+        # by the submitter, so a turn only reaches the queue (and a worker)
+        # once the session's previous turn has finished.
+        key = (user_id, session_id)
+        lock = self._session_locks.setdefault(key, asyncio.Lock())
+        self._session_refs[key] = self._session_refs.get(key, 0) + 1
+        try:
+            async with lock:
+                if self._closing:
+                    raise ServerClosed("Server is not accepting new turns")
+                future = asyncio.get_running_loop().create_future()
+                turn = _Turn(user_id, session_id, message, future, time.perf_counter(), state)
+
+                if wait:
+                    await self._queue.put(turn)
+                else:
+                    try:
+                        self._queue.put_nowait(turn)
+                    except asyncio.QueueFull:
+                        self.metrics.rejected += 1
+                        raise ServerBusy(f"Turn queue full ({self.config.max_queue})")
+
+                self.metrics.submitted += 1
+                self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self._queue.qsize())
+                return await future
+        finally:
+            self._session_refs[key] -= 1
+            if not self._session_refs[key]:
+                del self._session_refs[key]
+                del self._session_locks[key]
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(self._queue.qsize() if self._queue else 0)
+
+    async def shutdown(self) -> None:
+        """Stops accepting turns, drains the queue (up to `shutdown_timeout`), then releases pools."""
+        if self._closing:
+            return
+        self._closing = True
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.config.shutdown_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Shutdown timed out with {self._queue.qsize()} turns still queued")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        # Fail anything left behind so callers are not stuck forever
+        while self._queue is not None and not self._queue.empty():
+            turn = self._queue.get_nowait()
+            if not turn.future.done():
+                turn.future.set_exception(ServerClosed("Server shut down before turn ran"))
+            self._queue.task_done()
+
+        install_executors(None, None)
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=True)
+        if self._process_pool:
+            self._process_pool.shutdown(wait=True)
+
+        logger.info(f"Serving stopped: {self.metrics_snapshot()}")
+
+    async def _ensure_session(self, user_id: str, session_id: str, state: Optional[Dict[str, Any]] = None) -> None:
+        app_name = self.config.app_name
+        session = await self.session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            await self.session_service.create_session(
+                app_name=app_name, user_id=user_id, session_id=session_id, state=state
+            )
+
+    async def _run_turn(self, turn: _Turn) -> str:
+        from google.genai.types import Content, Part
+
+        await self._ensure_session(turn.user_id, turn.session_id, turn.state)
+        new_message = Content(role="user", parts=[Part(text=turn.message)])
+
+        final_text = ""
+        async for event in self._runner.run_async(
+            user_id=turn.user_id,
+            session_id=turn.session_id,
+            new_message=new_message
+        ):
+            if event.is_final_response() and event.content and event.content.parts:
+                final_text = "".join(p.text or "" for p in event.content.parts)
+        return final_text
+
+    async def _worker(self) -> None:
+        while True:
+            turn = await self._queue.get()
+            started = time.perf_counter()
+            self.metrics.total_queue_wait_s += started - turn.enqueued_at
+            self.metrics.in_flight += 1
+            try:
+                result = await self._run_turn(turn)
+                self.metrics.completed += 1
+                if not turn.future.done():
+                    turn.future.set_result(result)
+            except asyncio.CancelledError:
+                if not turn.future.done():
+                    turn.future.set_exception(ServerClosed("Turn cancelled during shutdown"))
+                raise
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.error(f"Turn failed for session {turn.session_id}: {e}")
+                if not turn.future.done():
+                    turn.future.set_exception(e)
+            finally:
+                self.metrics.in_flight -= 1
+                self.metrics.total_run_s += time.perf_counter() - started
+                self._queue.task_done()
+
+
+async def _serve_jsonl(config: ServingConfig, agent: Any = None) -> None:
+    async with DonorSessionServer(agent=agent, config=config) as server:
+        loop = asyncio.get_running_loop()
+        pending: set[asyncio.Task] = set()
+        # Stop reading stdin while this many requests are unanswered, so a
+        # large input file cannot pile up tasks (or turns parked on a busy
+        # session's lock, which the turn queue does not see)
+        in_flight = asyncio.Semaphore(config.max_concurrent_turns + config.max_queue)
+
+        async def handle(request: Dict[str, Any]) -> None:
+            try:
+                reply = await server.submit(
+                    request["user_id"], request["session_id"], request["message"], state=request.get("state")
+                )
+                output = {"session_id": request["session_id"], "status": "success", "response": reply}
+            except Exception as e:
+                output = {"session_id": request.get("session_id"), "status": "error", "message": str(e)}
+            finally:
+                in_flight.release()
+            print(json.dumps(output), flush=True)
+
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                print(json.dumps({"status": "error", "message": f"Invalid JSON: {e}"}), flush=True)
+                continue
+            await in_flight.acquire()
+            task = asyncio.create_task(handle(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        await asyncio.gather(*pending)
+        print(json.dumps({"metrics": server.metrics_snapshot()}), flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve many concurrent donor sessions from JSONL on stdin.")
+    defaults = ServingConfig()
+    parser.add_argument("--concurrency", type=int, default=defaults.max_concurrent_turns)
+    parser.add_argument("--queue", type=int, default=defaults.max_queue)
+    parser.add_argument("--model-concurrency", type=int, default=defaults.model_concurrency)
+    parser.add_argument("--threads", type=int, default=defaults.worker_threads)
+    parser.add_argument("--workers", type=int, default=defaults.worker_processes, help="Worker processes for CPU-bound offload")
+    parser.add_argument("--headless", action="store_true", help="Run the pre-consented pipeline (consent token in each line's state)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    config = ServingConfig(
+        max_concurrent_turns=args.concurrency,
+        max_queue=args.queue,
+        model_concurrency=args.model_concurrency,
+        worker_threads=args.threads,
+        worker_processes=args.workers,
+    )
+    agent = None
+    if args.headless:
+        from femtech_empowerment_funding_advisor.agent import headless_funding_pipeline as agent
+    asyncio.run(_serve_jsonl(config, agent))
+
+
+if __name__ == "__main__":
+    main()
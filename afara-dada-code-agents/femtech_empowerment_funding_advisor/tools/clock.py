@@ -0,0 +1,120 @@
+"""
+Shared clock and expiry checks for the mandate tools.
+
+Mandates carry their expiry both as an ISO 8601 string (the AP2 field) and as
+an integer epoch (`intent_expiry_epoch`, `cart_expiry_epoch`). Checks compare
+the integer against a monotonic-adjusted wall clock, so the hot path does no
+string parsing, datetime arithmetic or log formatting. ISO strings are only
+parsed for mandates written before the epoch fields existed, and those parses
+are cached.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Clock:
+    """
+    Wall-clock seconds derived from `time.monotonic()`.
+
+    The wall/monotonic offset is captured once, so readings never jump
+    backwards if the system clock is adjusted mid-run. Tests can pin time with
+    `freeze`.
+    """
+
+    def __init__(self):
+        self._offset = time.time() - time.monotonic()
+        self._frozen: Optional[float] = None
+
+    def now(self) -> float:
+        if self._frozen is not None:
+            return self._frozen
+        return time.monotonic() + self._offset
+
+    def freeze(self, epoch: Optional[float]) -> None:
+        """Pins `now()` to `epoch` (None to unfreeze)."""
+        self._frozen = epoch
+
+    def resync(self) -> None:
+        """Re-captures the wall/monotonic offset (e.g. after an NTP correction)."""
+        self._offset = time.time() - time.monotonic()
+
+
+clock = Clock()
+now: Callable[[], float] = clock.now
+
+
+def utcnow() -> datetime:
+    """Current UTC time from the shared clock (pinned by `clock.freeze` in tests)."""
+    return datetime.fromtimestamp(clock.now(), timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def parse_expiry(iso_value: str) -> int:
+    """
+    Converts an ISO 8601 expiry string to integer epoch seconds.
+
+    Raises:
+        ValueError/TypeError: If the string is not a valid timestamp.
+    """
+    # Handling ISO format quirks (Z vs +00:00)
+    return int(datetime.fromisoformat(iso_value.replace("Z", "+00:00")).timestamp())
+
+
+def expiry_epoch(expiry: datetime) -> int:
+    """Epoch seconds to store next to an ISO expiry on a mandate."""
+    return int(expiry.timestamp())
+
+
+def check_expiry(
+    epoch: Optional[int],
+    iso_value: Optional[str],
+    label: str,
+    field_name: str
+) -> tuple[bool, str]:
+    """
+    Validates that a mandate hasn't expired.
+
+    Args:
+        epoch: Stored integer expiry, if the mandate has one.
+        iso_value: The AP2 ISO 8601 expiry string (fallback, and for messages).
+        label: Human-readable mandate name for the error message.
+        field_name: AP2 field name for format errors (e.g. 'cart_expiry').
+
+    Returns:
+        (is_valid, error_message)
+    """
+    if epoch is None:
+        try:
+            epoch = parse_expiry(iso_value)
+        except (ValueError, TypeError, AttributeError) as e:
+            return False, f"Invalid {field_name} format: {e}"
+
+    remaining = epoch - clock.now()
+    if remaining < 0:
+        return False, f"{label} expired at {iso_value}"
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s valid. Expires in %.0f seconds", label, remaining)
+    return True, ""
+
+
+def validate_expiries(epochs: Iterable[float], at: Optional[float] = None) -> List[bool]:
+    """
+    Batch expiry check for bulk donation and audit paths.
+
+    Args:
+        epochs: Expiry epochs (list, tuple or `array('q')`/`array('d')`).
+        at: Time to check against (defaults to the shared clock).
+
+    Returns:
+        One boolean per expiry: True if still valid at `at`.
+    """
+    at = float(clock.now() if at is None else at)
+    # `at <= e` per element, evaluated in C via the bound comparison method
+    return list(map(at.__le__, epochs))
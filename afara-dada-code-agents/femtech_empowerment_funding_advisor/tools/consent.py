@@ -0,0 +1,218 @@
+"""
+Signed consent tokens for headless (pre-consented) payments.
+
+Interactive sessions get consent through the Credentials Provider's two-turn
+confirmation. Batch jobs, recurring gifts and load tests have no one to ask,
+so consent is given up front as a token the caller puts in session state
+under `CONSENT_STATE_KEY`. `create_payment_mandate` checks it before moving
+funds. The token is scoped to:
+
+- one donor (`sub`, matched against the session's user),
+- a cap per payment (`max_minor` in `currency`),
+- a cap on the total of all its payments (`total_minor`, by default one
+  payment's worth),
+- optionally, a list of organizations,
+- an expiry.
+
+What a token has spent is recorded in the mandate event log (under the
+pseudo-session `consent:<consent_id>`) before funds move, so replaying a token
+cannot exceed its total, across restarts included. The log's retention
+(AFARA_MANDATE_RETENTION_S) must stay above `MAX_TTL_S` for that to hold.
+
+Format: `cst1.<payload>.<signature>`, where both parts are base64url and the
+signature is HMAC-SHA256 over the payload with AFARA_CONSENT_SECRET. Without
+that variable, development setups (AFARA_ENV unset or "dev"/"test") use a
+random per-process key, so tokens only verify in the process that issued them,
+and anywhere else headless consent is refused outright.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from femtech_empowerment_funding_advisor.data.mandate_events import mandate_events
+from femtech_empowerment_funding_advisor.tools.clock import clock
+from femtech_empowerment_funding_advisor.tools.ids import new_id
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+logger = logging.getLogger(__name__)
+
+CONSENT_STATE_KEY = "consent_token"
+TOKEN_PREFIX = "cst1"
+# Pre-consent is meant for a job or a run, not a standing authorization
+MAX_TTL_S = 7 * 86_400
+
+_secret_env = os.environ.get("AFARA_CONSENT_SECRET")
+_DEV = os.environ.get("AFARA_ENV", "dev").lower() in ("dev", "test")
+if _secret_env:
+    _SECRET: Optional[bytes] = _secret_env.encode("utf-8")
+elif _DEV:
+    logger.warning("AFARA_CONSENT_SECRET is not set: consent tokens use a per-process key (development only)")
+    _SECRET = secrets.token_bytes(32)
+else:
+    # Fail closed: a random key would silently break tokens across processes
+    logger.error("AFARA_CONSENT_SECRET is not set outside development: headless consent is disabled")
+    _SECRET = None
+
+_SPENT_KEY = "spent_minor"
+_spend_lock = threading.Lock()
+
+
+class ConsentError(ValueError):
+    """Raised when a consent token is malformed or its signature does not match."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    if _SECRET is None:
+        raise ConsentError("Consent signing key (AFARA_CONSENT_SECRET) is not configured")
+    return _b64encode(hmac.new(_SECRET, payload.encode("utf-8"), hashlib.sha256).digest())
+
+
+def issue_consent_token(
+    user_id: str,
+    max_amount: Money,
+    orgs: Optional[Iterable[str]] = None,
+    ttl_s: int = 3600,
+    total_amount: Optional[Money] = None
+) -> str:
+    """
+    Issues a consent token for `user_id` covering payments up to `max_amount` each.
+
+    Args:
+        orgs: Organization names the consent covers (None for any verified initiative).
+        ttl_s: Seconds until the token expires (at most `MAX_TTL_S`).
+        total_amount: Cap on all payments made with the token together
+            (defaults to `max_amount`, i.e. a single payment's worth).
+
+    Raises:
+        ConsentError: if no signing key is configured.
+    """
+    total_amount = max_amount if total_amount is None else total_amount
+    if max_amount.minor <= 0:
+        raise ValueError(f"Consent cap must be positive, got: ${max_amount.amount_str}")
+    if total_amount.currency != max_amount.currency or total_amount < max_amount:
+        raise ValueError(f"Consent total {total_amount} must be at least the per-payment cap {max_amount}")
+    if not 0 < ttl_s <= MAX_TTL_S:
+        raise ValueError(f"Consent TTL must be between 1 and {MAX_TTL_S} seconds, got: {ttl_s}")
+
+    claims = {
+        "consent_id": new_id("consent"),
+        "sub": user_id,
+        "max_minor": max_amount.minor,
+        "total_minor": total_amount.minor,
+        "currency": max_amount.currency,
+        "orgs": sorted({org.strip().lower() for org in orgs}) if orgs is not None else None,
+        "exp": int(clock.now()) + int(ttl_s),
+    }
+    payload = _b64encode(json.dumps(claims, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return f"{TOKEN_PREFIX}.{payload}.{_sign(payload)}"
+
+
+@lru_cache(maxsize=4096)
+def _decode(token: str) -> Dict[str, Any]:
+    """
+    Checks the signature and parses the claims.
+
+    Cached per token, so a batch reusing one token pays for HMAC and JSON once.
+    Only successful decodes are cached (errors propagate).
+    """
+    try:
+        prefix, payload, signature = token.split(".")
+    except ValueError:
+        raise ConsentError("Consent token is malformed") from None
+    if prefix != TOKEN_PREFIX:
+        raise ConsentError(f"Unsupported consent token version '{prefix}'")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ConsentError("Consent token signature is invalid")
+    try:
+        return json.loads(_b64decode(payload))
+    except (ValueError, UnicodeDecodeError):
+        raise ConsentError("Consent token payload is malformed") from None
+
+
+def verify_consent(token: Any, user_id: str, org_name: str, amount: Money) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Checks that a consent token covers this payment.
+
+    Returns:
+        (is_valid, error_message, claims)
+    """
+    if not isinstance(token, str):
+        return False, "Consent token must be a string", None
+    try:
+        claims = _decode(token)
+    except ConsentError as e:
+        return False, str(e), None
+
+    if clock.now() > claims["exp"]:
+        return False, f"Consent {claims['consent_id']} has expired", None
+    if claims["sub"] != user_id:
+        return False, f"Consent {claims['consent_id']} was not issued to this donor", None
+    if claims["orgs"] is not None and org_name.strip().lower() not in claims["orgs"]:
+        return False, f"Consent {claims['consent_id']} does not cover {org_name}", None
+    if amount.currency != claims["currency"] or amount.minor > claims["max_minor"]:
+        cap = Money(claims["max_minor"], claims["currency"])
+        return False, f"{amount} exceeds the pre-consented limit of {cap}", None
+    if consent_spent(claims).minor + amount.minor > _total_minor(claims):
+        return False, _total_exceeded(claims, amount), None
+    return True, "", claims
+
+
+def _total_minor(claims: Dict[str, Any]) -> int:
+    # Tokens issued before totals existed are good for one payment's worth
+    return claims.get("total_minor", claims["max_minor"])
+
+
+def _total_exceeded(claims: Dict[str, Any], amount: Money) -> str:
+    remaining = Money(max(0, _total_minor(claims) - consent_spent(claims).minor), claims["currency"])
+    return f"{amount} exceeds what is left of consent {claims['consent_id']} ({remaining})"
+
+
+def consent_spent(claims: Dict[str, Any]) -> Money:
+    """Total already charged under a consent token."""
+    spent = mandate_events.value(f"consent:{claims['consent_id']}", claims["sub"], _SPENT_KEY)
+    return Money(spent or 0, claims["currency"])
+
+
+def spend_consent(claims: Dict[str, Any], amount: Money) -> tuple[bool, str]:
+    """
+    Records `amount` against a verified token's total, if it still fits.
+
+    Call right before moving funds: the check and the record are atomic, so
+    concurrent replays of one token cannot both pass.
+
+    Returns:
+        (is_recorded, error_message)
+    """
+    with _spend_lock:
+        spent = consent_spent(claims)
+        if spent.minor + amount.minor > _total_minor(claims):
+            return False, _total_exceeded(claims, amount)
+        mandate_events.record(
+            f"consent:{claims['consent_id']}", claims["sub"], {_SPENT_KEY: spent.minor + amount.minor}
+        )
+    return True, ""
+
+
+def release_consent(claims: Dict[str, Any], amount: Money) -> None:
+    """Gives back `amount` recorded by `spend_consent` for a payment that did not go ahead."""
+    with _spend_lock:
+        spent = consent_spent(claims)
+        mandate_events.record(
+            f"consent:{claims['consent_id']}", claims["sub"], {_SPENT_KEY: max(0, spent.minor - amount.minor)}
+        )
@@ -0,0 +1,256 @@
+"""
+Context compaction for long discovery conversations in the Finding Agent.
+
+Phase 1 can run over many turns of comparing initiatives, and every model call
+re-sends the whole history, including earlier `find_tech_initiatives` payloads
+with their full `raw_data`. `compact_context_before_model_callback` trims the
+request before it is sent:
+
+- Tool results from older turns are replaced with compact references (the
+  org IDs they covered plus the registry version of the session's tenant
+  view, which is what the tools answered from); the model can call the tool
+  again if it needs the details.
+- If the history is still over the token budget, older turns are folded into
+  one short extractive summary (no extra model call), keeping only the most
+  recent turns verbatim.
+
+The summary is bounded in size, so the prompt stops growing once the budget is
+reached and per-turn latency stays flat. Session events are never modified;
+only the outgoing request is.
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import REGISTRY_VERSION
+from femtech_empowerment_funding_advisor.data.tenants import view_for_context
+
+logger = logging.getLogger(__name__)
+
+# Tools whose results can be rebuilt from the registry (or impact store) on demand
+_REFERENCE_TOOLS = {"find_tech_initiatives", "compare_initiatives", "get_impact_updates"}
+_SUMMARY_HEADER = "[Summary of earlier conversation]"
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    """Token budget and retention for the Finding Agent's prompt history."""
+    token_budget: int = 6000
+    # Most recent turns kept verbatim (the current turn is always kept)
+    keep_turns: int = 2
+    # Older turns listed individually in the summary; anything earlier is counted only
+    max_summary_turns: int = 12
+    summary_chars: int = 160
+
+    @classmethod
+    def from_env(cls) -> "CompactionPolicy":
+        return cls(
+            token_budget=int(os.environ.get("AFARA_CONTEXT_TOKEN_BUDGET", cls.token_budget)),
+            keep_turns=int(os.environ.get("AFARA_CONTEXT_KEEP_TURNS", cls.keep_turns)),
+        )
+
+
+default_policy = CompactionPolicy.from_env()
+
+_metrics = {"calls": 0, "compacted": 0, "tokens_before": 0, "tokens_after": 0, "time_s": 0.0}
+
+
+def _part_chars(part: Any) -> int:
+    text = getattr(part, "text", None)
+    if text:
+        return len(text)
+    call = getattr(part, "function_call", None)
+    if call is not None:
+        return len(call.name or "") + len(json.dumps(call.args or {}, default=str))
+    response = getattr(part, "function_response", None)
+    if response is not None:
+        return len(response.name or "") + len(json.dumps(response.response or {}, default=str))
+    return 0
+
+
+def estimate_tokens(contents: List[Any]) -> int:
+    """Rough token count (~4 characters per token) for a list of Content."""
+    chars = sum(_part_chars(part) for content in contents for part in (content.parts or []))
+    return math.ceil(chars / 4)
+
+
+def _is_user_message(content: Any) -> bool:
+    parts = content.parts or []
+    return (
+        content.role == "user"
+        and any(getattr(part, "text", None) for part in parts)
+        and not any(getattr(part, "function_response", None) for part in parts)
+    )
+
+
+def _split_turns(contents: List[Any]) -> List[List[Any]]:
+    """Groups contents into turns, each starting at a user message."""
+    turns: List[List[Any]] = []
+    for content in contents:
+        if not turns or _is_user_message(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _org_refs(response: Dict[str, Any]) -> List[str]:
+    ids = [item.get("id") for item in response.get("raw_data") or [] if isinstance(item, dict)]
+    ids += [row[1] for row in response.get("rows") or [] if isinstance(row, list) and len(row) > 1]
+    ids.append(response.get("org_id"))
+    return list(dict.fromkeys(org_id for org_id in ids if org_id))
+
+
+def _compact_response(name: str, response: Any, registry_version: str) -> Optional[Dict[str, Any]]:
+    if name not in _REFERENCE_TOOLS or not isinstance(response, dict) or response.get("compacted"):
+        return None
+    return {
+        "status": response.get("status"),
+        "compacted": True,
+        "org_ids": _org_refs(response),
+        "registry_version": registry_version,
+        "note": f"Earlier {name} result; call {name} again for full details.",
+    }
+
+
+def _compact_turn(turn: List[Any], registry_version: str) -> List[Any]:
+    """Copies a turn with its reference-tool results replaced by references."""
+    compacted = []
+    for content in turn:
+        parts = content.parts or []
+        new_parts = []
+        for part in parts:
+            function_response = getattr(part, "function_response", None)
+            reference = (
+                _compact_response(function_response.name, function_response.response, registry_version)
+                if function_response else None
+            )
+            if reference is None:
+                new_parts.append(part)
+            else:
+                new_parts.append(part.model_copy(update={
+                    "function_response": function_response.model_copy(update={"response": reference})
+                }))
+        changed = any(new is not old for new, old in zip(new_parts, parts))
+        compacted.append(content.model_copy(update={"parts": new_parts}) if changed else content)
+    return compacted
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _summarize_turn(turn: List[Any], limit: int) -> str:
+    user_text, tools, reply = "", [], ""
+    for content in turn:
+        for part in content.parts or []:
+            call = getattr(part, "function_call", None)
+            if call is not None:
+                args = ", ".join(f"{k}={v}" for k, v in (call.args or {}).items())
+                tools.append(f"{call.name}({args})")
+            elif getattr(part, "text", None):
+                if content.role == "user" and not user_text:
+                    user_text = part.text
+                elif content.role == "model":
+                    reply = part.text
+    line = f"- User: {_clip(user_text, limit)}"
+    if tools:
+        line += f" | Tools: {_clip('; '.join(tools), limit)}"
+    if reply:
+        line += f" | Agent: {_clip(reply, limit)}"
+    return line
+
+
+def _summary_content(old_turns: List[List[Any]], policy: CompactionPolicy, registry_version: str) -> Any:
+    from google.genai.types import Content, Part
+
+    listed = old_turns[-policy.max_summary_turns:]
+    lines = [_SUMMARY_HEADER]
+    if len(old_turns) > len(listed):
+        lines.append(f"- ({len(old_turns) - len(listed)} earlier turns omitted)")
+    lines += [_summarize_turn(turn, policy.summary_chars) for turn in listed]
+    lines.append(f"(Registry version {registry_version}; re-run tools for any details needed.)")
+    return Content(role="user", parts=[Part(text="\n".join(lines))])
+
+
+def compact_contents(
+    contents: List[Any],
+    policy: CompactionPolicy = default_policy,
+    registry_version: str = REGISTRY_VERSION
+) -> tuple[List[Any], Dict[str, int]]:
+    """
+    Compacts a prompt history to fit the policy's token budget.
+
+    Args:
+        registry_version: Version of the registry view the session's tools
+            answered from, recorded on every reference.
+
+    Returns:
+        (new contents, {"tokens_before", "tokens_after", "summarized_turns"})
+    """
+    tokens_before = estimate_tokens(contents)
+    turns = _split_turns(contents)
+    keep = max(1, min(policy.keep_turns, len(turns)))
+    old_turns = [_compact_turn(turn, registry_version) for turn in turns[:-keep]]
+    recent_turns = turns[-keep:]
+
+    compacted = [content for turn in old_turns + recent_turns for content in turn]
+    tokens = estimate_tokens(compacted)
+    summarized = 0
+
+    # Fold older turns into a summary, then give up recent turns (all but the current one) if needed
+    while tokens > policy.token_budget and old_turns:
+        summarized = len(old_turns)
+        compacted = [_summary_content(old_turns, policy, registry_version)] + [c for turn in recent_turns for c in turn]
+        tokens = estimate_tokens(compacted)
+        if tokens <= policy.token_budget or len(recent_turns) == 1:
+            break
+        old_turns.append(_compact_turn(recent_turns.pop(0), registry_version))
+
+    return compacted, {"tokens_before": tokens_before, "tokens_after": tokens, "summarized_turns": summarized}
+
+
+def compact_context_before_model_callback(callback_context: Any, llm_request: Any) -> Optional[Any]:
+    """Compacts the Finding Agent's history before each model call; never skips the call."""
+    contents = getattr(llm_request, "contents", None)
+    if not contents:
+        return None
+
+    try:
+        registry_version = view_for_context(callback_context).version
+    except KeyError:
+        # Unknown tenant: the tools report it and there are no results to reference
+        return None
+
+    started = time.perf_counter()
+    compacted, stats = compact_contents(contents, registry_version=registry_version)
+    if stats["tokens_after"] < stats["tokens_before"]:
+        llm_request.contents = compacted
+        _metrics["compacted"] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Compacted context from ~%d to ~%d tokens (%d turns summarized)",
+                         stats["tokens_before"], stats["tokens_after"], stats["summarized_turns"])
+
+    _metrics["calls"] += 1
+    _metrics["tokens_before"] += stats["tokens_before"]
+    _metrics["tokens_after"] += stats["tokens_after"]
+    _metrics["time_s"] += time.perf_counter() - started
+    return None
+
+
+def compaction_metrics() -> Dict[str, Any]:
+    """Token savings and overhead of context compaction."""
+    calls = _metrics["calls"]
+    return {
+        "calls": calls,
+        "compacted": _metrics["compacted"],
+        "avg_tokens_before": _metrics["tokens_before"] / calls if calls else 0.0,
+        "avg_tokens_after": _metrics["tokens_after"] / calls if calls else 0.0,
+        "avg_overhead_ms": _metrics["time_s"] / calls * 1000 if calls else 0.0,
+        "token_budget": default_policy.token_budget,
+    }
@@ -0,0 +1,285 @@
+"""
+Result cache for repeated discovery questions in the Finding Agent.
+
+`find_tech_initiatives` and `compare_initiatives` answers depend only on the
+static initiative registry, so they are cached under the tool name, its
+normalized arguments and the session's registry version (`REGISTRY_VERSION`,
+or the partner tenant's view version), so partner portals never share
+results. Nothing user- or session-specific goes into a cached result.
+
+`discovery_before_model_callback` answers a repeated discovery question
+without a model call. The donor's message is normalized to an intent
+(question type, region, org); org names are only matched against the
+session's tenant view. If this view's `find_tech_initiatives` result for the
+region is already cached, the answer is rendered from it, listing each
+initiative's ID and exact name, which is what `compare_initiatives` and
+`save_user_choice` need in later turns. The model's own narrative is never
+cached, so no donor's conversation can leak into another's answer.
+
+Anything that looks like a funding decision (amounts, "fund", "donate", ...)
+or asks about fund usage (answered from live org reports) always goes to the
+model.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import INITIATIVES_DB, REGISTRY_VERSION
+from femtech_empowerment_funding_advisor.data.tenants import RegistryView, view_for_context
+
+logger = logging.getLogger(__name__)
+
+# Session-state key (temp: keys are not persisted past the invocation)
+_STARTED_STATE_KEY = "temp:discovery_started"
+
+_REGION_ALIASES = {
+    "east-africa": ("east africa", "east-africa", "kenya", "nairobi", "mombasa", "coast"),
+    "pan-africa": ("pan-africa", "pan africa", "across africa", "continent", "nigeria", "ghana", "west africa"),
+    "global-diaspora": ("diaspora", "global"),
+}
+_DECISION_PATTERN = re.compile(r"[$€£]|\d|\b(fund|donate|donation|pay|give|send|contribute|choose|select|pick|go with|compare|rank)\b")
+# Fund-usage questions are answered from live org reports, which change without a registry edit
+_LIVE_PATTERN = re.compile(r"\b(spen[dt]|spending|using|used|usage|updates?|latest|recent(ly)?)\b")
+_ABOUT_PATTERN = re.compile(r"\b(tell me about|who (is|are)|what (is|does)|about|mission|impact|verified|verification)\b")
+_LIST_PATTERN = re.compile(r"\b(show|find|list|search|which|what|orgs?|organi[sz]ations?|initiatives?|programs?)\b")
+
+
+class TTLCache:
+    """Size-bounded LRU cache with per-entry TTL and hit/miss metrics."""
+
+    def __init__(self, max_entries: int = 512, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like `get`, but leaves the metrics and the LRU order alone."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ToolResultCache(TTLCache):
+    """
+    TTLCache for JSON-compatible tool results, stored as JSON text.
+
+    Every `get` (and the return value of `put`) is a fresh copy, so callers
+    can never change a cached result, or the registry records in its
+    `raw_data`, through the object they were handed.
+    """
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        text = super().get(key)
+        return json.loads(text) if text is not None else None
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        text = super().peek(key)
+        return json.loads(text) if text is not None else None
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """Caches `value` and returns a copy of it to hand out instead."""
+        text = json.dumps(value, separators=(",", ":"))
+        super().put(key, text)
+        return json.loads(text)
+
+
+tool_result_cache = ToolResultCache(max_entries=64)
+
+# Repeated-question answers (counts, and latency in seconds from the donor's
+# message to the answer)
+_short_circuit = {"hits": 0, "misses": 0, "hit_total": 0.0, "miss_total": 0.0, "miss_timed": 0}
+_metrics_lock = threading.Lock()
+
+
+def normalize_region(region: str) -> str:
+    """Maps free-text regions onto registry keys ('Kenya' -> 'east-africa')."""
+    text = region.strip().lower()
+    if text in INITIATIVES_DB or text == "africa":
+        return text
+    for key, aliases in _REGION_ALIASES.items():
+        if any(alias in text for alias in aliases):
+            return key
+    return text.replace(" ", "-")
+
+
+def normalize_intent(message: str, view: RegistryView) -> Optional[tuple]:
+    """
+    Reduces a donor message to a discovery intent answerable from the registry.
+
+    Returns:
+        (question_type, region, org_id), or None if the message is not a pure
+        discovery question. Only initiatives in `view` are matched by name.
+    """
+    text = " ".join(message.lower().split())
+    if not text or _DECISION_PATTERN.search(text) or _LIVE_PATTERN.search(text):
+        return None
+
+    for region, record in view.iter_initiatives():
+        if record["name"].lower() in text:
+            return ("org_profile", region, record["id"]) if _ABOUT_PATTERN.search(text) else None
+
+    region = normalize_region(text)
+    if region not in INITIATIVES_DB:
+        region = "africa" if "africa" in text else None
+    if region and _LIST_PATTERN.search(text):
+        return ("list_region", region, None)
+    return None
+
+
+def _render_answer(intent: tuple, result: Dict[str, Any]) -> Optional[str]:
+    """Answer text for an intent from a cached `find_tech_initiatives` result."""
+    question_type, region, org_id = intent
+    pairs = list(zip(result["initiatives"], result["raw_data"]))
+    if question_type == "org_profile":
+        pairs = [(display, record) for display, record in pairs if record["id"] == org_id]
+        if not pairs:
+            return None
+        header = "Here is what our verified registry holds on this initiative:"
+    else:
+        header = f"Here are the verified initiatives for {region}:"
+    entries = [f"{display}\n🆔 ID: `{record['id']}` (name: {record['name']})" for display, record in pairs]
+    footer = "Tell me which initiative you would like to support and how much, or ask me to compare them."
+    return "\n\n".join([header, *entries, footer])
+
+
+def cached_discovery_answer(message: str, view: RegistryView) -> Optional[str]:
+    """
+    Answers a discovery question from this view's cached tool results.
+
+    Returns:
+        The answer text, or None if the message is not a discovery question
+        or nothing for it is cached yet.
+    """
+    intent = normalize_intent(message, view)
+    if intent is None:
+        return None
+    result = tool_result_cache.peek(("find_tech_initiatives", intent[1], view.version))
+    return _render_answer(intent, result) if result is not None else None
+
+
+def _latest_user_text(llm_request: Any) -> Optional[str]:
+    """Text of the last content if it is a fresh user message (not a tool response)."""
+    contents = getattr(llm_request, "contents", None) or []
+    if not contents:
+        return None
+    last = contents[-1]
+    if getattr(last, "role", None) != "user" or not last.parts:
+        return None
+    if any(getattr(part, "function_response", None) for part in last.parts):
+        return None
+    texts = [part.text for part in last.parts if getattr(part, "text", None)]
+    return " ".join(texts) if texts else None
+
+
+def discovery_before_model_callback(callback_context: Any, llm_request: Any) -> Optional[Any]:
+    """Answers a repeated discovery question from cached tool results, skipping the model call."""
+    message = _latest_user_text(llm_request)
+    if message is None:
+        # Mid-turn call (after a tool response)
+        return None
+
+    started = time.perf_counter()
+    try:
+        view = view_for_context(callback_context)
+    except KeyError:
+        # Unknown tenant: the tools report it
+        return None
+    answer = cached_discovery_answer(message, view)
+    if answer is None:
+        callback_context.state[_STARTED_STATE_KEY] = started
+        with _metrics_lock:
+            _short_circuit["misses"] += 1
+        return None
+
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai.types import Content, Part
+
+    with _metrics_lock:
+        _short_circuit["hits"] += 1
+        _short_circuit["hit_total"] += time.perf_counter() - started
+    logger.info(f"Answered discovery question from cache for tenant '{view.tenant_id}'")
+    return LlmResponse(content=Content(role="model", parts=[Part(text=answer)]))
+
+
+def discovery_after_model_callback(callback_context: Any, llm_response: Any) -> Optional[Any]:
+    """Records how long a turn the cache could not answer took, once the model's final answer is in."""
+    started = callback_context.state.get(_STARTED_STATE_KEY)
+    content = getattr(llm_response, "content", None)
+    if started is None or getattr(llm_response, "partial", False) or not content or not content.parts:
+        return None
+    if any(getattr(part, "function_call", None) for part in content.parts):
+        return None
+    callback_context.state[_STARTED_STATE_KEY] = None
+    with _metrics_lock:
+        _short_circuit["miss_total"] += time.perf_counter() - started
+        _short_circuit["miss_timed"] += 1
+    return None
+
+
+def cache_metrics() -> Dict[str, Any]:
+    """Hit rates and answer latencies for the discovery caches."""
+    with _metrics_lock:
+        counts = dict(_short_circuit)
+    questions = counts["hits"] + counts["misses"]
+    return {
+        "tool_results": tool_result_cache.stats(),
+        "repeat_questions": {
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_rate": counts["hits"] / questions if questions else 0.0,
+            "avg_hit_latency_ms": counts["hit_total"] / counts["hits"] * 1000 if counts["hits"] else 0.0,
+            "avg_miss_latency_ms": counts["miss_total"] / counts["miss_timed"] * 1000 if counts["miss_timed"] else 0.0,
+        },
+        "registry_version": REGISTRY_VERSION,
+    }
@@ -2,33 +2,80 @@
 Tools for the Afara Tech Agent.
 
 This file contains tools for discovering verified African female tech empowerment 
-initiatives and for saving the user's funding choice to the shared state.
+initiatives, ranking them side by side, and for saving the user's funding
+choice to the shared state.
 """
 
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 import logging
+import math
 import re
 # Assuming you placed the previous data code in this path
-from femtech_empowerment_funding_advisor.data.femtech_programs import get_initiatives_by_region 
+from femtech_empowerment_funding_advisor.data.femtech_programs import get_initiative
+from femtech_empowerment_funding_advisor.data.mandate_events import put_state
+from femtech_empowerment_funding_advisor.data.tenants import RegistryView, view_for_context
+from femtech_empowerment_funding_advisor.tools.clock import expiry_epoch, utcnow
+from femtech_empowerment_funding_advisor.tools.ids import new_id
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.discovery_cache import normalize_region, tool_result_cache
+from femtech_empowerment_funding_advisor.tools.mandates import session_scope, user_scope
+from femtech_empowerment_funding_advisor.tools.velocity import velocity_guard
 
 logger = logging.getLogger(__name__)
 
+# Increased cap for institutional donors in your demo scenario
+MAX_DONATION = Money.from_major(1_000_000, "USD")
+
+# Metrics a donor can weight in `compare_initiatives`, with the default balance
+SCORE_WEIGHTS = {"rating": 0.4, "efficiency": 0.4, "reach": 0.2}
+COMPARE_COLUMNS = [
+    "rank", "id", "name", "region", "score", "region_percentile",
+    "rating", "efficiency", "beneficiaries", "cost_per_impact"
+]
+
+
+def _registry_view(tool_context: Any) -> tuple[Optional[RegistryView], Dict[str, Any]]:
+    """
+    Resolves the session's registry view.
+
+    Returns:
+        (view, error response if the session names an unknown tenant)
+    """
+    try:
+        return view_for_context(tool_context), {}
+    except KeyError as e:
+        logger.error(f"Unknown tenant {e}")
+        return None, {"status": "error", "message": f"This portal's initiative list ({e}) is not configured."}
+
 
 # This tool helps the agent verify credibility—the core value prop of your demo.
-async def find_tech_initiatives(region: str) -> Dict[str, Any]:
+async def find_tech_initiatives(region: str, tool_context: Any = None) -> Dict[str, Any]:
     """
     Finds vetted female tech empowerment initiatives for a specific African region.
     
     Args:
         region (str): The region to search (e.g., 'east-africa', 'pan-africa', 'west-africa').
+        tool_context: ADK tool context; its session state selects the partner's registry view
 
     Returns:
         A dictionary containing the search results with verification details.
     """
     logger.info(f"Tool called: Searching for verified initiatives in '{region}'")
+
+    view, error = _registry_view(tool_context)
+    if view is None:
+        return error
+
+    # Results depend only on the registry view, so repeat searches are served from cache
+    cache_key = ("find_tech_initiatives", normalize_region(region), view.version)
+    cached = tool_result_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Serving cached initiatives for '{region}'")
+        return cached
     
     # Call the new data function
-    initiatives = get_initiatives_by_region(region)
+    initiatives = view.get_initiatives_by_region(cache_key[1])
 
     if not initiatives:
         logger.warning(f"No initiatives found for region: {region}")
@@ -42,21 +89,197 @@ async def find_tech_initiatives(region: str) -> Dict[str, Any]:
     # Format for display using the new helper function
     formatted_initiatives = [_format_initiative_display(i) for i in initiatives]
 
-    return {
+    result = {
         "status": "success",
         "count": len(initiatives),
         "initiatives": formatted_initiatives,
         "raw_data": initiatives  # Keep raw data for context
     }
+    # Hand out the cache's copy: `raw_data` holds the shared registry records
+    return tool_result_cache.put(cache_key, result)
+
+
+@lru_cache(maxsize=16)
+def _registry_columns(view: RegistryView) -> Dict[str, Any]:
+    """
+    Column view of a tenant's registry, built once per view.
+
+    Each metric is min-max normalized to 0..1 across the view so weights
+    are comparable. Reach is log-scaled (62,000 vs 350 beneficiaries should not
+    drown out rating and efficiency); organizations that don't report reach get
+    the registry minimum.
+    """
+    pairs = list(view.iter_initiatives())
+    # A tenant may include nothing at all; every column is then empty
+    regions = tuple(region for region, _ in pairs)
+    records = tuple(record for _, record in pairs)
+    reported = [math.log10(r["beneficiaries"]) for r in records if r.get("beneficiaries")]
+    floor = min(reported, default=0.0)
+
+    raw = {
+        "rating": [float(r["rating"]) for r in records],
+        "efficiency": [float(r["efficiency"]) for r in records],
+        "reach": [math.log10(r["beneficiaries"]) if r.get("beneficiaries") else floor for r in records],
+    }
+
+    def normalize(column: List[float]) -> List[float]:
+        if not column:
+            return []
+        low, high = min(column), max(column)
+        span = high - low
+        return [(value - low) / span if span else 1.0 for value in column]
+
+    region_members: Dict[str, List[int]] = {}
+    for i, region in enumerate(regions):
+        region_members.setdefault(region, []).append(i)
+
+    return {
+        "ids": [r["id"] for r in records],
+        "records": records,
+        "regions": regions,
+        "normalized": {metric: normalize(column) for metric, column in raw.items()},
+        "region_members": region_members,
+        # USD donated per $1 that reaches programs
+        "cost_per_impact": [round(1 / r["efficiency"], 3) if r["efficiency"] else None for r in records],
+    }
+
+
+def _normalize_weights(weights: Optional[Dict[str, float]]) -> tuple[Optional[Dict[str, float]], str]:
+    """
+    Validates donor weights and scales them to sum to 1.
+
+    Returns:
+        (weights, error_message)
+    """
+    if not weights:
+        return dict(SCORE_WEIGHTS), ""
+    unknown = sorted(set(weights) - set(SCORE_WEIGHTS))
+    if unknown:
+        return None, f"Unknown weight(s) {unknown}; use any of {sorted(SCORE_WEIGHTS)}"
+    try:
+        cleaned = {metric: float(weights.get(metric, 0.0)) for metric in SCORE_WEIGHTS}
+    except (TypeError, ValueError):
+        return None, f"Weights must be numbers, got: {weights}"
+    if any(value < 0 or math.isnan(value) for value in cleaned.values()) or sum(cleaned.values()) <= 0:
+        return None, f"Weights must be non-negative with a positive total, got: {weights}"
+    total = sum(cleaned.values())
+    return {metric: value / total for metric, value in cleaned.items()}, ""
+
+
+def _score_registry(view: RegistryView, weights: Dict[str, float]) -> tuple[Dict[str, Any], List[float], List[float]]:
+    """
+    Scores every initiative in the view and its percentile within its region.
+
+    Returns:
+        (registry columns, scores 0-100, region percentiles 0-100)
+    """
+    columns = _registry_columns(view)
+    normalized = columns["normalized"]
+    weighted = [
+        [weights[metric] * value for value in normalized[metric]]
+        for metric in SCORE_WEIGHTS if weights[metric]
+    ]
+    scores = [round(100 * sum(parts), 1) for parts in zip(*weighted)]
+
+    # Share of regional peers this initiative outscores (100 for a region of one)
+    percentiles = [0.0] * len(scores)
+    for members in columns["region_members"].values():
+        peers = len(members) - 1
+        for i in members:
+            below = sum(1 for j in members if scores[j] < scores[i])
+            percentiles[i] = round(100 * below / peers, 1) if peers else 100.0
+
+    return columns, scores, percentiles
+
+
+async def compare_initiatives(
+    org_ids: List[str],
+    weights: Optional[Dict[str, float]] = None,
+    tool_context: Any = None
+) -> Dict[str, Any]:
+    """
+    Ranks verified initiatives side by side on rating, efficiency and reach.
+
+    Args:
+        org_ids: Initiative IDs or names to compare (e.g., ['she-code-africa', 'Pwani Teknowgalz']).
+            Pass an empty list to rank the whole registry.
+        weights: Optional importance of each metric, e.g. {"rating": 1, "efficiency": 2, "reach": 1}.
+            Defaults to rating 0.4, efficiency 0.4, reach 0.2.
+        tool_context: ADK tool context; its session state selects the partner's registry view
+
+    Returns:
+        A dictionary with a compact ranked table (`columns` + `rows`), best first.
+        `score` is 0-100, `region_percentile` is the share of same-region peers it
+        outscores, and `cost_per_impact` is the USD donated per $1 reaching programs.
+    """
+    logger.info(f"Tool called: Comparing initiatives {org_ids} with weights {weights}")
+
+    normalized_weights, error_message = _normalize_weights(weights)
+    if normalized_weights is None:
+        logger.error(f"Validation failed: {error_message}")
+        return {"status": "error", "message": error_message}
+
+    view, error = _registry_view(tool_context)
+    if view is None:
+        return error
+
+    # Resolve names and IDs to registry IDs, keeping the request order for ties
+    selected: List[str] = []
+    unknown: List[str] = []
+    for org in org_ids or []:
+        initiative = view.get_initiative(str(org))
+        if initiative is None:
+            unknown.append(org)
+        elif initiative["id"] not in selected:
+            selected.append(initiative["id"])
+    if org_ids and not selected:
+        return {
+            "status": "not_found",
+            "message": f"None of {org_ids} are in the verified registry."
+        }
+
+    cache_key = ("compare_initiatives", tuple(sorted(selected)), tuple(normalized_weights.values()), view.version)
+    cached = tool_result_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "unknown": unknown} if unknown else cached
+
+    columns, scores, percentiles = _score_registry(view, normalized_weights)
+    index = {org_id: i for i, org_id in enumerate(columns["ids"])}
+    positions = [index[org_id] for org_id in selected] if selected else list(range(len(scores)))
+    if not positions:
+        return {
+            "status": "not_found",
+            "message": "This registry has no initiatives to compare."
+        }
+    positions.sort(key=lambda i: -scores[i])
+
+    rows = []
+    for rank, i in enumerate(positions, start=1):
+        record = columns["records"][i]
+        rows.append([
+            rank, record["id"], record["name"], columns["regions"][i], scores[i], percentiles[i],
+            record["rating"], record["efficiency"], record.get("beneficiaries"), columns["cost_per_impact"][i]
+        ])
+
+    result = {
+        "status": "success",
+        "columns": COMPARE_COLUMNS,
+        "rows": rows,
+        "weights": {metric: round(value, 3) for metric, value in normalized_weights.items()},
+    }
+    result = tool_result_cache.put(cache_key, result)
+    logger.info(f"Ranked {len(rows)} initiatives")
+    return {**result, "unknown": unknown} if unknown else result
 
 
-def _validate_donation_data(org_name: str, amount: float) -> tuple[bool, str]:
+def validate_donation(org_name: str, amount: Money) -> tuple[bool, str]:
     """
-    Validates donation details before saving to state.
+    Validates donation details before saving to state. Shared by one-off
+    and recurring donations.
     
     Args:
         org_name: Name of the selected organization.
-        amount: Donation amount in USD.
+        amount: Donation amount as fixed-point Money.
         
     Returns:
         (is_valid, error_message)
@@ -66,24 +289,23 @@ def _validate_donation_data(org_name: str, amount: float) -> tuple[bool, str]:
         return False, "Organization name cannot be empty."
     
     # Validate Amount
-    if amount <= 0:
-        return False, f"Donation amount must be positive, got: ${amount}"
+    if amount.minor <= 0:
+        return False, f"Donation amount must be positive, got: ${amount.amount_str}"
     
-    # Increased cap for institutional donors in your demo scenario
-    if amount > 1_000_000:
-        return False, f"Donation amount exceeds maximum of $1,000,000: ${amount}"
+    if amount > MAX_DONATION:
+        return False, f"Donation amount exceeds maximum of $1,000,000: ${amount.amount_str}"
     
     return True, ""
 
 
-def _create_intent_mandate(org_name: str, amount: float) -> dict:
+def _create_intent_mandate(org_name: str, amount: Money) -> dict:
     """
     Creates an IntentMandate - AP2's verifiable credential for user intent.
     """
-    from datetime import datetime, timedelta, timezone
+    from datetime import timedelta
     from ap2.types.mandate import IntentMandate
     
-    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    expiry = utcnow() + timedelta(hours=1)
     
     # Generate a mock unique ID based on the name (since we aren't using US EINs)
     # in a real app, this would come from the DB (e.g., Registration Number)
@@ -91,7 +313,7 @@ def _create_intent_mandate(org_name: str, amount: float) -> dict:
     
     intent_mandate_model = IntentMandate(
         user_cart_confirmation_required=True,
-        natural_language_description=f"Fund verified initiative: {org_name} with ${amount:.2f}",
+        natural_language_description=f"Fund verified initiative: {org_name} with ${amount.amount_str}",
         merchants=[org_name],
         skus=None,
         requires_refundability=False,
@@ -99,15 +321,19 @@ def _create_intent_mandate(org_name: str, amount: float) -> dict:
     )
     
     intent_mandate_dict = intent_mandate_model.model_dump()
+    intent_mandate_dict["intent_expiry_epoch"] = expiry_epoch(expiry)
     
-    timestamp = datetime.now(timezone.utc)
+    timestamp = utcnow()
     intent_mandate_dict.update({
         "timestamp": timestamp.isoformat(),
-        # Unique intent ID for the transaction
-        "intent_id": f"fund_{mock_reg_id}_{int(timestamp.timestamp())}",
+        # Unique, time-ordered intent ID for the transaction
+        "intent_id": new_id("fund"),
+        "org_ref": mock_reg_id,
         "org_name": org_name,
-        "amount": amount,
-        "currency": "USD"
+        # Float kept for readability in state; amount_minor is the exact value
+        "amount": amount.to_float(),
+        "amount_minor": amount.minor,
+        "currency": amount.currency
     })
     
     return intent_mandate_dict
@@ -132,23 +358,47 @@ async def save_user_choice(
     """
     logger.info(f"Tool called: Saving funding choice of '{org_name}' for ${amount}")
 
+    # Convert to fixed-point once; everything downstream uses minor units
+    try:
+        money = Money.from_major(amount, "USD")
+    except ValueError as e:
+        logger.error(f"Validation failed: {e}")
+        return {"status": "error", "message": str(e)}
+
     # Validate inputs
-    is_valid, error_message = _validate_donation_data(org_name, amount)
+    is_valid, error_message = validate_donation(org_name, money)
     if not is_valid:
         logger.error(f"Validation failed: {error_message}")
         return {"status": "error", "message": error_message}
+
+    # Only vetted initiatives can be funded, and a partner portal only its own subset
+    view, error = _registry_view(tool_context)
+    if view is None:
+        return error
+    if view.get_initiative(org_name) is None:
+        logger.error(f"Validation failed: '{org_name}' is not offered by tenant '{view.tenant_id}'")
+        if get_initiative(org_name) is None:
+            return {"status": "error", "message": f"{org_name} is not in our verified initiative registry."}
+        return {"status": "error", "message": f"{org_name} is not available through this portal."}
+
+    # Velocity checks across calls (bursts of intents, split donations)
+    is_allowed, error_message = velocity_guard.check_intent(
+        user_scope(tool_context), session_scope(tool_context), org_name, money
+    )
+    if not is_allowed:
+        return {"status": "error", "message": error_message}
     
     # Create IntentMandate
-    intent_mandate = _create_intent_mandate(org_name, amount)
+    intent_mandate = _create_intent_mandate(org_name, money)
     
     # Write to shared state
-    tool_context.state["intent_mandate"] = intent_mandate
+    put_state(tool_context, {"intent_mandate": intent_mandate})
     
     logger.info(f"Successfully created IntentMandate for {org_name}")
     
     return {
         "status": "success",
-        "message": f"Prepared funding packet: ${amount:.2f} for {org_name}",
+        "message": f"Prepared funding packet: ${money.amount_str} for {org_name}",
         "intent_id": intent_mandate["intent_id"],
         "expiry": intent_mandate["intent_expiry"]
     }
@@ -0,0 +1,56 @@
+"""
+Tools for reporting how funded initiatives are using their money.
+
+Rollups come from the impact store, which initiatives feed through
+`runtime.impact_ingest`.
+"""
+
+from typing import Any, Dict
+import logging
+
+from femtech_empowerment_funding_advisor.data.impact_store import impact_store
+from femtech_empowerment_funding_advisor.data.tenants import view_for_context
+from femtech_empowerment_funding_advisor.runtime.offload import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+async def get_impact_updates(org: str, months: int = 6, tool_context: Any = None) -> Dict[str, Any]:
+    """
+    Reports how a verified initiative has been using its funds, from updates the
+    organization has pushed.
+
+    Args:
+        org: Initiative ID or name (e.g., 'pwani-teknowgalz' or 'Pwani Teknowgalz')
+        months: How many recent months of spending to include
+        tool_context: ADK tool context; its session state selects the partner's registry view
+
+    Returns:
+        A dictionary with totals, spending by category and month, and the latest updates.
+    """
+    logger.info(f"Tool called: Fetching impact updates for '{org}'")
+
+    try:
+        months = max(0, min(int(months), 36))
+    except (TypeError, ValueError, OverflowError):
+        return {"status": "error", "message": f"Months must be a whole number, got: {months!r}"}
+
+    try:
+        initiative = view_for_context(tool_context).get_initiative(org)
+    except KeyError as e:
+        return {"status": "error", "message": f"This portal's initiative list ({e}) is not configured."}
+    if initiative is None:
+        return {
+            "status": "not_found",
+            "message": f"'{org}' is not in the verified registry."
+        }
+
+    # Reads any newly pushed events from disk, so keep it off the event loop
+    summary = await run_blocking(impact_store.summary, initiative["id"], months)
+    if summary is None:
+        return {
+            "status": "not_found",
+            "message": f"{initiative['name']} has not reported any fund-usage updates yet."
+        }
+
+    return {"status": "success", "name": initiative["name"], **summary}
@@ -0,0 +1,66 @@
+"""
+Helpers shared by the AP2 mandate hops.
+
+Each hop stores its mandate in `tool_context.state` as a plain dict (state must
+stay JSON-serializable), and the next hop validates that dict again before
+acting on it. Validation goes through one `TypeAdapter` per mandate type,
+built on first use and reused for the life of the process.
+
+A session cache of validated models used to sit in front of this, checked
+against a blake2b hash of the dict. Canonical JSON plus the hash cost more
+than validating (`scripts/bench_mandate_validation.py`), so it was dropped.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M")
+
+# Mandate model -> its validator, built on first use
+_ADAPTERS: Dict[type, TypeAdapter] = {}
+
+
+def mandate_digest(data: Dict[str, Any]) -> str:
+    """Integrity hash over the canonical JSON form of a mandate dict."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def session_scope(tool_context: Any) -> Optional[str]:
+    """
+    Identifies the ADK session a tool call belongs to.
+
+    Returns None when the context carries no session id; callers must then
+    skip anything keyed by session rather than invent a key.
+    """
+    invocation_context = getattr(tool_context, "_invocation_context", None)
+    session = getattr(invocation_context, "session", None)
+    return getattr(session, "id", None) or None
+
+
+def user_scope(tool_context: Any) -> str:
+    """Identifies the donor a tool call is made for."""
+    user_id = getattr(tool_context, "user_id", None)
+    if user_id is None:
+        invocation_context = getattr(tool_context, "_invocation_context", None)
+        user_id = getattr(invocation_context, "user_id", None)
+    return user_id or "anonymous"
+
+
+def validate_mandate(data: Dict[str, Any], model_cls: Type[M]) -> M:
+    """
+    Validates a mandate dict read from state with a precompiled adapter.
+
+    Raises:
+        pydantic.ValidationError if `data` does not fit `model_cls`.
+    """
+    adapter = _ADAPTERS.get(model_cls)
+    if adapter is None:
+        adapter = _ADAPTERS.setdefault(model_cls, TypeAdapter(model_cls))
+    return adapter.validate_python(data)
@@ -9,7 +9,7 @@ from typing import Dict, Any
 import logging
 import hashlib
 import json
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
 from ap2.types.mandate import IntentMandate, CartMandate, CartContents
 from ap2.types.payment_request import (
     PaymentRequest,
@@ -19,38 +19,16 @@ from ap2.types.payment_request import (
     PaymentCurrencyAmount,
     PaymentOptions,
 )
+from femtech_empowerment_funding_advisor.data.mandate_events import get_state, put_state
+from femtech_empowerment_funding_advisor.tools.clock import check_expiry, expiry_epoch, utcnow
+from femtech_empowerment_funding_advisor.tools.ids import new_id
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.runtime.offload import run_blocking
+from femtech_empowerment_funding_advisor.tools.mandates import validate_mandate
 
 logger = logging.getLogger(__name__)
 
 
-def _validate_intent_expiry(intent_expiry_str: str) -> tuple[bool, str]:
-    """
-    Validates that the IntentMandate hasn't expired.
-    This ensures the funding offer is still valid before processing.
-    
-    Args:
-        intent_expiry_str: The ISO 8601 timestamp string from the IntentMandate.
-        
-    Returns:
-        (is_valid, error_message)
-    """
-    try:
-        # Handling ISO format quirks (Z vs +00:00)
-        expiry_time = datetime.fromisoformat(intent_expiry_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        
-        if expiry_time < now:
-            return False, f"Funding Intent expired at {intent_expiry_str}"
-        
-        time_remaining = expiry_time - now
-        logger.info(f"IntentMandate valid. Expires in {time_remaining.total_seconds():.0f} seconds")
-        
-        return True, ""
-        
-    except (ValueError, TypeError) as e:
-        return False, f"Invalid intent_expiry format: {e}"
-
-
 def _generate_merchant_signature(cart_contents: CartContents) -> str:
     """
     Generates a simulated merchant signature for the CartMandate contents.
@@ -74,49 +52,22 @@ def _generate_merchant_signature(cart_contents: CartContents) -> str:
     return signature
 
 
-async def create_cart_mandate(tool_context: Any) -> Dict[str, Any]:
+def _build_cart_mandate(
+    org_name: str,
+    amount: Money,
+    timestamp: datetime
+) -> tuple[CartMandate, dict]:
     """
-    Creates a W3C PaymentRequest-compliant CartMandate from the IntentMandate.
-    
-    This tool transforms the user's 'desire to fund' into a 'contractual offer'
-    from the selected African Tech Organization.
-    
+    Builds and signs a CartMandate offer for one organization and amount.
+
+    Shared by the `create_cart_mandate` tool and bulk settlement (recurring
+    donations).
+
     Returns:
-        Dictionary containing status and the created CartMandate.
+        (CartMandate model, dict for state/ledger storage)
     """
-    logger.info("Tool called: Creating CartMandate from Funding Intent")
-    
-    # 1. Read IntentMandate from state
-    intent_mandate_dict = tool_context.state.get("intent_mandate")
-    if not intent_mandate_dict:
-        logger.error("No IntentMandate found in state")
-        return {
-            "status": "error",
-            "message": "No IntentMandate found. Finding Agent must create intent first."
-        }
-    
-    # 2. Parse dictionary into validated Pydantic model
-    try:
-        intent_mandate_model = IntentMandate.model_validate(intent_mandate_dict)
-    except Exception as e:
-        logger.error(f"Could not validate IntentMandate structure: {e}")
-        return {"status": "error", "message": f"Invalid IntentMandate structure: {e}"}
-    
-    # 3. Validate Expiry (Security Check)
-    is_valid, error_message = _validate_intent_expiry(intent_mandate_model.intent_expiry)
-    if not is_valid:
-        logger.error(f"IntentMandate validation failed: {error_message}")
-        return {"status": "error", "message": error_message}
-    
-    # 4. Extract Data
-    # Note: We use the first merchant in the list, defaulting to 'Unknown Initiative' if empty
-    org_name = intent_mandate_model.merchants[0] if intent_mandate_model.merchants else "Unknown Initiative"
-    amount = intent_mandate_dict.get("amount", 0.0)
-    
-    # 5. Build CartMandate Models
-    timestamp = datetime.now(timezone.utc)
     # Unique Cart ID generation
-    cart_id = f"cart_{hashlib.sha256(f'{org_name}{timestamp.isoformat()}'.encode()).hexdigest()[:12]}"
+    cart_id = new_id("cart")
     cart_expiry = timestamp + timedelta(minutes=15)
     
     payment_request_model = PaymentRequest(
@@ -131,11 +82,11 @@ async def create_cart_mandate(tool_context: Any) -> Dict[str, Any]:
             id=f"order_{cart_id}",
             display_items=[PaymentItem(
                 label=f"Tech Empowerment Funding: {org_name}",
-                amount=PaymentCurrencyAmount(currency="USD", value=amount)
+                amount=PaymentCurrencyAmount(currency=amount.currency, value=amount.to_float())
             )],
             total=PaymentItem(
                 label="Total Contribution",
-                amount=PaymentCurrencyAmount(currency="USD", value=amount)
+                amount=PaymentCurrencyAmount(currency=amount.currency, value=amount.to_float())
             )
         ),
         options=PaymentOptions(request_shipping=False)
@@ -149,27 +100,87 @@ async def create_cart_mandate(tool_context: Any) -> Dict[str, Any]:
         payment_request=payment_request_model
     )
     
-    # 6. Generate Signature (The Proof)
+    # Generate Signature (The Proof)
     signature = _generate_merchant_signature(cart_contents_model)
     
-    # 7. Create Final CartMandate
+    # Create Final CartMandate
     cart_mandate_model = CartMandate(
         contents=cart_contents_model,
         merchant_authorization=signature
     )
     
-    # 8. Store in State
     cart_mandate_dict = cart_mandate_model.model_dump(mode='json')
     cart_mandate_dict["timestamp"] = timestamp.isoformat()
+    cart_mandate_dict["cart_expiry_epoch"] = expiry_epoch(cart_expiry)
+    cart_mandate_dict["total_minor"] = amount.minor
     
-    tool_context.state["cart_mandate"] = cart_mandate_dict
+    return cart_mandate_model, cart_mandate_dict
+
+
+async def create_cart_mandate(tool_context: Any) -> Dict[str, Any]:
+    """
+    Creates a W3C PaymentRequest-compliant CartMandate from the IntentMandate.
+    
+    This tool transforms the user's 'desire to fund' into a 'contractual offer'
+    from the selected African Tech Organization.
+    
+    Returns:
+        Dictionary containing status and the created CartMandate.
+    """
+    logger.info("Tool called: Creating CartMandate from Funding Intent")
+    
+    # 1. Read IntentMandate from state
+    intent_mandate_dict = get_state(tool_context, "intent_mandate")
+    if not intent_mandate_dict:
+        logger.error("No IntentMandate found in state")
+        return {
+            "status": "error",
+            "message": "No IntentMandate found. Finding Agent must create intent first."
+        }
+    
+    # 2. Parse dictionary into validated Pydantic model
+    try:
+        intent_mandate_model = await run_blocking(validate_mandate, intent_mandate_dict, IntentMandate)
+    except Exception as e:
+        logger.error(f"Could not validate IntentMandate structure: {e}")
+        return {"status": "error", "message": f"Invalid IntentMandate structure: {e}"}
+    
+    # 3. Validate Expiry (Security Check)
+    is_valid, error_message = check_expiry(
+        intent_mandate_dict.get("intent_expiry_epoch"),
+        intent_mandate_model.intent_expiry,
+        "Funding Intent",
+        "intent_expiry"
+    )
+    if not is_valid:
+        logger.error(f"IntentMandate validation failed: {error_message}")
+        return {"status": "error", "message": error_message}
+    
+    # 4. Extract Data
+    # Note: We use the first merchant in the list, defaulting to 'Unknown Initiative' if empty
+    org_name = intent_mandate_model.merchants[0] if intent_mandate_model.merchants else "Unknown Initiative"
+    try:
+        amount = Money.from_state(intent_mandate_dict)
+    except ValueError as e:
+        logger.error(f"Invalid IntentMandate amount: {e}")
+        return {"status": "error", "message": f"Invalid IntentMandate amount: {e}"}
+    
+    # 5-7. Build, sign and wrap the CartMandate
+    timestamp = utcnow()
+    cart_mandate_model, cart_mandate_dict = await run_blocking(_build_cart_mandate, org_name, amount, timestamp)
+    cart_id = cart_mandate_model.contents.id
+    cart_expiry = cart_mandate_model.contents.cart_expiry
+    signature = cart_mandate_model.merchant_authorization
+    
+    # 8. Store in State
+    put_state(tool_context, {"cart_mandate": cart_mandate_dict})
     
     logger.info(f"CartMandate created successfully: {cart_id}")
     
     return {
         "status": "success",
-        "message": f"Created signed CartMandate {cart_id} for ${amount:.2f} funding to {org_name}",
+        "message": f"Created signed CartMandate {cart_id} for ${amount.amount_str} funding to {org_name}",
         "cart_id": cart_id,
-        "cart_expiry": cart_expiry.isoformat(),
+        "cart_expiry": cart_expiry,
         "signature": signature
     }
\ No newline at end of file
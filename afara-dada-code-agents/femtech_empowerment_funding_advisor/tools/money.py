@@ -0,0 +1,203 @@
+"""
+Fixed-point money type shared by the AP2 mandate tools.
+
+Amounts are carried as integer minor units (cents for USD) plus an ISO 4217
+currency code, so totals and ledger reconciliation never pick up float
+rounding. AP2's `PaymentCurrencyAmount.value` is a float, so conversion back
+to float only happens at that boundary.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from operator import attrgetter
+from typing import Any, Iterable, Mapping, Optional
+
+# Minor-unit exponent per currency. Anything not listed uses 2 decimal places.
+_CURRENCY_EXPONENTS = {
+    "USD": 2,
+    "EUR": 2,
+    "GBP": 2,
+    "KES": 2,
+    "NGN": 2,
+    "GHS": 2,
+    "ZAR": 2,
+    "UGX": 0,
+    "RWF": 0,
+    "JPY": 0,
+}
+
+_get_minor = attrgetter("minor")
+_get_currency = attrgetter("currency")
+
+
+def _exponent(currency: str) -> int:
+    return _CURRENCY_EXPONENTS.get(currency, 2)
+
+
+class Money:
+    """
+    An amount of money in integer minor units.
+
+    Instances are treated as immutable; arithmetic returns new objects and
+    mixing currencies raises ValueError.
+    """
+
+    __slots__ = ("minor", "currency")
+
+    def __init__(self, minor: int, currency: str = "USD"):
+        self.minor = minor
+        self.currency = currency
+
+    @classmethod
+    def from_major(cls, amount: Any, currency: str = "USD") -> "Money":
+        """
+        Builds a Money from a major-unit amount (e.g. 100.5 dollars).
+
+        Floats are converted through their shortest repr, so 0.1 becomes
+        exactly 10 cents rather than 0.1000000000000000055... dollars.
+
+        Raises:
+            ValueError: If the amount is not a finite number.
+        """
+        try:
+            value = Decimal(repr(amount)) if isinstance(amount, float) else Decimal(str(amount))
+            exp = _exponent(currency)
+            minor = int(value.scaleb(exp).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except (InvalidOperation, ValueError, TypeError) as e:
+            raise ValueError(f"Invalid money amount: {amount!r}") from e
+        return cls(minor, currency)
+
+    @classmethod
+    def from_payment_amount(cls, amount: Any, minor: Optional[int] = None) -> "Money":
+        """
+        Builds a Money from an AP2 `PaymentCurrencyAmount` (or any object with `.currency` and `.value`).
+
+        The AP2 `value` is a float. When the exact minor units were stored
+        alongside it (e.g. a cart's `total_minor`), pass them as `minor`: they
+        are the amount, and the float must agree with them.
+
+        Raises:
+            ValueError: If the float does not match `minor`.
+        """
+        from_float = cls.from_major(amount.value, amount.currency)
+        if minor is None:
+            return from_float
+        exact = cls(int(minor), amount.currency)
+        if exact != from_float:
+            raise ValueError(f"Stored amount {exact} disagrees with the mandate amount {from_float}")
+        return exact
+
+    @classmethod
+    def from_state(cls, data: Mapping[str, Any], default_currency: str = "USD") -> "Money":
+        """
+        Reads a Money from a mandate dict stored in session state.
+
+        Prefers the exact `amount_minor` field and falls back to the legacy
+        float `amount` field for state written before it existed.
+        """
+        currency = data.get("currency") or default_currency
+        minor = data.get("amount_minor")
+        if minor is not None:
+            return cls(int(minor), currency)
+        return cls.from_major(data.get("amount", 0), currency)
+
+    @classmethod
+    def sum(cls, items: Iterable["Money"], currency: str = "USD") -> "Money":
+        """
+        Sums an iterable of Money in a single currency.
+
+        Raises:
+            ValueError: If any item is in a different currency.
+        """
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        currencies = set(map(_get_currency, items))
+        if currencies - {currency}:
+            raise ValueError(f"Cannot sum mixed currencies {sorted(currencies)} into {currency}")
+        return cls(sum(map(_get_minor, items)), currency)
+
+    @classmethod
+    def sum_minor(cls, minor_units: Iterable[int], currency: str = "USD") -> "Money":
+        """
+        Sums a column of minor-unit integers already known to share a currency.
+
+        This is the bulk path for ledger/report aggregation: it avoids building
+        a Money per row and runs on CPython's integer `sum` fast path.
+        """
+        return cls(sum(minor_units), currency)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-_exponent(self.currency))
+
+    def to_float(self) -> float:
+        """Float value for AP2 `PaymentCurrencyAmount`; only use at that boundary."""
+        return float(self.to_decimal())
+
+    @property
+    def amount_str(self) -> str:
+        """Major-unit amount formatted with the currency's decimal places (e.g. '100.50')."""
+        exp = _exponent(self.currency)
+        if exp == 0:
+            return str(self.minor)
+        sign = "-" if self.minor < 0 else ""
+        whole, frac = divmod(abs(self.minor), 10 ** exp)
+        return f"{sign}{whole}.{frac:0{exp}d}"
+
+    def _check_currency(self, other: "Money") -> None:
+        if self.currency != other.currency:
+            raise ValueError(f"Currency mismatch: {self.currency} vs {other.currency}")
+
+    def __add__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return Money(self.minor + other.minor, self.currency)
+
+    def __sub__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return Money(self.minor - other.minor, self.currency)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.minor, self.currency)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.minor == other.minor and self.currency == other.currency
+
+    def __lt__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return self.minor < other.minor
+
+    def __le__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return self.minor <= other.minor
+
+    def __gt__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return self.minor > other.minor
+
+    def __ge__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check_currency(other)
+        return self.minor >= other.minor
+
+    def __hash__(self) -> int:
+        return hash((self.minor, self.currency))
+
+    def __bool__(self) -> bool:
+        return self.minor != 0
+
+    def __repr__(self) -> str:
+        return f"Money({self.minor}, {self.currency!r})"
+
+    def __str__(self) -> str:
+        return f"{self.currency} {self.amount_str}"
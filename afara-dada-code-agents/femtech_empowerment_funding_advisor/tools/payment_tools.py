@@ -5,54 +5,39 @@ This file contains tools for creating PaymentMandates and simulating
 the transfer of funds to verified African Tech Initiatives.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
-import hashlib
-from datetime import datetime, timezone
 from ap2.types.mandate import CartMandate, PaymentMandate, PaymentMandateContents
 from ap2.types.payment_request import PaymentResponse
+from femtech_empowerment_funding_advisor.data.ledger import chain_record, default_ledger
+from femtech_empowerment_funding_advisor.data.mandate_events import get_state, put_state
+from femtech_empowerment_funding_advisor.tools.clock import check_expiry, utcnow
+from femtech_empowerment_funding_advisor.tools.consent import CONSENT_STATE_KEY, release_consent, spend_consent, verify_consent
+from femtech_empowerment_funding_advisor.tools.ids import new_id
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.runtime.offload import run_blocking
+from femtech_empowerment_funding_advisor.tools.mandates import user_scope, validate_mandate
+from femtech_empowerment_funding_advisor.tools.velocity import velocity_guard
 
 logger = logging.getLogger(__name__)
 
+# Simulated card token used for every demo transfer
+FUNDING_TOKEN = "simulated_funding_token_AFRICA_TECH"
 
-def _validate_cart_expiry(cart: CartMandate) -> tuple[bool, str]:
-    """
-    Validates that the CartMandate (Funding Contract) hasn't expired.
-    
-    This is a critical security check - expired offers should not be processed.
-    
-    Args:
-        cart: The Pydantic CartMandate model to validate.
-        
-    Returns:
-        (is_valid, error_message): Tuple indicating if cart is still valid.
-    """
-    try:
-        expiry_str = cart.contents.cart_expiry
-        # Handling ISO format quirks (Z vs +00:00)
-        expiry_time = datetime.fromisoformat(expiry_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        
-        if expiry_time < now:
-            return False, f"Funding Offer (CartMandate) expired at {expiry_str}"
-        
-        time_remaining = expiry_time - now
-        logger.info(f"CartMandate valid. Expires in {time_remaining.total_seconds():.0f} seconds")
-        
-        return True, ""
-        
-    except (ValueError, TypeError, AttributeError) as e:
-        return False, f"Invalid cart_expiry format or structure: {e}"
-
-
-def _create_payment_mandate(cart: CartMandate, consent_granted: bool) -> dict:
+
+def _create_payment_mandate(
+    cart: CartMandate,
+    consent_granted: bool,
+    agent_present: bool = True,
+    consent_id: Optional[str] = None
+) -> dict:
     """
     Creates a PaymentMandate using the official AP2 Pydantic models.
     
     It links to the CartMandate and includes user consent status to authorize
     the transfer of funds.
     """
-    timestamp = datetime.now(timezone.utc)
+    timestamp = utcnow()
     
     # Safely extract details from the validated CartMandate model
     cart_id = cart.contents.id
@@ -63,12 +48,12 @@ def _create_payment_mandate(cart: CartMandate, consent_granted: bool) -> dict:
     payment_response_model = PaymentResponse(
         request_id=cart_id,
         method_name="CARD",  # Simulated Card Payment
-        details={"token": "simulated_funding_token_AFRICA_TECH"}
+        details={"token": FUNDING_TOKEN}
     )
     
     # Create the PaymentMandateContents model
     payment_mandate_contents_model = PaymentMandateContents(
-        payment_mandate_id=f"payment_{hashlib.sha256(f'{cart_id}{timestamp.isoformat()}'.encode()).hexdigest()[:12]}",
+        payment_mandate_id=new_id("payment"),
         payment_details_id=cart_id,
         payment_details_total=total_item,
         payment_response=payment_response_model,
@@ -87,71 +72,212 @@ def _create_payment_mandate(cart: CartMandate, consent_granted: bool) -> dict:
     # Add custom context fields for the demo state
     final_dict['payment_mandate_contents']['user_consent'] = consent_granted
     final_dict['payment_mandate_contents']['consent_timestamp'] = timestamp.isoformat() if consent_granted else None
-    final_dict['agent_present'] = True
+    if consent_id:
+        # Pre-consented (headless) payment: which signed consent authorized it
+        final_dict['payment_mandate_contents']['consent_id'] = consent_id
+    final_dict['agent_present'] = agent_present
     
     return final_dict
 
 
+def _cart_total(cart_model: CartMandate, cart_mandate_dict: dict) -> Money:
+    """
+    The amount a cart charges: its exact stored `total_minor`, checked against
+    the AP2 float total (carts stored before `total_minor` use the float).
+
+    Raises:
+        ValueError: If the two disagree.
+    """
+    return Money.from_payment_amount(
+        cart_model.contents.payment_request.details.total.amount, cart_mandate_dict.get("total_minor")
+    )
+
+
+def _settle_payment(
+    cart_model: CartMandate,
+    amount: Money,
+    consent_granted: bool,
+    agent_present: bool = True,
+    consent_id: Optional[str] = None
+) -> tuple[dict, dict]:
+    """
+    Creates the PaymentMandate for a validated cart and simulates the transfer
+    of `amount` (from `_cart_total`).
+
+    Shared by the `create_payment_mandate` tool and bulk settlement of
+    recurring donations (which runs with `agent_present=False`).
+
+    Returns:
+        (payment_mandate_dict, payment_result)
+    """
+    # Create the spec-compliant PaymentMandate
+    payment_mandate_dict = _create_payment_mandate(cart_model, consent_granted, agent_present, consent_id)
+    return payment_mandate_dict, _simulate_transfer(cart_model, amount)
+
+
+def _payment_token(payment_mandate_dict: dict) -> Optional[str]:
+    """
+    The instrument token a PaymentMandate charges, for per-token velocity limits.
+
+    Returns None for the simulated demo token: every donor shares it, so
+    counting it would cap all payments in the process together.
+    """
+    token = payment_mandate_dict["payment_mandate_contents"]["payment_response"]["details"].get("token")
+    return None if token == FUNDING_TOKEN else token
+
+
+def _simulate_transfer(cart_model: CartMandate, amount: Money) -> dict:
+    """Simulates the funding transfer of `amount` for a cart. Returns the payment result."""
+    cart_id = cart_model.contents.id
+    merchant_name = cart_model.contents.merchant_name
+
+    # Simulate payment processing (Funding Transfer)
+    transaction_id = new_id("txn")
+    payment_result = {
+        "transaction_id": transaction_id,
+        "cart_id": cart_id,
+        "status": "completed",
+        "amount": amount.to_float(),
+        "amount_minor": amount.minor,
+        "currency": amount.currency,
+        "recipient": merchant_name,
+        "timestamp": utcnow().isoformat(),
+        "simulation": True
+    }
+    return payment_result
+
+
 async def create_payment_mandate(tool_context: Any) -> Dict[str, Any]:
     """
     Creates a PaymentMandate and simulates the secure transfer of funds.
     
     This tool reads the CartMandate from state, validates the contract,
     and executes the transaction logic.
+
+    If the session carries a consent token (headless mode), the token must be
+    valid for this donor, organization and amount; otherwise consent comes from
+    the conversational confirmation before this call.
     """
     logger.info("Tool called: Creating PaymentMandate and processing funding transfer")
     
     # 1. Read CartMandate dictionary from state
-    cart_mandate_dict = tool_context.state.get("cart_mandate")
+    cart_mandate_dict = get_state(tool_context, "cart_mandate")
     if not cart_mandate_dict:
         logger.error("No CartMandate found in state")
         return { "status": "error", "message": "No CartMandate found. Merchant Agent must create the funding contract first." }
     
     # 2. Parse dictionary into a validated Pydantic model
     try:
-        cart_model = CartMandate.model_validate(cart_mandate_dict)
+        cart_model = await run_blocking(validate_mandate, cart_mandate_dict, CartMandate)
     except Exception as e:
         logger.error(f"Could not validate CartMandate structure: {e}")
         return {"status": "error", "message": f"Invalid CartMandate structure: {e}"}
     
+    # Idempotency: the cart ID keys the transfer, so a repeated call (e.g. a
+    # retried model hop re-issuing the tool call) returns the original result
+    # instead of moving funds twice.
+    previous_result = get_state(tool_context, "payment_result")
+    if previous_result and previous_result.get("cart_id") == cart_model.contents.id \
+            and previous_result.get("status") == "completed":
+        logger.info(f"Payment for cart {cart_model.contents.id} already processed: {previous_result['transaction_id']}")
+        previous_mandate = get_state(tool_context, "payment_mandate") or {}
+        return {
+            "status": "success",
+            "message": f"Funding to {previous_result['recipient']} was already transferred; no new charge was made.",
+            "transaction_id": previous_result["transaction_id"],
+            "payment_mandate_id": previous_mandate.get("payment_mandate_contents", {}).get("payment_mandate_id"),
+            "duplicate": True
+        }
+
     # 3. Validate that the cart hasn't expired
-    is_valid, error_message = _validate_cart_expiry(cart_model)
+    is_valid, error_message = check_expiry(
+        cart_mandate_dict.get("cart_expiry_epoch"),
+        cart_model.contents.cart_expiry,
+        "Funding Offer (CartMandate)",
+        "cart_expiry"
+    )
     if not is_valid:
         logger.error(f"CartMandate validation failed: {error_message}")
         return {"status": "error", "message": error_message}
     
-    # 4. Safely extract data
-    cart_id = cart_model.contents.id
-    merchant_name = cart_model.contents.merchant_name
-    amount_value = cart_model.contents.payment_request.details.total.amount.value
-    currency = cart_model.contents.payment_request.details.total.amount.currency
-    consent_granted = True  # Assume consent for this demo flow
-    
-    # 5. Create the spec-compliant PaymentMandate
-    payment_mandate_dict = _create_payment_mandate(cart_model, consent_granted)
-    
-    # 6. Simulate payment processing (Funding Transfer)
-    transaction_id = f"txn_{hashlib.sha256(f'{cart_id}{datetime.now(timezone.utc).isoformat()}'.encode()).hexdigest()[:16]}"
-    payment_result = {
-        "transaction_id": transaction_id,
-        "status": "completed",
-        "amount": amount_value,
-        "currency": currency,
-        "recipient": merchant_name,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "simulation": True
-    }
+    try:
+        cart_amount = _cart_total(cart_model, cart_mandate_dict)
+    except ValueError as e:
+        logger.error(f"CartMandate amount check failed: {e}")
+        return {"status": "error", "message": f"Invalid CartMandate amount: {e}"}
+
+    # Headless mode: a signed, scoped consent token stands in for the consent turn
+    consent_id = claims = None
+    consent_token = tool_context.state.get(CONSENT_STATE_KEY)
+    if consent_token is not None:
+        is_valid, error_message, claims = verify_consent(
+            consent_token, user_scope(tool_context), cart_model.contents.merchant_name, cart_amount
+        )
+        if not is_valid:
+            logger.error(f"Consent check failed: {error_message}")
+            return {"status": "error", "message": f"Pre-authorized consent rejected: {error_message}"}
+        consent_id = claims["consent_id"]
+
+    # 4. Create the PaymentMandate (nothing is charged yet)
+    consent_granted = True  # Token-verified, or confirmed in the conversation
+    payment_mandate_dict = _create_payment_mandate(cart_model, consent_granted, consent_id=consent_id)
+
+    # Count this payment against the token's total before any funds move, so a
+    # replayed token cannot be spent past what the donor pre-authorized
+    if claims is not None:
+        is_recorded, error_message = spend_consent(claims, cart_amount)
+        if not is_recorded:
+            logger.error(f"Consent check failed: {error_message}")
+            return {"status": "error", "message": f"Pre-authorized consent rejected: {error_message}"}
+
+    # Velocity checks across payments (bursts, instrument reuse, split donations).
+    # They record the payment, so they run only once nothing else can reject it.
+    is_allowed, error_message = velocity_guard.check_payment(
+        user_scope(tool_context), _payment_token(payment_mandate_dict), cart_amount
+    )
+    if not is_allowed:
+        if claims is not None:
+            release_consent(claims, cart_amount)
+        return {"status": "error", "message": error_message}
+
+    # 5-6. Simulate the transfer
+    payment_result = _simulate_transfer(cart_model, cart_amount)
+    transaction_id = payment_result["transaction_id"]
+    merchant_name = payment_result["recipient"]
+    amount = Money(payment_result["amount_minor"], payment_result["currency"])
     
     # 7. Write results to state
-    tool_context.state["payment_mandate"] = payment_mandate_dict
-    tool_context.state["payment_result"] = payment_result
+    put_state(tool_context, {"payment_mandate": payment_mandate_dict, "payment_result": payment_result})
+    
+    # 8. Record the settled chain in the ledger for audit and reporting
+    record = chain_record(get_state(tool_context, "intent_mandate"), cart_mandate_dict, payment_mandate_dict, payment_result)
+    try:
+        await run_blocking(default_ledger.append, record)
+    except OSError as e:
+        logger.error(f"Could not append transaction {transaction_id} to ledger: {e}")
     
     logger.info(f"Funding transfer processed successfully: {transaction_id}")
     
     return {
         "status": "success",
         # Updated success message to match the project tone
-        "message": f"Funding of {currency} {amount_value:.2f} to {merchant_name} transferred successfully.",
+        "message": f"Funding of {amount} to {merchant_name} transferred successfully.",
         "transaction_id": transaction_id,
         "payment_mandate_id": payment_mandate_dict["payment_mandate_contents"]["payment_mandate_id"]
-    }
\ No newline at end of file
+    }
+
+
+async def create_preconsented_payment_mandate(tool_context: Any) -> Dict[str, Any]:
+    """
+    Headless variant of `create_payment_mandate` for flows with no consent turn.
+
+    Refuses to run unless the session carries a consent token, so an agent
+    without a confirmation step can never move funds on implied consent.
+    """
+    if tool_context.state.get(CONSENT_STATE_KEY) is None:
+        logger.error("Headless payment attempted without a consent token")
+        return {
+            "status": "error",
+            "message": "No pre-authorized consent in this session; the donor must confirm the transfer interactively."
+        }
+    return await create_payment_mandate(tool_context)
@@ -0,0 +1,310 @@
+"""
+Tools for recurring (monthly) donations.
+
+A recurring donation is stored as a pre-authorized subscription: a reusable
+IntentMandate plus a schedule (interval) and a spending cap. Once the donor has
+consented, each run is settled in bulk by `runtime.recurring_scheduler`
+without an LLM or a consent turn in the loop.
+
+Subscriptions are journaled to `subscriptions.jsonl` as soon as they are
+created or change: each line is the full current record of one subscription
+and the last line per ID wins. The scheduler runs in its own process and
+picks up new lines with `SubscriptionStore.sync()`.
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import logging
+import os
+import threading
+
+from femtech_empowerment_funding_advisor.data.ledger import DATA_DIR
+from femtech_empowerment_funding_advisor.data.mandate_events import put_state
+from femtech_empowerment_funding_advisor.runtime.offload import run_blocking
+from femtech_empowerment_funding_advisor.tools.clock import expiry_epoch, utcnow
+from femtech_empowerment_funding_advisor.tools.ids import new_id
+from femtech_empowerment_funding_advisor.tools.mandates import user_scope
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import MAX_DONATION, validate_donation
+
+logger = logging.getLogger(__name__)
+
+# Pre-authorizations are reviewed yearly
+SUBSCRIPTION_TERM = timedelta(days=365)
+DEFAULT_SUBSCRIPTIONS_PATH = Path(os.environ.get("AFARA_SUBSCRIPTIONS_PATH", DATA_DIR / "subscriptions.jsonl"))
+# Upper bound on what one subscription may ever charge
+MAX_RECURRING_TOTAL = MAX_DONATION
+
+
+@dataclass(slots=True)
+class Subscription:
+    """A pre-authorized recurring donation."""
+    subscription_id: str
+    user_id: str
+    org_name: str
+    amount_minor: int
+    currency: str
+    interval_s: int
+    cap_minor: int
+    next_run: float  # epoch seconds
+    expires_at: float  # epoch seconds
+    charged_minor: int = 0
+    runs: int = 0
+    status: str = "active"  # active | completed | expired | cancelled
+    intent_mandate: Dict[str, Any] = field(default_factory=dict)
+    # Run key ("<subscription_id>:<run>") whose progress is saved but whose
+    # ledger append is not confirmed yet, and the ledger size before it
+    pending_run: Optional[str] = None
+    pending_offset: int = 0
+
+    @property
+    def amount(self) -> Money:
+        return Money(self.amount_minor, self.currency)
+
+    def can_charge(self, now: float) -> bool:
+        return (
+            self.status == "active"
+            and now <= self.expires_at
+            and self.charged_minor + self.amount_minor <= self.cap_minor
+        )
+
+
+class SubscriptionStore:
+    """
+    Subscription registry journaled to a JSONL file.
+
+    Args:
+        path: Journal file; None keeps the store in memory only (benchmarks).
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def add(self, subscription: Subscription) -> None:
+        """Adds (or replaces) a subscription and journals it."""
+        self.persist([subscription])
+
+    def persist(self, subscriptions: Iterable[Subscription]) -> int:
+        """
+        Journals the current state of `subscriptions` in one appended, fsynced
+        write. Returns the number written.
+        """
+        subscriptions = list(subscriptions)
+        with self._lock:
+            for subscription in subscriptions:
+                self._subscriptions[subscription.subscription_id] = subscription
+            if self.path is None or not subscriptions:
+                return len(subscriptions)
+            data = "".join(json.dumps(asdict(s), separators=(",", ":")) + "\n" for s in subscriptions)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # A single O_APPEND write, so lines from other processes never interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return len(subscriptions)
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        return self._subscriptions.get(subscription_id)
+
+    def cancel(self, subscription_id: str) -> bool:
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is None or subscription.status != "active":
+            return False
+        subscription.status = "cancelled"
+        self.persist([subscription])
+        return True
+
+    def __iter__(self) -> Iterator[Subscription]:
+        return iter(list(self._subscriptions.values()))
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def sync(self) -> List[Subscription]:
+        """
+        Applies journal lines written since the last sync, including by other
+        processes. Returns the subscriptions that were added or changed.
+        """
+        if self.path is None or not self.path.exists():
+            return []
+        changed: Dict[str, Subscription] = {}
+        with self._lock, open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn or in-progress write; picked up (or skipped) next time
+                    break
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    subscription = Subscription(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    logger.error(f"Skipping corrupt subscription line at byte {self._offset - len(line)}: {e}")
+                    continue
+                # Our own journal writes come back unchanged
+                if self._subscriptions.get(subscription.subscription_id) != subscription:
+                    self._subscriptions[subscription.subscription_id] = subscription
+                    changed[subscription.subscription_id] = subscription
+        return list(changed.values())
+
+    def load(self) -> int:
+        """Reads the whole journal. Returns the number of subscriptions."""
+        self._offset = 0
+        self.sync()
+        return len(self._subscriptions)
+
+    def compact(self) -> None:
+        """
+        Rewrites the journal with one line per subscription, swapped in with
+        an atomic rename.
+
+        Only run while no other process is writing the journal.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for subscription in self._subscriptions.values():
+                    f.write(json.dumps(asdict(subscription), separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._offset = self.path.stat().st_size
+
+
+subscription_store = SubscriptionStore(DEFAULT_SUBSCRIPTIONS_PATH)
+
+
+def _create_recurring_intent(
+    subscription_id: str,
+    org_name: str,
+    amount: Money,
+    interval_days: int,
+    cap: Money,
+    expiry: datetime
+) -> dict:
+    """
+    Creates the reusable IntentMandate backing a subscription.
+
+    Unlike a one-off intent it lives for the whole subscription term and does
+    not require per-cart confirmation; the cap and schedule bound what it can
+    authorize.
+    """
+    from ap2.types.mandate import IntentMandate
+
+    intent_mandate_model = IntentMandate(
+        user_cart_confirmation_required=False,
+        natural_language_description=(
+            f"Recurring funding: {org_name} with ${amount.amount_str} every {interval_days} days, "
+            f"up to ${cap.amount_str} in total"
+        ),
+        merchants=[org_name],
+        skus=None,
+        requires_refundability=False,
+        intent_expiry=expiry.isoformat()
+    )
+
+    intent_mandate_dict = intent_mandate_model.model_dump()
+    intent_mandate_dict.update({
+        "intent_expiry_epoch": expiry_epoch(expiry),
+        "timestamp": utcnow().isoformat(),
+        "intent_id": f"fund_{subscription_id}",
+        "org_name": org_name,
+        "amount": amount.to_float(),
+        "amount_minor": amount.minor,
+        "currency": amount.currency,
+        "recurring": {
+            "subscription_id": subscription_id,
+            "interval_days": interval_days,
+            "cap_minor": cap.minor,
+        }
+    })
+    return intent_mandate_dict
+
+
+async def create_recurring_donation(
+    org_name: str,
+    amount: float,
+    interval_days: int,
+    max_total: float,
+    tool_context: Any
+) -> Dict[str, Any]:
+    """
+    Creates a pre-authorized recurring donation (e.g. monthly giving).
+
+    Only call this AFTER the user has explicitly consented to the recurring
+    schedule and the total cap.
+
+    Args:
+        org_name: Name of the initiative to fund (e.g., 'Pwani Teknowgalz')
+        amount: Amount in USD charged on each run
+        interval_days: Days between runs (30 for monthly)
+        max_total: Maximum total in USD the subscription may ever charge
+        tool_context: ADK tool context providing access to shared state
+
+    Returns:
+        Dictionary containing status and the subscription details
+    """
+    logger.info(f"Tool called: Creating recurring donation of ${amount} every {interval_days} days to '{org_name}'")
+
+    try:
+        money = Money.from_major(amount, "USD")
+        cap = Money.from_major(max_total, "USD")
+    except ValueError as e:
+        logger.error(f"Validation failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+    is_valid, error_message = validate_donation(org_name, money)
+    if is_valid and not 1 <= interval_days <= 366:
+        is_valid, error_message = False, f"Interval must be between 1 and 366 days, got: {interval_days}"
+    if is_valid and cap < money:
+        is_valid, error_message = False, f"Total cap ${cap.amount_str} is below the per-run amount ${money.amount_str}"
+    if is_valid and cap > MAX_RECURRING_TOTAL:
+        is_valid, error_message = False, f"Total cap exceeds maximum of ${MAX_RECURRING_TOTAL.amount_str}: ${cap.amount_str}"
+    if not is_valid:
+        logger.error(f"Validation failed: {error_message}")
+        return {"status": "error", "message": error_message}
+
+    now = utcnow()
+    expiry = now + SUBSCRIPTION_TERM
+    user_id = user_scope(tool_context)
+    subscription_id = new_id("sub")
+
+    intent_mandate = _create_recurring_intent(subscription_id, org_name, money, interval_days, cap, expiry)
+    subscription = Subscription(
+        subscription_id=subscription_id,
+        user_id=user_id,
+        org_name=org_name,
+        amount_minor=money.minor,
+        currency=money.currency,
+        interval_s=interval_days * 86_400,
+        cap_minor=cap.minor,
+        # First run is settled in the next window
+        next_run=now.timestamp(),
+        expires_at=expiry.timestamp(),
+        intent_mandate=intent_mandate,
+    )
+    # Journaled before confirming, so the scheduler process will settle it
+    await run_blocking(subscription_store.add, subscription)
+    put_state(tool_context, {"recurring_mandate": asdict(subscription)})
+
+    logger.info(f"Recurring donation created: {subscription_id}")
+
+    return {
+        "status": "success",
+        "message": f"Set up ${money.amount_str} every {interval_days} days to {org_name} (cap ${cap.amount_str})",
+        "subscription_id": subscription_id,
+        "first_run": now.isoformat(),
+        "expiry": expiry.isoformat()
+    }
@@ -0,0 +1,263 @@
+"""
+Velocity and fraud checks for intent creation and payment.
+
+`validate_donation` only looks at one donation in isolation. These checks
+look across calls:
+
+- token buckets per user and per session limit how fast intents and payments
+  can be created (a burst, then a sustained rate),
+- a sliding-window count per organization catches floods against one org,
+- a sliding-window count per payment token catches card-testing bursts,
+- a sliding-window sum of paid amounts per user catches a large donation split
+  into pieces that each stay under the per-donation cap.
+
+Bucket state lives in a bounded LRU map. The sliding windows are time-bucketed
+count-min sketches, so their memory is fixed no matter how many users, orgs or
+tokens are seen. A count-min sketch never under-counts: a hash collision can
+only make a limit trip early, never let traffic through. Each check is a few
+hash and array operations, i.e. a few microseconds.
+
+Checks are called from the tools on the event loop, so no locking is done.
+"""
+
+import logging
+import os
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import sub
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from femtech_empowerment_funding_advisor.tools.clock import now as clock_now
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketMap:
+    """
+    One token bucket per key, `burst` deep and refilled at `rate_per_s`.
+
+    At most `max_keys` buckets are kept; the least recently used is dropped
+    first (a dropped key simply starts again with a full bucket).
+    """
+
+    def __init__(self, rate_per_s: float, burst: float, max_keys: int = 100_000,
+                 clock: Callable[[], float] = clock_now):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+
+    def try_acquire(self, key: Hashable, cost: float = 1.0) -> bool:
+        """Takes `cost` tokens from the key's bucket if it has them."""
+        at = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, at]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (at - bucket[1]) * self.rate_per_s)
+            bucket[1] = at
+
+        if bucket[0] < cost:
+            return False
+        bucket[0] -= cost
+        return True
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class WindowedCountMinSketch:
+    """
+    Approximate per-key totals over a sliding time window, in fixed memory.
+
+    The window is split into `buckets` slots, each a `depth` x `width`
+    count-min table, plus a running table holding the sum of all live slots.
+    Lookups read only the running table; when a slot ages out its counts are
+    subtracted from it once. Totals cover the last `window_s` seconds at slot
+    granularity.
+    """
+
+    def __init__(self, window_s: float, buckets: int = 6, width: int = 2048, depth: int = 4,
+                 clock: Callable[[], float] = clock_now):
+        self.window_s = window_s
+        self.width = width
+        self.depth = depth
+        self._slot_s = window_s / buckets
+        self._clock = clock
+        self._tables = [self._empty() for _ in range(buckets)]
+        # Which slot number (time // slot_s) each table holds (-1: empty)
+        self._slots = [-1] * buckets
+        self._total = self._empty()
+        self._slot = -1
+        self._last_key: Hashable = None
+        self._last_cells: List[int] = []
+
+    def _empty(self) -> array:
+        return array("q", bytes(8 * self.width * self.depth))
+
+    def _cells(self, key: Hashable) -> List[int]:
+        # A check is usually an estimate followed by an add for the same key
+        if key == self._last_key:
+            return self._last_cells
+        # Double hashing: row i uses h1 + i*h2, with h2 odd so the rows differ
+        h1 = hash(key)
+        h2 = ((h1 >> 17) ^ (h1 * 31)) | 1
+        width = self.width
+        cells = [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+        self._last_key, self._last_cells = key, cells
+        return cells
+
+    def _advance(self) -> int:
+        """Moves to the current slot, retiring slots that left the window."""
+        slot = int(self._clock() // self._slot_s)
+        if slot != self._slot:
+            oldest = slot - len(self._tables) + 1
+            for i, held in enumerate(self._slots):
+                if 0 <= held < oldest:
+                    self._total = array("q", map(sub, self._total, self._tables[i]))
+                    self._tables[i] = self._empty()
+                    self._slots[i] = -1
+            self._slot = slot
+        return slot
+
+    def add(self, key: Hashable, amount: int = 1) -> None:
+        slot = self._advance()
+        index = slot % len(self._tables)
+        self._slots[index] = slot
+        table = self._tables[index]
+        total = self._total
+        for cell in self._cells(key):
+            table[cell] += amount
+            total[cell] += amount
+
+    def estimate(self, key: Hashable) -> int:
+        """Upper-bound estimate of the key's total over the window."""
+        self._advance()
+        total = self._total
+        return min([total[cell] for cell in self._cells(key)])
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(table.itemsize * len(table) for table in self._tables + [self._total])
+
+
+@dataclass(frozen=True)
+class VelocityPolicy:
+    """Limits applied by the `VelocityGuard`."""
+    intents_per_minute: float = 6.0
+    intent_burst: int = 10
+    payments_per_minute: float = 2.0
+    payment_burst: int = 5
+    org_intents_per_minute: int = 600
+    token_payments_per_10min: int = 100
+    # Matches the per-donation cap, so splitting a donation cannot get round it
+    user_daily_amount: Money = Money.from_major(1_000_000, "USD")
+
+    @classmethod
+    def from_env(cls) -> "VelocityPolicy":
+        return cls(
+            intents_per_minute=float(os.environ.get("AFARA_VELOCITY_INTENTS_PER_MIN", cls.intents_per_minute)),
+            intent_burst=int(os.environ.get("AFARA_VELOCITY_INTENT_BURST", cls.intent_burst)),
+            payments_per_minute=float(os.environ.get("AFARA_VELOCITY_PAYMENTS_PER_MIN", cls.payments_per_minute)),
+            payment_burst=int(os.environ.get("AFARA_VELOCITY_PAYMENT_BURST", cls.payment_burst)),
+            org_intents_per_minute=int(os.environ.get("AFARA_VELOCITY_ORG_INTENTS_PER_MIN", cls.org_intents_per_minute)),
+            token_payments_per_10min=int(os.environ.get("AFARA_VELOCITY_TOKEN_PAYMENTS", cls.token_payments_per_10min)),
+        )
+
+
+class VelocityGuard:
+    """Cross-call velocity limits for `save_user_choice` and `create_payment_mandate`."""
+
+    def __init__(self, policy: Optional[VelocityPolicy] = None, clock: Callable[[], float] = clock_now):
+        self.policy = policy or VelocityPolicy.from_env()
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all recorded activity (e.g. between tests)."""
+        p, clock = self.policy, self._clock
+        self._intent_buckets = TokenBucketMap(p.intents_per_minute / 60, p.intent_burst, clock=clock)
+        self._payment_buckets = TokenBucketMap(p.payments_per_minute / 60, p.payment_burst, clock=clock)
+        self._org_intents = WindowedCountMinSketch(60, buckets=6, clock=clock)
+        self._token_payments = WindowedCountMinSketch(600, buckets=10, clock=clock)
+        self._user_amounts = WindowedCountMinSketch(86_400, buckets=24, clock=clock)
+        self.rejections: Dict[str, int] = {}
+
+    def _reject(self, rule: str, message: str) -> tuple[bool, str]:
+        self.rejections[rule] = self.rejections.get(rule, 0) + 1
+        logger.warning(f"Velocity check '{rule}' rejected a request")
+        return False, message
+
+    def _check_daily_amount(self, user_id: str, amount: Money) -> Optional[str]:
+        cap = self.policy.user_daily_amount
+        if amount.currency != cap.currency:
+            return None
+        paid = self._user_amounts.estimate((user_id, amount.currency))
+        if paid + amount.minor > cap.minor:
+            return (
+                f"This donation would take your total in the last 24 hours past ${cap.amount_str}. "
+                "Please contact us to arrange a larger gift."
+            )
+        return None
+
+    def check_intent(self, user_id: str, session_id: Optional[str], org_name: str, amount: Money) -> tuple[bool, str]:
+        """
+        Checks a new funding intent. Consumes intent budget if it passes.
+
+        Args:
+            session_id: None skips the per-session limit (no session to key it on).
+
+        Returns:
+            (is_allowed, error_message)
+        """
+        message = self._check_daily_amount(user_id, amount)
+        if message:
+            return self._reject("user_daily_amount", message)
+        if self._org_intents.estimate(org_name) >= self.policy.org_intents_per_minute:
+            return self._reject("org_intents", f"{org_name} is receiving unusually many requests; please try again shortly.")
+        if not self._intent_buckets.try_acquire(("user", user_id)):
+            return self._reject("user_intents", "Too many funding requests in a short time; please wait a minute and try again.")
+        if session_id is not None and not self._intent_buckets.try_acquire(("session", session_id)):
+            return self._reject("session_intents", "Too many funding requests in this session; please wait a minute and try again.")
+        self._org_intents.add(org_name)
+        return True, ""
+
+    def check_payment(self, user_id: str, payment_token: Optional[str], amount: Money) -> tuple[bool, str]:
+        """
+        Checks a payment about to be settled, and records it if it passes.
+
+        Args:
+            payment_token: The instrument being charged; None skips the
+                per-token limit (e.g. for a simulated token shared by everyone).
+
+        Returns:
+            (is_allowed, error_message)
+        """
+        message = self._check_daily_amount(user_id, amount)
+        if message:
+            return self._reject("user_daily_amount", message)
+        if payment_token is not None and \
+                self._token_payments.estimate(payment_token) >= self.policy.token_payments_per_10min:
+            return self._reject("token_payments", "This payment method has been used too often recently; please try again later.")
+        if not self._payment_buckets.try_acquire(user_id):
+            return self._reject("user_payments", "Too many payments in a short time; please wait a minute and try again.")
+        if payment_token is not None:
+            self._token_payments.add(payment_token)
+        self._user_amounts.add((user_id, amount.currency), amount.minor)
+        return True, ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rejections": dict(self.rejections),
+            "tracked_buckets": len(self._intent_buckets) + len(self._payment_buckets),
+            "sketch_bytes": sum(s.memory_bytes for s in (self._org_intents, self._token_payments, self._user_amounts)),
+        }
+
+
+velocity_guard = VelocityGuard()
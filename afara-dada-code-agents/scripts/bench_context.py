@@ -0,0 +1,56 @@
+"""
+Benchmark: Finding Agent prompt size per turn with and without context compaction.
+Run with: python scripts/bench_context.py [turns]
+"""
+
+import sys
+import time
+
+from google.genai.types import Content, FunctionCall, FunctionResponse, Part
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import get_initiatives_by_region
+from femtech_empowerment_funding_advisor.tools.context_compaction import CompactionPolicy, compact_contents, estimate_tokens
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import _format_initiative_display
+
+REGIONS = ["east-africa", "pan-africa", "global-diaspora", "africa"]
+
+
+def discovery_turn(i: int) -> list:
+    """One 'show me ... / compare ...' turn with its tool call and answer."""
+    region = REGIONS[i % len(REGIONS)]
+    initiatives = get_initiatives_by_region(region)
+    response = {
+        "status": "success",
+        "count": len(initiatives),
+        "initiatives": [_format_initiative_display(x) for x in initiatives],
+        "raw_data": initiatives,
+    }
+    return [
+        Content(role="user", parts=[Part(text=f"Turn {i}: show me initiatives in {region} and how they compare on efficiency")]),
+        Content(role="model", parts=[Part(function_call=FunctionCall(name="find_tech_initiatives", args={"region": region}))]),
+        Content(role="user", parts=[Part(function_response=FunctionResponse(name="find_tech_initiatives", response=response))]),
+        Content(role="model", parts=[Part(text="Here are the verified initiatives. " + " ".join(x["name"] for x in initiatives) * 3)]),
+    ]
+
+
+def main(turns: int = 50) -> None:
+    policy = CompactionPolicy()
+    history: list = []
+    print("=" * 70)
+    print(f"CONTEXT COMPACTION (budget {policy.token_budget:,} tokens, keep {policy.keep_turns} turns)")
+    print("=" * 70)
+    print(f"  {'turn':>5} {'raw tokens':>12} {'compacted':>10} {'summarized':>11} {'overhead':>10}")
+    for i in range(1, turns + 1):
+        history.extend(discovery_turn(i))
+        started = time.perf_counter()
+        compacted, stats = compact_contents(history, policy)
+        overhead_ms = (time.perf_counter() - started) * 1000
+        assert stats["tokens_after"] == estimate_tokens(compacted)
+        if i in (1, 2, 5, 10, 20, 50) or i == turns:
+            print(f"  {i:>5} {stats['tokens_before']:>12,} {stats['tokens_after']:>10,} "
+                  f"{stats['summarized_turns']:>11} {overhead_ms:>8.2f}ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,62 @@
+"""
+Benchmark: expiry validation, ISO-string parsing path vs integer epochs on the
+shared clock, plus the batch `validate_expiries` path.
+Run with: python scripts/bench_expiry.py [count]
+"""
+
+import logging
+import sys
+import timeit
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from femtech_empowerment_funding_advisor.tools.clock import check_expiry, clock, expiry_epoch, validate_expiries
+
+logger = logging.getLogger("bench_expiry")
+
+
+def _legacy_validate(expiry_str: str) -> tuple[bool, str]:
+    # The per-call path the merchant/payment tools used before tools.clock
+    try:
+        expiry_time = datetime.fromisoformat(expiry_str.replace('Z', '+00:00'))
+        now = datetime.now(timezone.utc)
+        if expiry_time < now:
+            return False, f"Funding Intent expired at {expiry_str}"
+        time_remaining = expiry_time - now
+        logger.info(f"IntentMandate valid. Expires in {time_remaining.total_seconds():.0f} seconds")
+        return True, ""
+    except (ValueError, TypeError) as e:
+        return False, f"Invalid intent_expiry format: {e}"
+
+
+def main(count: int = 1_000_000) -> None:
+    expiry = datetime.now(timezone.utc) + timedelta(minutes=15)
+    expiry_iso = expiry.isoformat()
+    epoch = expiry_epoch(expiry)
+    base = int(clock.now())
+    epochs = array("q", (base + (i % 1800) - 900 for i in range(count)))
+    isos = [datetime.fromtimestamp(e, timezone.utc).isoformat() for e in epochs[:100_000]]
+
+    single = 200_000
+    cases = [
+        ("legacy ISO check (single)", lambda: _legacy_validate(expiry_iso), single),
+        ("check_expiry epoch (single)", lambda: check_expiry(epoch, expiry_iso, "Funding Intent", "intent_expiry"), single),
+        ("check_expiry ISO fallback (cached)", lambda: check_expiry(None, expiry_iso, "Funding Intent", "intent_expiry"), single),
+    ]
+
+    print("=" * 70)
+    print("EXPIRY VALIDATION BENCHMARK")
+    print("=" * 70)
+    for label, fn, number in cases:
+        best = min(timeit.repeat(fn, number=number, repeat=3)) / number
+        print(f"  {label:<38} {best * 1e9:8.0f} ns/call")
+
+    batch = min(timeit.repeat(lambda: validate_expiries(epochs), number=1, repeat=3))
+    legacy_batch = min(timeit.repeat(lambda: [_legacy_validate(s)[0] for s in isos], number=1, repeat=3))
+    print(f"  {'validate_expiries':<38} {batch / count * 1e9:8.0f} ns/item ({count:,} items)")
+    print(f"  {'legacy ISO loop':<38} {legacy_batch / len(isos) * 1e9:8.0f} ns/item ({len(isos):,} items)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
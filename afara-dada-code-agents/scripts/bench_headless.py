@@ -0,0 +1,117 @@
+"""
+Benchmark: pre-consented (headless) funding flows vs the interactive path.
+
+Each flow runs the tool chain save_user_choice -> create_cart_mandate ->
+payment for its own donor and session, with `concurrency` flows in flight.
+The interactive path adds the consent turn between cart and payment,
+simulated as `consent_turn_ms` of model latency (asking, then handling the
+reply; the donor's own think time is not counted). The headless path
+verifies a signed consent token instead.
+
+Run with: python scripts/bench_headless.py [flows] [concurrency] [consent_turn_ms]
+"""
+
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+from femtech_empowerment_funding_advisor.tools.consent import CONSENT_STATE_KEY, issue_consent_token, verify_consent
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.velocity import VelocityPolicy, velocity_guard
+
+ORGS = ["Pwani Teknowgalz", "Tambua Women in Tech", "She Code Africa"]
+
+
+def _context(i: int, state: dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        state=state,
+        _invocation_context=SimpleNamespace(user_id=f"donor_{i}", session=SimpleNamespace(id=f"session_{i}")),
+    )
+
+
+async def _run_flows(flows: int, concurrency: int, headless: bool, consent_turn_s: float) -> tuple[float, int]:
+    from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import save_user_choice
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import (
+        create_payment_mandate,
+        create_preconsented_payment_mandate,
+    )
+
+    limit = asyncio.Semaphore(concurrency)
+    completed = 0
+
+    async def flow(i: int) -> None:
+        nonlocal completed
+        org = ORGS[i % len(ORGS)]
+        state = {CONSENT_STATE_KEY: issue_consent_token(f"donor_{i}", Money.from_major(100), [org])} if headless else {}
+        tool_context = _context(i, state)
+        async with limit:
+            await save_user_choice(org, 25.0, tool_context)
+            await create_cart_mandate(tool_context)
+            if headless:
+                result = await create_preconsented_payment_mandate(tool_context)
+            else:
+                await asyncio.sleep(consent_turn_s)
+                result = await create_payment_mandate(tool_context)
+        completed += result["status"] == "success"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(flow(i) for i in range(flows)))
+    return time.perf_counter() - started, completed
+
+
+def main(flows: int = 2_000, concurrency: int = 32, consent_turn_ms: float = 1_500.0) -> None:
+    # Every flow is a distinct donor, but they share the simulated card token;
+    # lift the limits so the benchmark measures the flow, not the throttle
+    logging.getLogger("femtech_empowerment_funding_advisor").setLevel(logging.ERROR)
+    velocity_guard.policy = VelocityPolicy(
+        intents_per_minute=1e9, intent_burst=10**9, payments_per_minute=1e9, payment_burst=10**9,
+        org_intents_per_minute=10**12, token_payments_per_10min=10**12, user_daily_amount=Money.from_major(10**12)
+    )
+    velocity_guard.reset()
+
+    amount = Money.from_major(25)
+    token = issue_consent_token("donor_0", Money.from_major(100), ["She Code Africa"])
+    issue_s = min(timeit.repeat(lambda: issue_consent_token("donor_0", amount), number=10_000, repeat=3)) / 10_000
+    verify_s = min(timeit.repeat(
+        lambda: verify_consent(token, "donor_0", "She Code Africa", amount), number=100_000, repeat=3
+    )) / 100_000
+
+    print("=" * 70)
+    print(f"HEADLESS vs INTERACTIVE FUNDING ({flows:,} flows, {concurrency} concurrent)")
+    print("=" * 70)
+    print(f"  Issue consent token:   {issue_s * 1e6:7.2f} us")
+    print(f"  Verify consent token:  {verify_s * 1e6:7.2f} us (cached signature check)")
+
+    try:
+        import ap2.types.mandate  # noqa: F401
+    except ImportError:
+        print("  (ap2 is not installed; skipping the end-to-end flows)")
+        print("=" * 70)
+        return
+
+    from femtech_empowerment_funding_advisor.data.ledger import default_ledger
+
+    with tempfile.TemporaryDirectory() as tmp:
+        default_ledger.path = Path(tmp) / "ledger.jsonl"
+        headless_s, headless_ok = asyncio.run(_run_flows(flows, concurrency, True, 0.0))
+        interactive_s, interactive_ok = asyncio.run(_run_flows(flows, concurrency, False, consent_turn_ms / 1000))
+
+    print(f"  Headless:     {headless_ok:,} paid in {headless_s:6.2f} s  ({headless_ok / headless_s:8,.0f} flows/s)")
+    print(f"  Interactive:  {interactive_ok:,} paid in {interactive_s:6.2f} s  "
+          f"({interactive_ok / interactive_s:8,.0f} flows/s, {consent_turn_ms:,.0f} ms consent turn)")
+    print(f"  Speedup:      {interactive_s / headless_s:,.1f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 32,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 1_500.0,
+    )
@@ -0,0 +1,77 @@
+"""
+Benchmark: impact-event ingest throughput and rollup query latency.
+Run with: python scripts/bench_impact.py [events]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from femtech_empowerment_funding_advisor.data.femtech_programs import iter_initiatives
+from femtech_empowerment_funding_advisor.data.impact_store import CATEGORIES, ImpactStore
+from femtech_empowerment_funding_advisor.runtime.impact_ingest import ingest_jsonl
+
+ORG_IDS = [initiative["id"] for _, initiative in iter_initiatives()]
+
+
+def write_events(path: Path, count: int, duplicate_rate: float = 0.05) -> None:
+    rng = random.Random(7)
+    start = time.time() - 365 * 86_400
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            # Resent reports reuse an earlier event_id
+            event_no = rng.randrange(i) if i and rng.random() < duplicate_rate else i
+            f.write(json.dumps({
+                "event_id": f"evt_{event_no:08d}",
+                "org_id": ORG_IDS[event_no % len(ORG_IDS)],
+                "timestamp": start + event_no * (365 * 86_400 / count),
+                "amount": round(50 + (event_no % 400) * 12.5, 2),
+                "category": CATEGORIES[event_no % len(CATEGORIES)],
+                "beneficiaries": event_no % 30,
+                "note": f"Cohort {event_no % 97} report",
+            }) + "\n")
+
+
+def main(count: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        events_path = Path(tmp) / "events.jsonl"
+        write_events(events_path, count)
+
+        store = ImpactStore(Path(tmp) / "impact")
+        started = time.perf_counter()
+        result = ingest_jsonl(events_path, store)
+        ingest_s = time.perf_counter() - started
+
+        # A fresh store (e.g. the agent process) catching up from disk
+        reader = ImpactStore(store.root)
+        started = time.perf_counter()
+        replayed = reader.refresh()
+        replay_s = time.perf_counter() - started
+
+        org = ORG_IDS[0]
+        number = 20_000
+        query_s = min(timeit.repeat(lambda: reader.summary(org), number=number, repeat=3)) / number
+
+        # One new event arriving between queries
+        store.ingest([{"org_id": org, "timestamp": time.time(), "amount": 10, "category": "training"}])
+        started = time.perf_counter()
+        summary = reader.summary(org)
+        tail_s = time.perf_counter() - started
+
+    print("=" * 70)
+    print(f"IMPACT INGESTION ({count:,} events)")
+    print("=" * 70)
+    print(f"  Accepted:    {result.accepted:,}  duplicates: {result.duplicates:,}  rejected: {result.rejected:,}")
+    print(f"  Ingest:      {ingest_s:.2f} s ({count / ingest_s:,.0f} events/s)")
+    print(f"  Replay:      {replayed:,} events in {replay_s:.2f} s ({replayed / replay_s:,.0f} events/s)")
+    print(f"  Query:       {query_s * 1e6:.1f} µs per rollup summary")
+    print(f"  Tail+query:  {tail_s * 1e6:.1f} µs after one new event ({summary['events']:,} events for {org})")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
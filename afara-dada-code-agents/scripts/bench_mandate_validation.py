@@ -0,0 +1,44 @@
+"""
+Benchmark: per-hop mandate validation cost, `model_validate` vs the shared
+precompiled `TypeAdapter`, and what the former hash-checked cache paid per hit.
+Run with: python scripts/bench_mandate_validation.py [iterations]
+"""
+
+import asyncio
+import sys
+import timeit
+from types import SimpleNamespace
+
+from ap2.types.mandate import CartMandate, IntentMandate
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import save_user_choice
+from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+from femtech_empowerment_funding_advisor.tools.mandates import mandate_digest, validate_mandate
+
+
+def main(iterations: int = 20_000) -> None:
+    tool_context = SimpleNamespace(state={})
+    asyncio.run(save_user_choice("She Code Africa", 100.0, tool_context))
+    asyncio.run(create_cart_mandate(tool_context))
+
+    intent = tool_context.state["intent_mandate"]
+    cart = tool_context.state["cart_mandate"]
+
+    cases = {
+        "IntentMandate.model_validate": lambda: IntentMandate.model_validate(intent),
+        "validate_mandate (intent)": lambda: validate_mandate(intent, IntentMandate),
+        "CartMandate.model_validate": lambda: CartMandate.model_validate(cart),
+        "validate_mandate (cart)": lambda: validate_mandate(cart, CartMandate),
+        "integrity hash only (cart)": lambda: mandate_digest(cart),
+    }
+
+    print("=" * 70)
+    print(f"PER-HOP MANDATE VALIDATION ({iterations:,} iterations)")
+    print("=" * 70)
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations
+        print(f"  {label:<32} {best * 1e6:8.2f} us/call")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
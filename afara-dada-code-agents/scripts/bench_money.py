@@ -0,0 +1,43 @@
+"""
+Benchmark: fixed-point Money sums vs the float path for bulk aggregation.
+Run with: python scripts/bench_money.py [count]
+"""
+
+import random
+import sys
+import timeit
+
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+
+def main(count: int = 1_000_000) -> None:
+    rng = random.Random(42)
+    cents = [rng.randint(100, 500_000) for _ in range(count)]
+    floats = [c / 100 for c in cents]
+    monies = [Money(c, "USD") for c in cents]
+    records = [{"amount": f, "amount_minor": c} for f, c in zip(floats, cents)]
+
+    cases = {
+        "float sum (column)": lambda: sum(floats),
+        "Money.sum_minor (column)": lambda: Money.sum_minor(cents),
+        "Money.sum (objects, checked)": lambda: Money.sum(monies),
+        "float sum (ledger dicts)": lambda: sum(r["amount"] for r in records),
+        "minor-unit sum (ledger dicts)": lambda: sum(r["amount_minor"] for r in records),
+    }
+
+    print("=" * 70)
+    print(f"MONEY AGGREGATION BENCHMARK ({count:,} amounts)")
+    print("=" * 70)
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"  {label:<32} {best * 1000:8.2f} ms")
+
+    exact = Money.sum(monies)
+    drift = abs(sum(floats) - exact.to_float())
+    print(f"\n  Exact total: {exact}")
+    print(f"  Float drift: {drift:.10f}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,115 @@
+"""
+Benchmark: year-end receipt generation from a ledger of settled chains.
+
+Builds a synthetic ledger shaped like `chain_record` output (intent, cart and
+payment mandates plus payment_result, ~2 KB per line), then renders receipts
+and reports throughput and peak memory.
+
+Run with: python scripts/bench_receipts.py [transactions] [workers] [format]
+"""
+
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger
+from femtech_empowerment_funding_advisor.receipts.generator import generate_receipts
+
+ORGS = ["Pwani Teknowgalz", "Tambua Women in Tech", "She Code Africa", "Women in Tech Africa"]
+
+
+def _chain(i: int) -> dict:
+    org = ORGS[i % len(ORGS)]
+    amount_minor = 1000 + (i % 500) * 100
+    value = amount_minor / 100
+    timestamp = f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00+00:00"
+    cart_id = f"cart_{i:026d}"
+    total = {"label": f"Funding for {org}", "amount": {"currency": "USD", "value": value}, "pending": None}
+    return {
+        "intent_mandate": {
+            "user_cart_confirmation_required": True,
+            "natural_language_description": f"Fund verified initiative: {org} with ${value:.2f}",
+            "merchants": [org], "skus": None, "requires_refundability": False,
+            "intent_expiry": timestamp, "intent_id": f"fund_{i:026d}", "org_name": org,
+            "amount": value, "amount_minor": amount_minor, "currency": "USD", "timestamp": timestamp,
+        },
+        "cart_mandate": {
+            "contents": {
+                "id": cart_id, "user_cart_confirmation_required": False, "merchant_name": org,
+                "cart_expiry": timestamp,
+                "payment_request": {
+                    "method_data": [{"supported_methods": "CARD", "data": {"payment_processor_url": "http://example.com/pay"}}],
+                    "details": {"id": f"order_{i:026d}", "display_items": [total], "total": total},
+                    "options": {"request_shipping": False},
+                },
+            },
+            "merchant_authorization": "SIG_0123456789abcdef",
+            "cart_expiry_epoch": 1_767_225_600 + i,
+        },
+        "payment_mandate": {
+            "payment_mandate_contents": {
+                "payment_mandate_id": f"payment_{i:026d}", "payment_details_id": cart_id,
+                "payment_details_total": total,
+                "payment_response": {"request_id": cart_id, "method_name": "CARD",
+                                     "details": {"token": "simulated_funding_token_AFRICA_TECH"}},
+                "merchant_agent": org, "timestamp": timestamp, "user_consent": True, "consent_timestamp": timestamp,
+            },
+            "agent_present": True,
+        },
+        "payment_result": {
+            "transaction_id": f"txn_{i:026d}", "cart_id": cart_id, "status": "completed",
+            "amount": value, "amount_minor": amount_minor, "currency": "USD", "recipient": org,
+            "timestamp": timestamp, "simulation": True,
+        },
+    }
+
+
+def build_ledger(path: Path, count: int) -> None:
+    ledger = MandateLedger(path)
+    batch = 10_000
+    for offset in range(0, count, batch):
+        ledger.append_many(_chain(i) for i in range(offset, min(offset + batch, count)))
+
+
+def _peak_rss_mb() -> tuple[float, float]:
+    # ru_maxrss is KiB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+
+
+def main(count: int = 1_000_000, workers: int = 0, fmt: str = "text") -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = Path(tmp) / "ledger.jsonl"
+        started = time.perf_counter()
+        build_ledger(ledger_path, count)
+        build_s = time.perf_counter() - started
+        ledger_mb = ledger_path.stat().st_size / 1e6
+        rss_before, _ = _peak_rss_mb()
+
+        report = generate_receipts(MandateLedger(ledger_path), Path(tmp) / "receipts", fmt=fmt, workers=workers)
+        rss_after, rss_children = _peak_rss_mb()
+
+    stats = report.to_dict()
+    print("=" * 70)
+    print(f"RECEIPT GENERATION ({count:,} transactions, {fmt}, {workers} worker processes)")
+    print("=" * 70)
+    print(f"  Ledger:      {ledger_mb:,.0f} MB (built in {build_s:.1f} s)")
+    print(f"  Issued:      {stats['issued']:,} receipts in {stats['files']:,} files "
+          f"({stats['bytes_written'] / 1e6:,.0f} MB)")
+    print(f"  Duration:    {stats['duration_s']:.2f} s")
+    print(f"  Throughput:  {stats['receipts_per_s']:,.0f} receipts/s")
+    print(f"  Peak RSS:    {rss_before:,.0f} MB before, {rss_after:,.0f} MB after (parent); "
+          f"{rss_children:,.0f} MB max worker")
+    print(f"  Totals:      {stats['totals']}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+        sys.argv[3] if len(sys.argv) > 3 else "text",
+    )
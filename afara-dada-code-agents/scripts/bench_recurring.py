@@ -0,0 +1,82 @@
+"""
+Benchmark: bulk settlement of recurring donations in one settlement window.
+Run with: python scripts/bench_recurring.py [subscriptions] [worker_processes]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger
+from femtech_empowerment_funding_advisor.runtime.offload import install_executors
+from femtech_empowerment_funding_advisor.runtime.recurring_scheduler import RecurringScheduler
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.recurring_tools import (
+    Subscription,
+    SubscriptionStore,
+    _create_recurring_intent,
+)
+
+ORGS = ["Pwani Teknowgalz", "Tambua Women in Tech", "She Code Africa"]
+
+
+def build_store(count: int, now: float) -> SubscriptionStore:
+    store = SubscriptionStore()
+    expiry = datetime.now(timezone.utc) + timedelta(days=365)
+    for i in range(count):
+        org = ORGS[i % len(ORGS)]
+        amount = Money(1000 + (i % 50) * 100)
+        subscription_id = f"sub_bench_{i:07d}"
+        store.add(Subscription(
+            subscription_id=subscription_id,
+            user_id=f"donor_{i}",
+            org_name=org,
+            amount_minor=amount.minor,
+            currency="USD",
+            interval_s=30 * 86_400,
+            cap_minor=amount.minor * 12,
+            next_run=now - 1,
+            expires_at=expiry.timestamp(),
+            intent_mandate=_create_recurring_intent(subscription_id, org, amount, 30, Money(amount.minor * 12), expiry),
+        ))
+    return store
+
+
+async def run(count: int, processes: int) -> None:
+    now = time.time()
+    store = build_store(count, now)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = MandateLedger(Path(tmp) / "ledger.jsonl")
+        scheduler = RecurringScheduler(store=store, ledger=ledger)
+        stats = await scheduler.settle_window(now)
+        size_mb = ledger.path.stat().st_size / 1e6
+
+    print("=" * 70)
+    print(f"RECURRING SETTLEMENT ({count:,} subscriptions, {processes} worker processes)")
+    print("=" * 70)
+    print(f"  Settled:    {stats['settled']:,} runs")
+    print(f"  Total:      {Money(stats['total_minor'])}")
+    print(f"  Duration:   {stats['duration_s']:.2f} s")
+    print(f"  Throughput: {stats['runs_per_s']:,.0f} runs/s")
+    print(f"  Ledger:     {size_mb:.1f} MB")
+    print("=" * 70)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    process_pool = ProcessPoolExecutor(max_workers=processes) if processes else None
+    install_executors(ThreadPoolExecutor(max_workers=1), process_pool)
+    try:
+        asyncio.run(run(count, processes))
+    finally:
+        if process_pool:
+            process_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-call cost of the velocity checks, plus a check that bursts and
+split donations are caught.
+Run with: python scripts/bench_velocity.py [iterations]
+"""
+
+import itertools
+import logging
+import sys
+import timeit
+
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.velocity import VelocityGuard, VelocityPolicy
+
+
+def main(iterations: int = 200_000) -> None:
+    # Every rejection below is expected; keep the warnings out of the report
+    logging.getLogger("femtech_empowerment_funding_advisor.tools.velocity").setLevel(logging.ERROR)
+    # Limits high enough that the timing loop measures passing checks
+    open_policy = VelocityPolicy(intents_per_minute=1e9, intent_burst=10**9, payments_per_minute=1e9,
+                                 payment_burst=10**9, org_intents_per_minute=10**12, token_payments_per_10min=10**12,
+                                 user_daily_amount=Money.from_major(10**12))
+    guard = VelocityGuard(open_policy)
+    users = itertools.cycle([f"donor_{i}" for i in range(50_000)])
+    amount = Money.from_major(25)
+
+    intent_s = min(timeit.repeat(
+        lambda: guard.check_intent(next(users), "session", "She Code Africa", amount), number=iterations, repeat=3
+    )) / iterations
+    payment_s = min(timeit.repeat(
+        lambda: guard.check_payment(next(users), "tok_visa_4242", amount), number=iterations, repeat=3
+    )) / iterations
+
+    # Behaviour with the default limits
+    t = [0.0]
+    strict = VelocityGuard(VelocityPolicy(), clock=lambda: t[0])
+    burst = sum(strict.check_intent("bot", f"s{i}", "Pwani Teknowgalz", amount)[0] for i in range(100))
+    split_paid = 0
+    for i in range(200):
+        t[0] += 60  # one payment a minute, each under the per-donation cap
+        if strict.check_payment("splitter", f"tok_{i}", Money.from_major(9_999))[0]:
+            split_paid += 1
+
+    print("=" * 70)
+    print(f"VELOCITY CHECKS ({iterations:,} iterations, 50,000 distinct users)")
+    print("=" * 70)
+    print(f"  check_intent:   {intent_s * 1e6:6.2f} us/call")
+    print(f"  check_payment:  {payment_s * 1e6:6.2f} us/call")
+    print(f"  Memory:         {guard.stats()['sketch_bytes'] / 1e6:.1f} MB sketches, "
+          f"{guard.stats()['tracked_buckets']:,} buckets")
+    print(f"  Burst:          {burst}/100 rapid intents from one user allowed")
+    print(f"  Splitting:      {split_paid} x $9,999 allowed in 24h (cap $1,000,000)")
+    print(f"  Rejections:     {strict.stats()['rejections']}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
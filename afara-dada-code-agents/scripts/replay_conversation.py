@@ -0,0 +1,137 @@
+"""
+Record or replay a scripted donor conversation against `root_agent` or
+`Naive_Agent`, and report how much of each turn was model time versus our
+own code (agents, tools, ADK plumbing).
+
+Record once against live Gemini, then replay offline as often as needed:
+
+    python scripts/replay_conversation.py record cassettes/root.jsonl
+    python scripts/replay_conversation.py replay cassettes/root.jsonl --latency-scale 0 --profile
+
+Turns come from --turns (one message per line) or a built-in donor flow. The
+clock, ID generator, ledger and mandate event log are pinned to fixed values
+and a temporary directory, as in the tests, so tool outputs are the same on
+every run.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from femtech_empowerment_funding_advisor.data.ledger import default_ledger
+from femtech_empowerment_funding_advisor.data.mandate_events import mandate_events
+from femtech_empowerment_funding_advisor.runtime.cassettes import use_cassette
+from femtech_empowerment_funding_advisor.tools import ids
+from femtech_empowerment_funding_advisor.tools.clock import clock
+
+# 2026-01-01T00:00:00Z, as in the tests
+FROZEN_EPOCH = 1_767_225_600.0
+ID_NODE = 0xAFA7A
+
+DEFAULT_TURNS = {
+    "root": [
+        "Hi, I want to support women in tech in East Africa.",
+        "Tell me more about Pwani Teknowgalz and how efficient they are.",
+        "I'd like to give $50 to Pwani Teknowgalz.",
+        "Yes, I confirm the payment.",
+    ],
+    "naive": [
+        "Find female tech empowerment initiatives in Kenya I could donate to.",
+        "Which of them is most trustworthy?",
+    ],
+}
+
+
+def _load_agent(name: str):
+    if name == "naive":
+        from femtech_empowerment_funding_advisor.Naive_Agent.agent import root_agent
+    else:
+        from femtech_empowerment_funding_advisor.agent import root_agent
+    return root_agent
+
+
+async def _converse(agent, turns: List[str]) -> List[tuple[str, float]]:
+    from google.adk.runners import InMemoryRunner
+    from google.genai.types import Content, Part
+
+    runner = InMemoryRunner(agent=agent, app_name="afara_replay")
+    await runner.session_service.create_session(app_name="afara_replay", user_id="donor_replay", session_id="replay")
+    results = []
+    for message in turns:
+        started = time.perf_counter()
+        reply = ""
+        async for event in runner.run_async(
+            user_id="donor_replay", session_id="replay",
+            new_message=Content(role="user", parts=[Part(text=message)])
+        ):
+            if event.is_final_response() and event.content and event.content.parts:
+                reply = "".join(part.text or "" for part in event.content.parts)
+        results.append((reply, time.perf_counter() - started))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record or replay a donor conversation through the agents.")
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--agent", choices=("root", "naive"), default="root")
+    parser.add_argument("--turns", type=Path, help="File with one user message per line")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Replay: multiply recorded latency (0 = instant)")
+    parser.add_argument("--latency", type=float, help="Replay: fixed seconds per model call instead")
+    parser.add_argument("--profile", action="store_true", help="Print a cProfile of our own code")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    turns = args.turns.read_text().splitlines() if args.turns else DEFAULT_TURNS[args.agent]
+    if args.mode == "record" and args.cassette.exists():
+        sys.exit(f"{args.cassette} exists; delete it to re-record")
+
+    clock.freeze(FROZEN_EPOCH)
+    ids.id_generator = ids.IdGenerator(node=ID_NODE)
+    agent = _load_agent(args.agent)
+    profiler = cProfile.Profile() if args.profile else None
+
+    with tempfile.TemporaryDirectory() as tmp, use_cassette(
+        args.cassette, mode=args.mode, latency_scale=args.latency_scale, fixed_latency_s=args.latency
+    ) as cassette:
+        default_ledger.path = Path(tmp) / "ledger.jsonl"
+        mandate_events.open(Path(tmp) / "mandate_events")
+        started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        results = asyncio.run(_converse(agent, turns))
+        if profiler:
+            profiler.disable()
+        wall_s = time.perf_counter() - started
+        mandate_events.close()
+
+    print("=" * 70)
+    print(f"{args.mode.upper()} {args.agent} ({len(turns)} turns, cassette {args.cassette})")
+    print("=" * 70)
+    for i, (message, (reply, turn_s)) in enumerate(zip(turns, results), 1):
+        print(f"[{i}] {message}\n    -> ({turn_s:.2f}s) {reply[:200]}")
+    stats = cassette.stats
+    print("-" * 70)
+    print(f"  Model calls:     {stats.calls:8d} ({stats.hits} replayed, {stats.recorded} recorded, {stats.misses} missed)")
+    print(f"  Wall time:       {wall_s:8.3f} s")
+    print(f"  Model time:      {stats.model_s:8.3f} s")
+    print(f"  Our overhead:    {wall_s - stats.model_s:8.3f} s ({(wall_s - stats.model_s) / max(stats.calls, 1) * 1000:.1f} ms per model call)")
+    print("=" * 70)
+
+    if profiler:
+        out = io.StringIO()
+        # Only our package: replayed model latency is spent idle in the event loop, outside it
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats("femtech_empowerment_funding_advisor", 25)
+        print(out.getvalue())
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,7 @@ async def test_merchant_agent():
         # Domain-specific context (Using org_name instead of EIN)
         "org_name": "She Code Africa",
         "amount": 100.0,
+        "amount_minor": 10000,
         "currency": "USD"
     }
 
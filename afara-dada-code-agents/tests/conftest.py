@@ -0,0 +1,161 @@
+"""
+Shared fixtures for the tool tests.
+
+- `deterministic` pins the shared clock and the ID generator, points the
+  ledger, subscription journal and mandate event log at a temporary directory,
+  and resets the process-wide caches and velocity counters, so tool outputs
+  are reproducible.
+- `tool_context` is a minimal stand-in for ADK's ToolContext.
+- `snapshot` compares JSON output with a stored file in `tests/snapshots/`
+  (a missing snapshot fails the test; record or re-record with
+  `pytest --snapshot-update`).
+- `budget` measures a tool's median latency and peak allocation and fails the
+  test when either exceeds its budget. Scale the latency budgets on slow
+  machines with AFARA_PERF_BUDGET_SCALE.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+import pytest
+
+from femtech_empowerment_funding_advisor.data.ledger import default_ledger
+from femtech_empowerment_funding_advisor.data.mandate_events import mandate_events
+from femtech_empowerment_funding_advisor.tools import ids
+from femtech_empowerment_funding_advisor.tools.clock import clock
+from femtech_empowerment_funding_advisor.tools.discovery_cache import tool_result_cache
+from femtech_empowerment_funding_advisor.tools.recurring_tools import subscription_store
+from femtech_empowerment_funding_advisor.tools.velocity import velocity_guard
+
+SNAPSHOT_DIR = Path(__file__).parent / "snapshots"
+# 2026-01-01T00:00:00Z
+FROZEN_EPOCH = 1_767_225_600.0
+ID_NODE = 0xAFA7A
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--snapshot-update", action="store_true", help="Re-record tool output snapshots")
+
+
+class FakeToolContext:
+    """Just enough of ADK's ToolContext for the tools: state plus session/user identity."""
+
+    def __init__(self, user_id: str = "donor_test", session_id: str = "session_test"):
+        self.state: Dict[str, Any] = {}
+        self._invocation_context = SimpleNamespace(
+            user_id=user_id,
+            session=SimpleNamespace(id=session_id),
+        )
+
+
+@pytest.fixture
+def deterministic(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    clock.freeze(FROZEN_EPOCH)
+    monkeypatch.setattr(ids, "id_generator", ids.IdGenerator(node=ID_NODE))
+    monkeypatch.setattr(default_ledger, "path", tmp_path / "ledger.jsonl")
+    monkeypatch.setattr(subscription_store, "path", tmp_path / "subscriptions.jsonl")
+    mandate_events.open(tmp_path / "mandate_events")
+    tool_result_cache.clear()
+    velocity_guard.reset()
+    yield
+    clock.freeze(None)
+    mandate_events.close()
+    tool_result_cache.clear()
+    velocity_guard.reset()
+
+
+@pytest.fixture
+def tool_context(deterministic) -> FakeToolContext:
+    return FakeToolContext()
+
+
+@pytest.fixture
+def snapshot(request: pytest.FixtureRequest) -> Callable[[str, Any], None]:
+    update = request.config.getoption("--snapshot-update")
+
+    def check(name: str, data: Any) -> None:
+        path = SNAPSHOT_DIR / f"{name}.json"
+        text = json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False, default=str) + "\n"
+        if update:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            return
+        if not path.exists():
+            pytest.fail(f"Snapshot {path.name} has not been recorded; run pytest --snapshot-update and commit it")
+        assert text == path.read_text(encoding="utf-8"), (
+            f"Output differs from snapshot {path.name}; if the change is intended, run pytest --snapshot-update"
+        )
+
+    return check
+
+
+@dataclass
+class BudgetResult:
+    median_us: float
+    p95_us: float
+    peak_alloc_kb: float
+
+
+@pytest.fixture
+def budget() -> Callable[..., BudgetResult]:
+    scale = float(os.environ.get("AFARA_PERF_BUDGET_SCALE", "1.0"))
+
+    def measure(
+        make_call: Callable[[], Any],
+        *,
+        max_median_us: float,
+        max_alloc_kb: float,
+        rounds: int = 200,
+        warmup: int = 20
+    ) -> BudgetResult:
+        """
+        Times `make_call()` (which returns a coroutine or a value) over `rounds`
+        runs on one event loop, then measures peak allocation of one more call.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            def call() -> Any:
+                result = make_call()
+                return loop.run_until_complete(result) if inspect.isawaitable(result) else result
+
+            for _ in range(warmup):
+                call()
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter_ns()
+                call()
+                timings.append((time.perf_counter_ns() - started) / 1000)
+
+            tracemalloc.start()
+            try:
+                call()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            loop.close()
+
+        timings.sort()
+        result = BudgetResult(
+            median_us=statistics.median(timings),
+            p95_us=timings[int(len(timings) * 0.95) - 1],
+            peak_alloc_kb=peak / 1024,
+        )
+        assert result.median_us <= max_median_us * scale, (
+            f"median {result.median_us:.1f} us exceeds budget {max_median_us * scale:.0f} us"
+        )
+        assert result.peak_alloc_kb <= max_alloc_kb, (
+            f"peak allocation {result.peak_alloc_kb:.1f} KiB exceeds budget {max_alloc_kb:.0f} KiB"
+        )
+        return result
+
+    return measure
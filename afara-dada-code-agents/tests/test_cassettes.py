@@ -0,0 +1,102 @@
+"""
+Tests for model-call cassettes: request hashing, record/replay and latency.
+"""
+
+import asyncio
+
+import pytest
+
+from femtech_empowerment_funding_advisor.runtime.cassettes import Cassette, CassetteMiss, request_key, use_cassette
+from femtech_empowerment_funding_advisor.tools.ids import IdGenerator
+
+
+def _request(intent_id: str, call_id: str, ts: str) -> dict:
+    return {
+        "system_instruction": "You are Afara Tech.",
+        "tools": [{"function_declarations": [{"name": "save_user_choice"}]}],
+        "contents": [
+            {"role": "user", "parts": [{"text": "Give $50 to Pwani Teknowgalz"}]},
+            {"role": "user", "parts": [{"function_response": {
+                "id": call_id, "name": "save_user_choice",
+                "response": {"intent_id": intent_id, "timestamp": ts, "intent_expiry_epoch": 1767229200},
+            }}]},
+        ],
+    }
+
+
+def test_key_masks_run_specific_values():
+    intent_id = IdGenerator().new("fund")
+    first = request_key(_request(intent_id, "adk-1", "2026-01-01T00:00:00+00:00"))
+    second = request_key(_request(IdGenerator().new("fund"), "adk-2", "2026-03-04T10:11:12.5+00:00"))
+    assert first == second
+
+    changed = _request(intent_id, "adk-1", "2026-01-01T00:00:00+00:00")
+    changed["system_instruction"] = "You are Afara Tech, v2."
+    assert request_key(changed) != first
+
+
+def test_record_then_replay_in_order(tmp_path):
+    path = tmp_path / "demo.jsonl"
+    key = request_key(_request("fund_a", "adk-1", "now"))
+    recorder = Cassette(path, mode="record")
+    recorder.record(key, "gemini-3-pro-preview", {}, [{"content": {"parts": [{"text": "first"}]}}], [1.5])
+    recorder.record(key, "gemini-3-pro-preview", {}, [{"content": {"parts": [{"text": "again"}]}}], [0.5])
+    assert recorder.stats.snapshot()["model_s"] == 2.0
+
+    replay = Cassette(path)
+    assert [replay.next(key).responses[0]["content"]["parts"][0]["text"] for _ in range(2)] == ["first", "again"]
+    with pytest.raises(CassetteMiss):
+        replay.next(key)
+    with pytest.raises(CassetteMiss):
+        replay.next("unrecorded")
+    assert (replay.stats.hits, replay.stats.misses) == (2, 2)
+
+    replay.rewind()
+    assert replay.next(key).responses[0]["content"]["parts"][0]["text"] == "first"
+
+
+def test_replay_latency_is_recorded_scaled_or_fixed(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    Cassette(path, mode="record").record("k", "m", {}, [{}, {}, {}], [0.8, 1.0, 1.6])
+
+    def delays(**kwargs):
+        cassette = Cassette(path, **kwargs)
+        return [round(d, 3) for d in cassette.delays(cassette.next("k"))], round(cassette.stats.model_s, 3)
+
+    assert delays() == ([0.8, 0.2, 0.6], 1.6)
+    assert delays(latency_scale=0.5) == ([0.4, 0.1, 0.3], 0.8)
+    assert delays(fixed_latency_s=0.05) == ([0.05, 0.0, 0.0], 0.05)
+
+
+def test_cassette_llm_replays_without_the_inner_model(tmp_path):
+    pytest.importorskip("google.adk")
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_request import LlmRequest
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai.types import Content, FunctionCall, Part
+
+    from femtech_empowerment_funding_advisor.runtime.recording import recordable
+
+    class FakeGemini(BaseLlm):
+        calls: int = 0
+
+        async def generate_content_async(self, llm_request, stream=False):
+            self.calls += 1
+            yield LlmResponse(content=Content(role="model", parts=[
+                Part(function_call=FunctionCall(name="find_tech_initiatives", args={"region": "east-africa"}))
+            ]))
+
+    inner = FakeGemini(model="gemini-3-pro-preview")
+    model = recordable(inner)
+
+    async def call() -> list:
+        request = LlmRequest(model="gemini-3-pro-preview", contents=[Content(role="user", parts=[Part(text="Kenya")])])
+        return [response async for response in model.generate_content_async(request)]
+
+    with use_cassette(tmp_path / "llm.jsonl", mode="record"):
+        recorded = asyncio.run(call())
+    with use_cassette(tmp_path / "llm.jsonl", latency_scale=0) as cassette:
+        replayed = asyncio.run(call())
+
+    assert inner.calls == 1 and cassette.stats.hits == 1
+    assert replayed[0].content.parts[0].function_call.args == recorded[0].content.parts[0].function_call.args
@@ -0,0 +1,59 @@
+"""
+Tests for the shared clock and the mandate expiry checks.
+"""
+
+from array import array
+
+from conftest import FROZEN_EPOCH
+from femtech_empowerment_funding_advisor.tools import clock as clock_module
+from femtech_empowerment_funding_advisor.tools.clock import Clock, check_expiry, clock, parse_expiry, validate_expiries
+
+ISO_AT_FROZEN = "2026-01-01T00:00:00Z"
+
+
+def test_wall_clock_steps_do_not_move_the_clock(monkeypatch):
+    shared = Clock()
+    before = shared.now()
+    # An NTP step (or a manual change) sets the wall clock back a day
+    real_time = clock_module.time.time
+    monkeypatch.setattr(clock_module.time, "time", lambda: real_time() - 86_400)
+    readings = [shared.now() for _ in range(1_000)]
+    assert before <= readings[0] and readings == sorted(readings)
+
+    # Only an explicit resync picks up the new wall time
+    shared.resync()
+    assert shared.now() < before - 86_000
+
+
+def test_freeze_pins_and_releases():
+    shared = Clock()
+    shared.freeze(FROZEN_EPOCH)
+    assert shared.now() == FROZEN_EPOCH
+    shared.freeze(None)
+    assert shared.now() > FROZEN_EPOCH
+
+
+def test_expiry_boundaries(deterministic):
+    assert parse_expiry(ISO_AT_FROZEN) == int(FROZEN_EPOCH)
+    # Still valid at the exact second, expired one second later
+    assert check_expiry(int(FROZEN_EPOCH), ISO_AT_FROZEN, "Cart", "cart_expiry") == (True, "")
+    clock.freeze(FROZEN_EPOCH + 1)
+    ok, message = check_expiry(int(FROZEN_EPOCH), ISO_AT_FROZEN, "Cart", "cart_expiry")
+    assert not ok and message == f"Cart expired at {ISO_AT_FROZEN}"
+
+
+def test_epoch_is_checked_before_the_iso_string(deterministic):
+    # Legacy mandates without the epoch fall back to parsing the ISO string
+    assert check_expiry(None, "2026-01-01T00:10:00+00:00", "Intent", "intent_expiry")[0]
+    assert not check_expiry(None, "2025-12-31T23:59:59Z", "Intent", "intent_expiry")[0]
+    # With an epoch, the ISO string is only used in messages
+    assert check_expiry(int(FROZEN_EPOCH) + 60, "not a date", "Intent", "intent_expiry")[0]
+    ok, message = check_expiry(None, "not a date", "Intent", "intent_expiry")
+    assert not ok and message.startswith("Invalid intent_expiry format")
+
+
+def test_batch_expiry_matches_single_checks(deterministic):
+    epochs = array("q", [int(FROZEN_EPOCH) - 1, int(FROZEN_EPOCH), int(FROZEN_EPOCH) + 1])
+    assert validate_expiries(epochs) == [False, True, True]
+    assert validate_expiries(epochs, at=FROZEN_EPOCH + 1) == [False, False, True]
+    assert validate_expiries(epochs) == [check_expiry(e, None, "x", "x")[0] for e in epochs]
@@ -0,0 +1,162 @@
+"""
+Tests for signed consent tokens and the headless payment path.
+"""
+
+import asyncio
+
+import pytest
+
+from femtech_empowerment_funding_advisor.data.mandate_events import mandate_events
+from femtech_empowerment_funding_advisor.tools import consent
+from femtech_empowerment_funding_advisor.tools.clock import clock
+from femtech_empowerment_funding_advisor.tools.consent import (
+    CONSENT_STATE_KEY,
+    ConsentError,
+    consent_spent,
+    issue_consent_token,
+    spend_consent,
+    verify_consent,
+)
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.velocity import velocity_guard
+
+CAP = Money.from_major(500)
+
+
+def test_token_covers_its_scope(deterministic):
+    token = issue_consent_token("donor_test", CAP, orgs=["Pwani Teknowgalz"])
+    ok, message, claims = verify_consent(token, "donor_test", "pwani teknowgalz", Money.from_major(500))
+    assert ok, message
+    assert claims["consent_id"].startswith("consent_")
+
+    checks = [
+        ("donor_other", "Pwani Teknowgalz", Money.from_major(10), "not issued to this donor"),
+        ("donor_test", "She Code Africa", Money.from_major(10), "does not cover"),
+        ("donor_test", "Pwani Teknowgalz", Money.from_major("500.01"), "exceeds the pre-consented limit"),
+        ("donor_test", "Pwani Teknowgalz", Money(1000, "EUR"), "exceeds the pre-consented limit"),
+    ]
+    for user_id, org, amount, expected in checks:
+        ok, message, _ = verify_consent(token, user_id, org, amount)
+        assert not ok and expected in message
+
+
+def test_token_expires(deterministic):
+    token = issue_consent_token("donor_test", CAP, ttl_s=60)
+    clock.freeze(clock.now() + 61)
+    ok, message, _ = verify_consent(token, "donor_test", "She Code Africa", Money.from_major(1))
+    assert not ok and "expired" in message
+
+
+def test_tampered_token_is_rejected(deterministic):
+    prefix, payload, signature = issue_consent_token("donor_test", CAP).split(".")
+    forged = issue_consent_token("attacker", Money.from_major(1_000_000)).split(".")[1]
+    for token in (f"{prefix}.{forged}.{signature}", f"{prefix}.{payload}", "cst0.a.b", 42):
+        ok, _, _ = verify_consent(token, "donor_test", "She Code Africa", Money.from_major(1))
+        assert not ok
+
+
+def test_issue_rejects_bad_scope():
+    with pytest.raises(ValueError):
+        issue_consent_token("donor_test", Money(0))
+    with pytest.raises(ValueError):
+        issue_consent_token("donor_test", CAP, ttl_s=30 * 86_400)
+    with pytest.raises(ValueError):
+        issue_consent_token("donor_test", CAP, total_amount=Money.from_major(100))
+
+
+def test_token_total_cannot_be_replayed_past(deterministic):
+    token = issue_consent_token("donor_test", Money.from_major(100), total_amount=Money.from_major(150))
+    amount = Money.from_major(100)
+    ok, message, claims = verify_consent(token, "donor_test", "She Code Africa", amount)
+    assert ok, message
+    assert spend_consent(claims, amount) == (True, "")
+
+    ok, message, _ = verify_consent(token, "donor_test", "She Code Africa", amount)
+    assert not ok and "USD 50.00" in message
+    assert spend_consent(claims, Money.from_major(50))[0]
+
+    # The spent total survives a restart
+    mandate_events.close()
+    mandate_events.open()
+    assert not spend_consent(claims, Money.from_major(1))[0]
+
+
+def test_token_total_defaults_to_the_payment_cap(deterministic):
+    token = issue_consent_token("donor_test", CAP)
+    _, _, claims = verify_consent(token, "donor_test", "She Code Africa", CAP)
+    assert spend_consent(claims, CAP)[0]
+    ok, message, _ = verify_consent(token, "donor_test", "She Code Africa", Money.from_major(1))
+    assert not ok and "exceeds what is left" in message
+
+
+def test_missing_secret_fails_closed(deterministic, monkeypatch):
+    token = issue_consent_token("donor_test", CAP)
+    monkeypatch.setattr(consent, "_SECRET", None)
+    consent._decode.cache_clear()
+    with pytest.raises(ConsentError):
+        issue_consent_token("donor_test", CAP)
+    ok, message, _ = verify_consent(token, "donor_test", "She Code Africa", Money.from_major(1))
+    assert not ok and "AFARA_CONSENT_SECRET" in message
+
+
+def test_headless_payment_requires_a_valid_token(tool_context):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import save_user_choice
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_preconsented_payment_mandate
+
+    asyncio.run(save_user_choice("Pwani Teknowgalz", 100.0, tool_context))
+    asyncio.run(create_cart_mandate(tool_context))
+    assert asyncio.run(create_preconsented_payment_mandate(tool_context))["status"] == "error"
+
+    tool_context.state[CONSENT_STATE_KEY] = issue_consent_token("donor_test", Money.from_major(50))
+    result = asyncio.run(create_preconsented_payment_mandate(tool_context))
+    assert result["status"] == "error" and "payment_result" not in tool_context.state
+
+    tool_context.state[CONSENT_STATE_KEY] = issue_consent_token("donor_test", CAP, orgs=["Pwani Teknowgalz"])
+    result = asyncio.run(create_preconsented_payment_mandate(tool_context))
+    assert result["status"] == "success"
+    contents = tool_context.state["payment_mandate"]["payment_mandate_contents"]
+    assert contents["consent_id"].startswith("consent_")
+
+
+def _headless_payment_setup(tool_context, token_total: Money) -> dict:
+    from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import save_user_choice
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+
+    asyncio.run(save_user_choice("Pwani Teknowgalz", 100.0, tool_context))
+    asyncio.run(create_cart_mandate(tool_context))
+    token = issue_consent_token("donor_test", Money.from_major(100), total_amount=token_total)
+    tool_context.state[CONSENT_STATE_KEY] = token
+    return verify_consent(token, "donor_test", "Pwani Teknowgalz", Money.from_major(100))[2]
+
+
+def test_consent_rejected_payment_is_not_counted_for_velocity(tool_context, monkeypatch):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools import payment_tools
+
+    claims = _headless_payment_setup(tool_context, Money.from_major(150))
+
+    def replayed_meanwhile(claims, amount):
+        # A concurrent replay of the token spends it between verify and spend
+        assert spend_consent(claims, Money.from_major(100))[0]
+        return spend_consent(claims, amount)
+
+    monkeypatch.setattr(payment_tools, "spend_consent", replayed_meanwhile)
+    result = asyncio.run(payment_tools.create_preconsented_payment_mandate(tool_context))
+    assert result["status"] == "error" and "consent rejected" in result["message"]
+    assert velocity_guard._user_amounts.estimate(("donor_test", "USD")) == 0
+    assert consent_spent(claims) == Money.from_major(100)
+
+
+def test_velocity_rejected_payment_gives_the_consent_back(tool_context):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_preconsented_payment_mandate
+
+    claims = _headless_payment_setup(tool_context, Money.from_major(150))
+    while velocity_guard.check_payment("donor_test", None, Money.from_major(1))[0]:
+        pass
+
+    result = asyncio.run(create_preconsented_payment_mandate(tool_context))
+    assert result["status"] == "error" and "Too many payments" in result["message"]
+    assert consent_spent(claims) == Money(0, "USD")
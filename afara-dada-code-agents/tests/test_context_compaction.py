@@ -0,0 +1,65 @@
+"""
+Tests for context compaction: references to earlier tool results and the
+tenant registry version they carry.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.data.femtech_programs import REGISTRY_VERSION
+from femtech_empowerment_funding_advisor.data.tenants import TENANT_STATE_KEY, get_registry_view
+from femtech_empowerment_funding_advisor.tools.context_compaction import (
+    _compact_response,
+    compact_context_before_model_callback,
+)
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import find_tech_initiatives
+
+
+def _tenant_context(tenant_id: str) -> FakeToolContext:
+    tool_context = FakeToolContext()
+    tool_context.state[TENANT_STATE_KEY] = tenant_id
+    return tool_context
+
+
+def test_reference_round_trips_through_the_tenant_view(deterministic):
+    tool_context = _tenant_context("corporate-csr")
+    view = get_registry_view("corporate-csr")
+    result = asyncio.run(find_tech_initiatives("east-africa", tool_context))
+
+    reference = _compact_response("find_tech_initiatives", result, view.version)
+    assert reference["registry_version"] == view.version != REGISTRY_VERSION
+    assert reference["org_ids"] == [record["id"] for record in result["raw_data"]]
+
+    # Calling the tool again, as the note says, gives back what was compacted
+    again = asyncio.run(find_tech_initiatives("east-africa", tool_context))
+    assert [record["id"] for record in again["raw_data"]] == reference["org_ids"]
+    assert all(view.get_initiative(org_id) is not None for org_id in reference["org_ids"])
+
+
+def test_callback_references_carry_the_session_view_version(deterministic):
+    types = pytest.importorskip("google.genai.types")
+
+    tool_context = _tenant_context("corporate-csr")
+    result = asyncio.run(find_tech_initiatives("east-africa", tool_context))
+
+    def turn(text: str, with_tool: bool) -> list:
+        contents = [types.Content(role="user", parts=[types.Part(text=text)])]
+        if with_tool:
+            contents.append(types.Content(role="model", parts=[types.Part(
+                function_call=types.FunctionCall(name="find_tech_initiatives", args={"region": "east-africa"}))]))
+            contents.append(types.Content(role="user", parts=[types.Part(
+                function_response=types.FunctionResponse(name="find_tech_initiatives", response=result))]))
+        contents.append(types.Content(role="model", parts=[types.Part(text="Here they are.")]))
+        return contents
+
+    contents = turn("Show me East Africa orgs", True) + turn("Which is most efficient?", False) + turn("And reach?", False)
+    request = SimpleNamespace(contents=contents)
+    assert compact_context_before_model_callback(tool_context, request) is None
+
+    response = request.contents[2].parts[0].function_response.response
+    assert response["compacted"] and response["registry_version"] == get_registry_view("corporate-csr").version
+    # Only the outgoing request changes
+    assert contents[2].parts[0].function_response.response == result
@@ -0,0 +1,78 @@
+"""
+Tests for answering repeated discovery questions from cached tool results.
+"""
+
+import asyncio
+import copy
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.data.femtech_programs import get_initiative
+from femtech_empowerment_funding_advisor.data.tenants import TENANT_STATE_KEY, get_registry_view
+from femtech_empowerment_funding_advisor.tools.discovery_cache import cached_discovery_answer, normalize_intent
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import compare_initiatives, find_tech_initiatives
+
+
+def _search(region: str, tenant_id: str = "") -> dict:
+    tool_context = FakeToolContext()
+    tool_context.state[TENANT_STATE_KEY] = tenant_id
+    return asyncio.run(find_tech_initiatives(region, tool_context))
+
+
+def test_cached_search_results_cannot_be_mutated_by_callers(deterministic):
+    first = asyncio.run(find_tech_initiatives("east-africa"))
+    expected = copy.deepcopy(first)
+    first["raw_data"][0]["rating"] = 0
+    first["initiatives"].clear()
+
+    second = asyncio.run(find_tech_initiatives("east-africa"))
+    assert second == expected
+    second["raw_data"].clear()
+    assert asyncio.run(find_tech_initiatives("east-africa")) == expected
+    assert get_initiative(expected["raw_data"][0]["id"])["rating"] == expected["raw_data"][0]["rating"]
+
+
+def test_cached_rankings_cannot_be_mutated_by_callers(deterministic):
+    first = asyncio.run(compare_initiatives([], {"efficiency": 2}))
+    expected = copy.deepcopy(first)
+    first["rows"][0][1] = "someone-else"
+    first["rows"].reverse()
+
+    assert asyncio.run(compare_initiatives([], {"efficiency": 2})) == expected
+
+
+def test_repeat_question_is_answered_from_the_cached_tool_result(deterministic):
+    view = get_registry_view(None)
+    assert cached_discovery_answer("Show me East Africa orgs", view) is None
+
+    result = _search("East Africa")
+    answer = cached_discovery_answer("show me  east africa organizations", view)
+    # Later turns need the IDs and exact names the tool call would have left in the history
+    for record in result["raw_data"]:
+        assert f"`{record['id']}`" in answer and record["name"] in answer
+
+
+def test_answers_are_scoped_to_the_tenant_view(deterministic):
+    _search("pan-africa")
+    csr = get_registry_view("corporate-csr")
+    # The public view's cached result is never served to a partner portal
+    assert cached_discovery_answer("Which pan-africa initiatives are there?", csr) is None
+
+    _search("pan-africa", "corporate-csr")
+    answer = cached_discovery_answer("Which pan-africa initiatives are there?", csr)
+    assert "She Code Africa" in answer and "Women in Tech Africa" not in answer
+    # An org outside the view is not recognized by name
+    assert normalize_intent("Tell me about Women in Tech Africa", csr) is None
+
+
+def test_org_question_renders_only_that_initiative(deterministic):
+    _search("east-africa")
+    answer = cached_discovery_answer("Tell me about Pwani Teknowgalz impact", get_registry_view(None))
+    assert "`pwani-teknowgalz`" in answer and "tambua" not in answer
+
+
+def test_decisions_and_fund_usage_always_go_to_the_model(deterministic):
+    view = get_registry_view(None)
+    _search("east-africa")
+    for message in ("I want to donate $50 to Pwani Teknowgalz", "How is Pwani Teknowgalz spending its funds?",
+                    "Compare the East Africa initiatives", "go with east africa"):
+        assert normalize_intent(message, view) is None, message
@@ -0,0 +1,63 @@
+"""
+Tests for the impact store: event validation and replay of stored events.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from femtech_empowerment_funding_advisor.data.impact_store import ImpactStore
+from femtech_empowerment_funding_advisor.tools.impact_tools import get_impact_updates
+
+
+def _event(ts, **overrides) -> dict:
+    event = {"org_id": "pwani-teknowgalz", "timestamp": ts, "amount": 120.0, "category": "equipment"}
+    event.update(overrides)
+    return event
+
+
+@pytest.mark.parametrize("ts", [float("nan"), float("-inf"), float("inf"), -1e12, 0, "1969-07-20T20:17:00Z", 1e300])
+def test_out_of_range_timestamps_are_rejected(deterministic, tmp_path, ts):
+    store = ImpactStore(tmp_path)
+    result = store.ingest([_event(ts)])
+    assert (result.accepted, result.rejected) == (0, 1)
+    assert "timestamp" in result.errors[0]["error"].lower() or "dated" in result.errors[0]["error"]
+    assert not (tmp_path / "pwani-teknowgalz.jsonl").exists()
+
+
+def test_nan_from_json_input_is_rejected(deterministic, tmp_path):
+    # Python's json happily parses NaN, which is how such events arrive
+    raw = json.loads('{"org_id": "pwani-teknowgalz", "timestamp": NaN, "amount": 5}')
+    assert ImpactStore(tmp_path).ingest([raw]).rejected == 1
+
+
+def test_replay_skips_bad_stored_lines(deterministic, tmp_path):
+    store = ImpactStore(tmp_path)
+    assert store.ingest([_event("2025-12-01T00:00:00Z"), _event("2025-11-01T00:00:00Z", amount=30.0)]).accepted == 2
+    # A file written before validation existed, or edited by hand
+    with open(tmp_path / "pwani-teknowgalz.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"org_id":"pwani-teknowgalz","ts":-1e12,"category":"other","amount_minor":1,"currency":"USD","event_id":"bad1"}\n')
+        f.write('{"org_id":"pwani-teknowgalz","ts":NaN,"category":"other","amount_minor":1,"currency":"USD","event_id":"bad2"}\n')
+
+    summary = ImpactStore(tmp_path).summary("pwani-teknowgalz")
+    assert summary["events"] == 2 and summary["total_spent"] == ["USD 150.00"]
+
+
+def test_impact_tool_rejects_non_numeric_months(deterministic):
+    result = asyncio.run(get_impact_updates("pwani-teknowgalz", months="six"))
+    assert result["status"] == "error" and "whole number" in result["message"]
+
+
+def test_dedup_memory_is_bounded_per_org(deterministic, tmp_path):
+    store = ImpactStore(tmp_path, dedup_window=3)
+    events = [_event("2025-12-01T00:00:00Z", event_id=f"e{i}") for i in range(5)]
+    assert store.ingest(events).accepted == 5
+    assert list(store._seen["pwani-teknowgalz"]) == ["e2", "e3", "e4"]
+
+    # Recent resends are still caught; the window only forgets the oldest IDs
+    assert store.ingest(events[2:]).duplicates == 3
+    reopened = ImpactStore(tmp_path, dedup_window=3)
+    assert reopened.refresh() == 5 and len(reopened._seen["pwani-teknowgalz"]) == 3
+    assert reopened.ingest(events[3:]).duplicates == 2
+    assert store.ingest(events[:1]).accepted == 1
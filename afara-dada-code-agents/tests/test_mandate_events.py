@@ -0,0 +1,114 @@
+"""
+Tests for the mandate event log: history, snapshots and crash recovery.
+"""
+
+import json
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.data.mandate_events import MandateEventLog, get_state, mandate_events, put_state
+
+
+def _intent(org: str, amount: float) -> dict:
+    return {"intent_id": f"fund_{org}", "org_name": org, "amount": amount}
+
+
+def test_revisions_keep_history(tmp_path):
+    log = MandateEventLog(tmp_path)
+    log.record("s1", "donor_1", {"intent_mandate": _intent("pwani", 100.0)})
+    log.record("s1", "donor_1", {"intent_mandate": _intent("she-code", 250.0)})
+    log.record("s2", "donor_2", {"intent_mandate": _intent("tambua", 5.0), "cart_mandate": {"id": "cart_1"}})
+
+    assert log.state("s1", "donor_1") == {"intent_mandate": _intent("she-code", 250.0)}
+    assert [e["value"]["org_name"] for e in log.history("s1", "donor_1")] == ["pwani", "she-code"]
+    log.record("s2", "donor_2", {"cart_mandate": None})
+    assert log.state("s2", "donor_2") == {"intent_mandate": _intent("tambua", 5.0)}
+
+
+def test_recovery_replays_only_after_the_snapshot(tmp_path):
+    log = MandateEventLog(tmp_path, snapshot_every=100)
+    for i in range(250):
+        log.record(f"s{i % 20}", f"donor_{i % 20}", {"intent_mandate": _intent(f"org{i}", float(i))})
+    expected = {f"s{i}": log.state(f"s{i}", f"donor_{i}") for i in range(20)}
+    log.close()
+
+    # The writer thread snapshots after whichever batch crosses the threshold
+    with open(log.snapshot_path, encoding="utf-8") as f:
+        snapshot_seq = json.loads(f.readline())["seq"]
+    assert 100 <= snapshot_seq <= 250
+
+    recovered = MandateEventLog(tmp_path, snapshot_every=100)
+    stats = recovered.open()
+    assert (stats["snapshot_entries"], stats["replayed_events"], stats["seq"]) == (20, 250 - snapshot_seq, 250)
+    assert {f"s{i}": recovered.state(f"s{i}", f"donor_{i}") for i in range(20)} == expected
+    # New events continue the sequence
+    assert recovered.record("s0", "donor_0", {"cart_mandate": {"id": "cart_x"}}) == 251
+
+
+def test_record_queues_and_flush_writes(tmp_path):
+    log = MandateEventLog(tmp_path, snapshot_every=10_000)
+    log.open()
+    for i in range(100):
+        log.record(f"s{i % 5}", "donor_1", {"intent_mandate": _intent(f"org{i}", float(i))})
+    log.flush()
+    assert log.stats()["pending_events"] == 0
+    assert len(log.events_path.read_text().splitlines()) == 100
+
+    # A forced snapshot covers exactly what has been written
+    stats = log.snapshot()
+    with open(log.snapshot_path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    assert (header["seq"], header["offset"], stats["entries"]) == (100, log.events_path.stat().st_size, 5)
+    log.close()
+
+
+def test_torn_final_event_is_dropped(tmp_path):
+    log = MandateEventLog(tmp_path)
+    log.record("s1", "donor_1", {"intent_mandate": _intent("pwani", 100.0)})
+    log.close()
+    with open(log.events_path, "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"ts":0,"session":"s1","user":"donor_1","key":"intent_mandate","value":{"org')
+
+    recovered = MandateEventLog(tmp_path)
+    assert recovered.open()["replayed_events"] == 1
+    recovered.record("s1", "donor_1", {"cart_mandate": {"id": "cart_1"}})
+    assert len(recovered.history("s1")) == 2
+
+
+def test_tools_restore_state_after_a_restart(deterministic):
+    tool_context = FakeToolContext()
+    put_state(tool_context, {"intent_mandate": _intent("pwani", 100.0)})
+
+    # Same session, but the session service lost its state
+    restarted = FakeToolContext()
+    assert get_state(restarted, "intent_mandate") == _intent("pwani", 100.0)
+    assert restarted.state["intent_mandate"] == _intent("pwani", 100.0)
+
+
+def test_snapshot_round_trips_awkward_ids(tmp_path):
+    log = MandateEventLog(tmp_path, snapshot_every=1)
+    log.record("s\t1\\n", "donor\n1", {"intent_mandate": _intent("tab\there", 1.0)})
+    log.close()
+
+    recovered = MandateEventLog(tmp_path)
+    assert recovered.open()["snapshot_entries"] == 1
+    assert recovered.state("s\t1\\n", "donor\n1") == {"intent_mandate": _intent("tab\there", 1.0)}
+
+
+def test_a_reused_session_id_never_restores_another_donors_state(deterministic):
+    put_state(FakeToolContext(user_id="alice", session_id="shared"), {"intent_mandate": _intent("pwani", 5000.0)})
+
+    bob = FakeToolContext(user_id="bob", session_id="shared")
+    assert get_state(bob, "intent_mandate") is None
+    put_state(bob, {"intent_mandate": _intent("tambua", 5.0)})
+
+    # Each donor gets back only what they recorded
+    assert get_state(FakeToolContext(user_id="alice", session_id="shared"), "intent_mandate") == _intent("pwani", 5000.0)
+    assert get_state(FakeToolContext(user_id="bob", session_id="shared"), "intent_mandate") == _intent("tambua", 5.0)
+
+
+def test_contexts_without_a_session_id_are_not_persisted(deterministic):
+    tool_context = FakeToolContext(session_id=None)
+    put_state(tool_context, {"intent_mandate": _intent("pwani", 100.0)})
+    assert tool_context.state["intent_mandate"] == _intent("pwani", 100.0)
+    assert mandate_events.stats()["seq"] == 0
+    assert get_state(FakeToolContext(session_id=None), "intent_mandate") is None
@@ -0,0 +1,58 @@
+"""
+Tests for the fixed-point Money type.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from femtech_empowerment_funding_advisor.tools.money import Money
+
+
+def test_floats_convert_exactly():
+    assert Money.from_major(0.1).minor == 10
+    assert Money.from_major(0.1) + Money.from_major(0.2) == Money.from_major(0.3)
+    assert Money.from_major(100.005).minor == 10_001
+    assert Money.from_major(1500, "UGX").minor == 1500
+    assert str(Money.from_major(-12.5)) == "USD -12.50"
+
+
+def test_arithmetic_and_ordering():
+    a, b = Money.from_major(10), Money.from_major(2.5)
+    assert (a + b, a - b, -b) == (Money(1250), Money(750), Money(-250))
+    assert b < a and a >= a and not a > a
+    assert Money.sum([a, b, b]) == Money(1500)
+    assert max([a, b]) is a
+
+
+@pytest.mark.parametrize("op", [
+    lambda a, b: a + b, lambda a, b: a - b, lambda a, b: a < b, lambda a, b: a >= b,
+    lambda a, b: Money.sum([a, b]),
+])
+def test_mixed_currencies_raise(op):
+    with pytest.raises(ValueError, match="urrenc"):
+        op(Money(100, "USD"), Money(100, "KES"))
+
+
+@pytest.mark.parametrize("other", [100, 1.0, "USD 1.00", None])
+def test_non_money_operands(other):
+    money = Money(100)
+    assert money != other
+    for op in (lambda: money < other, lambda: money >= other, lambda: money + other):
+        with pytest.raises(TypeError):
+            op()
+
+
+def test_payment_amount_prefers_stored_minor_units():
+    amount = SimpleNamespace(currency="USD", value=250.5)
+    assert Money.from_payment_amount(amount) == Money(25_050)
+    assert Money.from_payment_amount(amount, minor=25_050) == Money(25_050)
+    # The float and the stored minor units must agree
+    with pytest.raises(ValueError, match="disagrees"):
+        Money.from_payment_amount(amount, minor=25_051)
+
+
+@pytest.mark.parametrize("amount", [float("nan"), float("inf"), "ten", None])
+def test_non_numeric_amounts_are_rejected(amount):
+    with pytest.raises(ValueError):
+        Money.from_major(amount)
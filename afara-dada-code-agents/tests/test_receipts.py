@@ -0,0 +1,72 @@
+"""
+Tests for bulk receipt generation from the ledger.
+"""
+
+import json
+
+import pytest
+
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger, chain_record
+from femtech_empowerment_funding_advisor.receipts.generator import generate_receipts
+from femtech_empowerment_funding_advisor.receipts.templates import ReceiptTemplate
+
+
+def _record(i: int, org: str = "Pwani Teknowgalz", status: str = "completed", year: int = 2026) -> dict:
+    payment_result = {
+        "transaction_id": f"txn_{i:04d}", "cart_id": f"cart_{i:04d}", "status": status,
+        "amount": 25.5, "amount_minor": 2550, "currency": "USD", "recipient": org,
+        "timestamp": f"{year}-03-01T10:00:00+00:00", "simulation": True,
+    }
+    # The nested mandates also mention payment_result-like fields; only the record's own one counts
+    cart = {"contents": {"id": f"cart_{i:04d}", "merchant_name": org}, "note": '"payment_result":{}'}
+    return chain_record({"intent_id": f"fund_{i:04d}"}, cart, {"payment_mandate_contents": {}}, payment_result)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    ledger.append_many(_record(i) for i in range(50))
+    ledger.append_many([
+        _record(50, status="failed"),
+        _record(51, year=2025),
+        _record(52, org="<script>Evil & Co</script>"),
+    ])
+    return ledger
+
+
+def test_byte_ranges_cover_every_line_once(ledger):
+    ranges = list(ledger.byte_ranges(chunk_bytes=1_000))
+    assert len(ranges) > 1
+    lines = [line for start, end in ranges for line in ledger.iter_range(start, end)]
+    assert [json.loads(line) for line in lines] == list(ledger)
+
+
+def test_text_receipts_and_manifest(ledger, tmp_path):
+    out = tmp_path / "receipts"
+    report = generate_receipts(ledger, out, fmt="text", year=2026, chunk_bytes=4_000)
+
+    assert (report.issued, report.skipped) == (51, 1)
+    assert report.totals_minor == {"USD": 51 * 2550}
+    manifest = [json.loads(line) for line in (out / "manifest.jsonl").read_text().splitlines()]
+    assert sum(entry["receipts"] for entry in manifest) == 51 and len(manifest) == report.files > 1
+
+    text = (out / manifest[0]["file"]).read_text()
+    assert "Transaction ID:  txn_0000" in text and "USD 25.50" in text and "2026-03-01" in text
+    assert all("txn_0051" not in (out / entry["file"]).read_text() for entry in manifest)
+
+
+def test_html_escapes_and_pdf_renders(ledger, tmp_path):
+    html_report = generate_receipts(ledger, tmp_path / "html", fmt="html", workers=1)
+    html = "".join(path.read_text() for path in (tmp_path / "html").glob("*.html"))
+    assert html_report.issued == 52
+    assert "&lt;script&gt;Evil &amp; Co&lt;/script&gt;" in html and "<script>" not in html
+
+    generate_receipts(ledger, tmp_path / "pdf", fmt="pdf")
+    pdf = (tmp_path / "pdf" / "receipts-000001.pdf").read_bytes()
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert pdf.count(b"/Type /Page ") == 52
+
+
+def test_template_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        ReceiptTemplate(name="bad", extension="txt", body="{transaction_id} {donor_ssn}")
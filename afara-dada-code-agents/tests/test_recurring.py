@@ -0,0 +1,131 @@
+"""
+Tests for recurring donations: the subscription journal and crash recovery of
+settlement windows.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger, chain_record
+from femtech_empowerment_funding_advisor.runtime.recurring_scheduler import RecurringScheduler
+from femtech_empowerment_funding_advisor.tools.recurring_tools import (
+    Subscription,
+    SubscriptionStore,
+    create_recurring_donation,
+    subscription_store,
+)
+
+NOW = 1_767_225_600.0
+
+
+def _subscription(i: int, **overrides) -> Subscription:
+    fields = dict(
+        subscription_id=f"sub_{i}", user_id=f"donor_{i}", org_name="Pwani Teknowgalz",
+        amount_minor=1_000, currency="USD", interval_s=30 * 86_400, cap_minor=12_000,
+        next_run=NOW - 1, expires_at=NOW + 365 * 86_400,
+    )
+    fields.update(overrides)
+    return Subscription(**fields)
+
+
+def test_journal_is_shared_across_processes(tmp_path):
+    path = tmp_path / "subscriptions.jsonl"
+    agent_side = SubscriptionStore(path)
+    scheduler_side = SubscriptionStore(path)
+    assert scheduler_side.load() == 0
+
+    agent_side.add(_subscription(1))
+    agent_side.add(_subscription(2))
+    assert agent_side.cancel("sub_2")
+    assert sorted(s.subscription_id for s in scheduler_side.sync()) == ["sub_1", "sub_2"]
+    assert scheduler_side.get("sub_2").status == "cancelled"
+    # Nothing new, and our own writes coming back are not changes
+    scheduler_side.persist([scheduler_side.get("sub_1")])
+    assert scheduler_side.sync() == []
+
+    scheduler_side.compact()
+    assert len(path.read_text().splitlines()) == 2
+    assert SubscriptionStore(path).load() == 2
+
+
+def test_reconcile_keeps_ledgered_runs_and_rolls_back_the_rest(tmp_path):
+    store = SubscriptionStore(tmp_path / "subscriptions.jsonl")
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    ledger.append(chain_record(None, {}, {}, {"status": "completed"}, run_key="sub_0:1"))
+    offset = ledger.path.stat().st_size
+
+    # Crash after journaling the window's progress: sub_1's run reached the
+    # ledger, sub_2's did not
+    for i in (1, 2):
+        store.add(_subscription(
+            i, runs=1, charged_minor=1_000, next_run=NOW - 1 + 30 * 86_400,
+            pending_run=f"sub_{i}:1", pending_offset=offset,
+        ))
+    ledger.append(chain_record(None, {}, {}, {"status": "completed"}, run_key="sub_1:1"))
+    # A torn final line never counts as settled
+    with open(ledger.path, "a", encoding="utf-8") as f:
+        f.write('{"run_key":"sub_2:1"')
+
+    restarted = SubscriptionStore(store.path)
+    restarted.load()
+    assert RecurringScheduler(store=restarted, ledger=ledger).reconcile() == {"kept": 1, "rolled_back": 1}
+
+    kept, rolled_back = restarted.get("sub_1"), restarted.get("sub_2")
+    assert (kept.runs, kept.charged_minor, kept.pending_run) == (1, 1_000, None)
+    assert (rolled_back.runs, rolled_back.charged_minor, rolled_back.next_run) == (0, 0, NOW - 1)
+    reloaded = SubscriptionStore(store.path)
+    reloaded.load()
+    assert (reloaded.get("sub_2").runs, reloaded.get("sub_2").pending_run) == (0, None)
+
+
+def test_settle_window_charges_each_run_once(tmp_path):
+    pytest.importorskip("ap2.types.mandate")
+    store = SubscriptionStore(tmp_path / "subscriptions.jsonl")
+    store.add(_subscription(1))
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    scheduler = RecurringScheduler(store=store, ledger=ledger, window_s=60)
+
+    assert asyncio.run(scheduler.settle_window(NOW))["settled"] == 1
+    # The scheduler re-reads its own journal writes; they must not schedule the run again
+    assert asyncio.run(scheduler.settle_window(NOW))["settled"] == 0
+    assert [record["run_key"] for record in ledger] == ["sub_1:1"]
+    assert SubscriptionStore(store.path).load() == 1
+
+
+def test_running_scheduler_picks_up_new_subscriptions(tmp_path):
+    pytest.importorskip("ap2.types.mandate")
+    path = tmp_path / "subscriptions.jsonl"
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    # Nothing scheduled yet: the loop must still notice what the tools add
+    scheduler = RecurringScheduler(store=SubscriptionStore(path), ledger=ledger, window_s=0.05)
+
+    async def scenario():
+        stop = asyncio.Event()
+        task = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(0.1)
+        SubscriptionStore(path).add(_subscription(1, next_run=time.time()))
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if ledger.path.exists():
+                break
+        stop.set()
+        await asyncio.wait_for(task, timeout=5)
+
+    asyncio.run(scenario())
+    assert [record["run_key"] for record in ledger] == ["sub_1:1"]
+
+
+def test_created_subscription_is_journaled(deterministic):
+    pytest.importorskip("ap2.types.mandate")
+    result = asyncio.run(create_recurring_donation("Pwani Teknowgalz", 10.0, 30, 120.0, FakeToolContext()))
+    assert result["status"] == "success"
+    scheduler_side = SubscriptionStore(subscription_store.path)
+    assert scheduler_side.load() == 1 and scheduler_side.get(result["subscription_id"]).cap_minor == 12_000
+
+
+def test_cap_has_an_upper_bound(deterministic):
+    result = asyncio.run(create_recurring_donation("Pwani Teknowgalz", 10.0, 30, 5_000_000.0, FakeToolContext()))
+    assert result["status"] == "error" and "cap exceeds maximum" in result["message"]
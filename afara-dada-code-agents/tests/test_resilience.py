@@ -0,0 +1,119 @@
+"""
+Tests for the circuit breaker in front of the model tiers.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+
+from femtech_empowerment_funding_advisor.runtime import resilience  # noqa: E402
+from femtech_empowerment_funding_advisor.runtime.resilience import (  # noqa: E402
+    CircuitBreaker,
+    ResilientLlm,
+    RetryPolicy,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.at = 0.0
+
+    def __call__(self) -> float:
+        return self.at
+
+
+class FakeTier(BaseLlm):
+    error: object = None
+    hang: bool = False
+    delay: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if self.hang:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        yield None
+
+
+def _half_open_breaker(monkeypatch, model: str) -> CircuitBreaker:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=10, clock=clock)
+    breaker.record_failure()
+    clock.at += 10
+    monkeypatch.setitem(resilience._breakers, model, breaker)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_breaker_opens_and_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.at += 10
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cancelled_probe_frees_the_slot(monkeypatch):
+    breaker = _half_open_breaker(monkeypatch, "hanging-model")
+    llm = ResilientLlm(model="hanging-model", tiers=[FakeTier(model="hanging-model", hang=True)])
+
+    async def cancel_mid_call():
+        task = asyncio.create_task(llm.generate_content_async(LlmRequest()).__anext__())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_mid_call())
+    assert breaker.state == "half-open" and breaker.allow()
+
+
+def test_non_retryable_error_leaves_breaker_state(monkeypatch):
+    breaker = _half_open_breaker(monkeypatch, "strict-model")
+    llm = ResilientLlm(
+        model="strict-model", tiers=[FakeTier(model="strict-model", error=ValueError("bad request"))],
+        policy=RetryPolicy(max_attempts=1),
+    )
+
+    async def call():
+        return [r async for r in llm.generate_content_async(LlmRequest())]
+
+    with pytest.raises(ValueError):
+        asyncio.run(call())
+    # Still half-open rather than closed, and the next call may probe
+    assert breaker.state == "half-open" and breaker.allow()
+
+
+def test_model_limit_works_across_event_loops(monkeypatch):
+    monkeypatch.setitem(resilience._breakers, "shared-model", CircuitBreaker())
+    llm = ResilientLlm(model="shared-model", tiers=[FakeTier(model="shared-model", delay=0.01)])
+    previous = resilience.MODEL_CONCURRENCY
+    resilience.set_model_concurrency(1)
+
+    async def call():
+        return [r async for r in llm.generate_content_async(LlmRequest())]
+
+    async def contended_calls():
+        # Two calls for one slot, so the second waits on the semaphore (which binds it to the loop)
+        return await asyncio.gather(call(), call())
+
+    try:
+        # Each asyncio.run is a new loop; a semaphore bound to the first used to fail on the second
+        for _ in range(3):
+            assert asyncio.run(contended_calls()) == [[None], [None]]
+    finally:
+        resilience.set_model_concurrency(previous)
@@ -0,0 +1,118 @@
+"""
+Tests for partner tenant views of the registry.
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.data.femtech_programs import (
+    INITIATIVES_DB,
+    REGISTRY_VERSION,
+    get_initiative,
+    locate_initiative,
+)
+from femtech_empowerment_funding_advisor.data.tenants import (
+    BUILTIN_TENANTS,
+    TENANT_STATE_KEY,
+    TenantSpec,
+    get_registry_view,
+    register_tenant,
+)
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import (
+    compare_initiatives,
+    find_tech_initiatives,
+    save_user_choice,
+)
+from femtech_empowerment_funding_advisor.tools.impact_tools import get_impact_updates
+
+
+def _tenant_context(tenant_id: str) -> FakeToolContext:
+    tool_context = FakeToolContext()
+    tool_context.state[TENANT_STATE_KEY] = tenant_id
+    return tool_context
+
+
+def test_views_share_records_and_build_lazily():
+    view = get_registry_view("corporate-csr")
+    assert get_registry_view("corporate-csr") is view
+    assert get_registry_view(None).version == REGISTRY_VERSION
+    assert view.version != REGISTRY_VERSION
+
+    records = view.get_initiatives_by_region("africa")
+    assert [r["id"] for r in records] == ["she-code-africa", "pwani-teknowgalz", "tambua-women-in-tech"]
+    # Featured first within its region, and the very same record objects as the registry
+    assert [r["id"] for r in view.get_initiatives_by_region("east-africa")][0] == "pwani-teknowgalz"
+    assert all(record is get_initiative(record["id"]) for record in records)
+    assert view.get_initiative("Empower Her Community") is None
+
+
+@pytest.mark.parametrize("tenant_id", sorted(BUILTIN_TENANTS))
+def test_views_overlay_only_their_delta(tenant_id):
+    spec = BUILTIN_TENANTS[tenant_id]
+    view = get_registry_view(tenant_id)
+
+    def visible(org_id):
+        return (spec.include is None or org_id in spec.include) and org_id not in spec.exclude
+
+    for region, records in INITIATIVES_DB.items():
+        expected = [r["id"] for r in records if visible(r["id"])]
+        expected.sort(key=lambda org_id: spec.featured.index(org_id) if org_id in spec.featured else len(spec.featured))
+        assert [r["id"] for r in view.get_initiatives_by_region(region)] == expected
+        for record in records:
+            assert (view.get_initiative(record["name"]) is record) == visible(record["id"])
+
+    delta = spec.include if spec.include is not None else (*spec.exclude, *spec.featured)
+    assert set(view._region_overrides) == {locate_initiative(org_id)[0] for org_id in delta}
+
+
+def test_empty_tenant_view(deterministic):
+    register_tenant(TenantSpec("empty-portal", "Empty portal", include=()))
+    tool_context = _tenant_context("empty-portal")
+    assert list(get_registry_view("empty-portal").iter_initiatives()) == []
+
+    result = asyncio.run(compare_initiatives([], tool_context=tool_context))
+    assert result["status"] == "not_found"
+    assert asyncio.run(compare_initiatives(["Pwani Teknowgalz"], tool_context=tool_context))["status"] == "not_found"
+    assert asyncio.run(find_tech_initiatives("africa", tool_context))["status"] == "not_found"
+
+
+def test_register_tenant_rejects_unknown_ids():
+    with pytest.raises(ValueError):
+        register_tenant(TenantSpec("typo", "Typo", include=("she-code-afrika",)))
+
+
+def test_find_tech_initiatives_is_tenant_scoped(deterministic):
+    public = asyncio.run(find_tech_initiatives("pan-africa"))
+    foundation = asyncio.run(find_tech_initiatives("pan-africa", _tenant_context("foundation")))
+    csr = asyncio.run(find_tech_initiatives("global-diaspora", _tenant_context("corporate-csr")))
+
+    assert public["count"] == 2 and foundation["count"] == 2
+    assert csr["status"] == "not_found"
+    assert asyncio.run(find_tech_initiatives("pan-africa", _tenant_context("nope")))["status"] == "error"
+
+
+def test_compare_ranks_within_the_tenant(deterministic):
+    result = asyncio.run(compare_initiatives([], tool_context=_tenant_context("dao")))
+    ids = [row[1] for row in result["rows"]]
+    assert "women-in-tech-africa" not in ids and len(ids) == 4
+
+    scoped = asyncio.run(compare_initiatives(["Women in Tech Africa"], tool_context=_tenant_context("dao")))
+    assert scoped["status"] == "not_found"
+
+
+def test_tenant_only_funds_and_reports_its_subset(deterministic):
+    tool_context = _tenant_context("foundation")
+    result = asyncio.run(save_user_choice("Pwani Teknowgalz", 100.0, tool_context))
+    assert result["status"] == "error"
+    assert "intent_mandate" not in tool_context.state
+
+    assert asyncio.run(get_impact_updates("pwani-teknowgalz", tool_context=tool_context))["status"] == "not_found"
+
+    # Names outside the registry are refused too, on every portal
+    for tenant_id in ("foundation", ""):
+        tool_context = _tenant_context(tenant_id)
+        result = asyncio.run(save_user_choice("Totally Legit Org", 100.0, tool_context))
+        assert result["status"] == "error" and "verified initiative registry" in result["message"]
+        assert "intent_mandate" not in tool_context.state
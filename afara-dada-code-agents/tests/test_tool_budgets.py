@@ -0,0 +1,69 @@
+"""
+Latency and allocation budgets for the tools.
+
+Budgets are set well above typical timings, so they catch regressions (an
+accidental re-validation, a per-call file open, an O(n) scan) rather than
+noise. Each round uses a fresh donor and session so velocity limits and the
+idempotency check do not short-circuit the measured path.
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from conftest import FakeToolContext
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import find_tech_initiatives, save_user_choice
+from femtech_empowerment_funding_advisor.tools.velocity import velocity_guard
+
+pytestmark = pytest.mark.perf
+
+
+def _contexts():
+    for i in itertools.count():
+        yield FakeToolContext(user_id=f"donor_{i}", session_id=f"session_{i}")
+
+
+def test_find_tech_initiatives_budget(deterministic, budget):
+    asyncio.run(find_tech_initiatives("pan-africa"))
+    budget(lambda: find_tech_initiatives("pan-africa"), max_median_us=100, max_alloc_kb=16)
+
+
+def test_save_user_choice_budget(deterministic, budget):
+    pytest.importorskip("ap2.types.mandate")
+    contexts = _contexts()
+    budget(lambda: save_user_choice("She Code Africa", 100.0, next(contexts)), max_median_us=1_500, max_alloc_kb=128)
+
+
+def test_create_cart_mandate_budget(deterministic, budget):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+
+    async def call(tool_context):
+        await save_user_choice("She Code Africa", 100.0, tool_context)
+        return await create_cart_mandate(tool_context)
+
+    contexts = _contexts()
+    # Includes the save_user_choice that feeds it
+    budget(lambda: call(next(contexts)), max_median_us=3_000, max_alloc_kb=256, rounds=100)
+
+
+def test_create_payment_mandate_budget(deterministic, budget):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+
+    template = FakeToolContext()
+    asyncio.run(save_user_choice("She Code Africa", 100.0, template))
+    asyncio.run(create_cart_mandate(template))
+    contexts = _contexts()
+
+    def call():
+        tool_context = next(contexts)
+        tool_context.state.update(template.state)
+        return create_payment_mandate(tool_context)
+
+    # A cold session cache, so this includes full CartMandate validation and the ledger append
+    budget(call, max_median_us=3_000, max_alloc_kb=256, rounds=100)
+    # Every round must have timed the success path, not a velocity rejection
+    assert velocity_guard.rejections == {}
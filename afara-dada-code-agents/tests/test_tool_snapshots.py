@@ -0,0 +1,85 @@
+"""
+Snapshot tests for the tools' structured outputs.
+
+The clock and ID generator are pinned by the `deterministic` fixture, so
+timestamps, expiries, IDs and signatures are stable between runs.
+"""
+
+import asyncio
+
+import pytest
+
+from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import find_tech_initiatives, save_user_choice
+
+
+def test_find_tech_initiatives(deterministic, snapshot):
+    result = asyncio.run(find_tech_initiatives("east-africa"))
+    snapshot("find_tech_initiatives_east_africa", result)
+    # Served from the tool result cache the second time, unchanged
+    assert asyncio.run(find_tech_initiatives("East Africa")) == result
+
+
+def test_find_tech_initiatives_unknown_region(deterministic, snapshot):
+    snapshot("find_tech_initiatives_not_found", asyncio.run(find_tech_initiatives("antarctica")))
+
+
+@pytest.mark.parametrize("amount", [0.0, -5.0, 1_000_000.01])
+def test_save_user_choice_rejects_bad_amounts(tool_context, amount):
+    result = asyncio.run(save_user_choice("She Code Africa", amount, tool_context))
+    assert result["status"] == "error"
+    assert "intent_mandate" not in tool_context.state
+
+
+def test_funding_flow(tool_context, snapshot):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+
+    intent = asyncio.run(save_user_choice("Pwani Teknowgalz", 250.5, tool_context))
+    snapshot("save_user_choice", {"result": intent, "intent_mandate": tool_context.state["intent_mandate"]})
+
+    cart = asyncio.run(create_cart_mandate(tool_context))
+    snapshot("create_cart_mandate", {"result": cart, "cart_mandate": tool_context.state["cart_mandate"]})
+
+    payment = asyncio.run(create_payment_mandate(tool_context))
+    snapshot("create_payment_mandate", {
+        "result": payment,
+        "payment_mandate": tool_context.state["payment_mandate"],
+        "payment_result": tool_context.state["payment_result"],
+    })
+
+    # A repeated call must not charge again
+    repeat = asyncio.run(create_payment_mandate(tool_context))
+    assert repeat["duplicate"] is True
+    assert repeat["transaction_id"] == payment["transaction_id"]
+
+
+def test_cart_and_payment_require_previous_hop(tool_context, snapshot):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+
+    snapshot("missing_previous_hop", {
+        "create_cart_mandate": asyncio.run(create_cart_mandate(tool_context)),
+        "create_payment_mandate": asyncio.run(create_payment_mandate(tool_context)),
+    })
+
+
+def test_payment_charges_the_stored_cart_total(tool_context):
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+
+    asyncio.run(save_user_choice("Pwani Teknowgalz", 0.29, tool_context))
+    asyncio.run(create_cart_mandate(tool_context))
+    assert tool_context.state["cart_mandate"]["total_minor"] == 29
+
+    # The exact total and the AP2 float must agree before anything is charged
+    tool_context.state["cart_mandate"]["total_minor"] = 30
+    result = asyncio.run(create_payment_mandate(tool_context))
+    assert result["status"] == "error" and "disagrees" in result["message"]
+    assert "payment_result" not in tool_context.state
+
+    tool_context.state["cart_mandate"]["total_minor"] = 29
+    assert asyncio.run(create_payment_mandate(tool_context))["status"] == "success"
+    assert tool_context.state["payment_result"]["amount_minor"] == 29
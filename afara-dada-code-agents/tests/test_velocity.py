@@ -0,0 +1,99 @@
+"""
+Tests for the velocity checks: token buckets, windowed count-min sketches and
+the guard that combines them.
+"""
+
+from femtech_empowerment_funding_advisor.tools.money import Money
+from femtech_empowerment_funding_advisor.tools.velocity import (
+    TokenBucketMap,
+    VelocityGuard,
+    VelocityPolicy,
+    WindowedCountMinSketch,
+)
+
+
+class FakeClock:
+    def __init__(self, at: float = 1_000_000.0):
+        self.at = at
+
+    def __call__(self) -> float:
+        return self.at
+
+
+def test_token_bucket_bursts_then_refills():
+    clock = FakeClock()
+    buckets = TokenBucketMap(rate_per_s=1.0, burst=3, clock=clock)
+    assert [buckets.try_acquire("a") for _ in range(4)] == [True, True, True, False]
+    # Keys are independent
+    assert buckets.try_acquire("b")
+
+    clock.at += 1.5
+    assert [buckets.try_acquire("a") for _ in range(2)] == [True, False]
+    clock.at += 100
+    assert [buckets.try_acquire("a") for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_evicts_least_recently_used():
+    buckets = TokenBucketMap(rate_per_s=0.0, burst=1, max_keys=2, clock=FakeClock())
+    assert buckets.try_acquire("a") and buckets.try_acquire("b")
+    assert not buckets.try_acquire("a")  # "a" is now the most recent
+    assert buckets.try_acquire("c")  # evicts "b"
+    assert len(buckets) == 2
+    assert buckets.try_acquire("b")  # starts again with a full bucket
+
+
+def test_count_min_sketch_slides_and_never_undercounts():
+    clock = FakeClock()
+    sketch = WindowedCountMinSketch(window_s=60, buckets=6, width=64, depth=3, clock=clock)
+    for i in range(500):
+        sketch.add(f"org_{i % 50}", 2)
+    assert all(sketch.estimate(f"org_{i}") >= 20 for i in range(50))
+
+    clock.at += 30
+    sketch.add("org_0", 5)
+    assert sketch.estimate("org_0") >= 25
+
+    # The first burst ages out; the later add is still inside the window
+    clock.at += 40
+    assert sketch.estimate("org_0") == 5
+    clock.at += 60
+    assert sketch.estimate("org_0") == 0
+    assert sketch.memory_bytes == 7 * 64 * 3 * 8
+
+
+def test_guard_limits_user_payments_and_real_tokens():
+    clock = FakeClock()
+    guard = VelocityGuard(VelocityPolicy(payment_burst=2, token_payments_per_10min=3), clock=clock)
+    amount = Money.from_major(10)
+
+    assert guard.check_payment("donor_1", "tok_visa", amount)[0]
+    assert guard.check_payment("donor_1", "tok_visa", amount)[0]
+    allowed, message = guard.check_payment("donor_1", "tok_visa", amount)
+    assert not allowed and "Too many payments" in message
+
+    # A different donor on the same card trips the per-token window
+    assert guard.check_payment("donor_2", "tok_visa", amount)[0]
+    allowed, message = guard.check_payment("donor_3", "tok_visa", amount)
+    assert not allowed and "payment method" in message
+    assert guard.rejections == {"user_payments": 1, "token_payments": 1}
+
+
+def test_guard_without_token_does_not_share_a_limit_across_donors():
+    guard = VelocityGuard(VelocityPolicy(token_payments_per_10min=3), clock=FakeClock())
+    assert all(guard.check_payment(f"donor_{i}", None, Money.from_major(10))[0] for i in range(50))
+
+
+def test_guard_catches_split_donations_and_org_floods():
+    clock = FakeClock()
+    guard = VelocityGuard(
+        VelocityPolicy(payment_burst=100, user_daily_amount=Money.from_major(1_000), org_intents_per_minute=5),
+        clock=clock,
+    )
+    assert all(guard.check_payment("splitter", None, Money.from_major(300))[0] for _ in range(3))
+    allowed, message = guard.check_payment("splitter", None, Money.from_major(300))
+    assert not allowed and "last 24 hours" in message
+
+    results = [guard.check_intent(f"donor_{i}", f"s_{i}", "Pwani Teknowgalz", Money.from_major(1))[0] for i in range(6)]
+    assert results == [True] * 5 + [False]
+    clock.at += 120
+    assert guard.check_intent("donor_x", "s_x", "Pwani Teknowgalz", Money.from_major(1))[0]
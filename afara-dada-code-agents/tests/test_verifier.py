@@ -0,0 +1,98 @@
+"""
+Tests for the offline chain-of-trust verifier.
+"""
+
+import asyncio
+import copy
+import io
+import json
+
+import pytest
+
+from femtech_empowerment_funding_advisor.audit.verifier import verify_ledger, verify_stream
+from femtech_empowerment_funding_advisor.data.ledger import MandateLedger, chain_record, default_ledger
+
+
+def _record(i: int) -> dict:
+    # Deliberately incomplete chains: every one has discrepancies to report
+    payment_result = {"transaction_id": f"txn_{i:04d}", "cart_id": f"cart_{i:04d}", "status": "completed"}
+    cart = {"contents": {"id": f"cart_{i:04d}", "merchant_name": "Pwani Teknowgalz"}}
+    return chain_record({"intent_id": f"fund_{i:04d}"}, cart, {"payment_mandate_contents": {}}, payment_result)
+
+
+def test_ledger_ranges_match_a_parsed_stream(tmp_path):
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    ledger.append_many(_record(i) for i in range(40))
+
+    streamed = verify_stream(ledger.iter_chunks(7))
+    out = io.StringIO()
+    by_range = verify_ledger(ledger, report_out=out, chunk_bytes=1_000)
+    assert by_range.checked == streamed.checked == 40
+    assert by_range.by_check == streamed.by_check and by_range.discrepancies > 0
+
+    # Each discrepancy points at the start of its ledger line
+    data = ledger.path.read_bytes()
+    for item in map(json.loads, out.getvalue().splitlines()):
+        assert item["offset"] == 0 or data[item["offset"] - 1:item["offset"]] == b"\n"
+        assert json.loads(data[item["offset"]:].split(b"\n", 1)[0])["payment_result"]["transaction_id"] == item["transaction_id"]
+
+
+def test_ledger_ranges_in_worker_processes(tmp_path):
+    ledger = MandateLedger(tmp_path / "ledger.jsonl")
+    ledger.append_many(_record(i) for i in range(40))
+    with open(ledger.path, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+
+    report = verify_ledger(ledger, workers=2, chunk_bytes=2_000)
+    assert report.checked == 40
+    assert report.by_check == verify_ledger(ledger).by_check
+
+
+@pytest.fixture
+def settled_chain(tool_context) -> dict:
+    """One Intent -> Cart -> Payment chain settled through the tools, as stored in the ledger."""
+    pytest.importorskip("ap2.types.mandate")
+    from femtech_empowerment_funding_advisor.tools.femtechorgs_tools import save_user_choice
+    from femtech_empowerment_funding_advisor.tools.merchant_tools import create_cart_mandate
+    from femtech_empowerment_funding_advisor.tools.payment_tools import create_payment_mandate
+
+    asyncio.run(save_user_choice("Pwani Teknowgalz", 250.5, tool_context))
+    asyncio.run(create_cart_mandate(tool_context))
+    assert asyncio.run(create_payment_mandate(tool_context))["status"] == "success"
+    (record,) = list(default_ledger)
+    return record
+
+
+def test_chain_settled_by_the_tools_verifies_clean(settled_chain):
+    report = verify_ledger(default_ledger)
+    assert (report.checked, report.discrepancies) == (1, 0)
+    assert not report.by_check
+
+
+def _tamper(paths: tuple, value):
+    def apply(record: dict) -> None:
+        *parents, leaf = paths
+        target = record
+        for key in parents:
+            target = target[key]
+        target[leaf] = value
+    return apply
+
+
+@pytest.mark.parametrize("tamper, check", [
+    # Amount paid differs from the cart total
+    (_tamper(("payment_mandate", "payment_mandate_contents", "payment_details_total", "amount", "value"), 2505.0), "amount"),
+    # Payment points at another cart
+    (_tamper(("payment_mandate", "payment_mandate_contents", "payment_details_id"), "cart_someone_else"), "linkage"),
+    # Signature that does not match the cart contents
+    (_tamper(("cart_mandate", "merchant_authorization"), "SIG_0000000000000000"), "signature"),
+])
+def test_each_tampered_field_is_reported_by_its_check(tmp_path, settled_chain, tamper, check):
+    record = copy.deepcopy(settled_chain)
+    tamper(record)
+    ledger = MandateLedger(tmp_path / "tampered.jsonl")
+    ledger.append(record)
+
+    report = verify_ledger(ledger)
+    assert report.checked == 1
+    assert report.by_check == {check: 1}